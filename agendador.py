@@ -0,0 +1,361 @@
+"""
+Agendador contínuo que só executa os scrapers cuja fonte mudou.
+
+Cada fonte tem uma cadência de verificação (ANTAQ diária, ANAC semanal,
+IBGE mensal). Quando a verificação vence, o arquivo de origem é sondado com
+um HEAD condicional (ETag/Last-Modified/Content-Length, ver
+`downloads.sondar_alteracao`). O scraper só roda se a fonte mudou. Uma fonte
+inalterada custa uma requisição HEAD e a atualização de uma linha da agenda.
+
+Os validadores só são gravados depois de uma execução bem-sucedida. Uma carga
+que falha é tentada de novo após `AGENDADOR_ESPERA_FALHA`. As verificações
+têm jitter, para que fontes com a mesma cadência não disparem juntas. No
+máximo `AGENDADOR_MAX_JOBS` scrapers rodam ao mesmo tempo. O estado fica em
+`fontes_monitoradas`, então reiniciar o processo não antecipa verificações.
+
+Depois de cada fonte carregada, o perfil por município (`municipio_profile`)
+é reconstruído.
+
+Fontes sem arquivo sondável (Power BI das representações fiscais) rodam
+apenas pela cadência.
+
+Usage:
+    python run_scrapers.py --daemon                 # Agendador contínuo
+    python agendador.py                             # Idem
+    python agendador.py --uma-vez                   # Sonda tudo, roda o que mudou e sai
+    python agendador.py --status                    # Estado de cada fonte
+"""
+
+import argparse
+import heapq
+import os
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Tuple
+
+import requests
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from database import SessionLocal, create_tables
+from downloads import sondar_alteracao
+from perfil_municipios import SCRAPERS_PERFIL
+
+load_dotenv()
+
+HORA = 3600
+DIA = 24 * HORA
+
+# Cadência de verificação por grupo de fontes (horas, sobrescritível por env)
+CADENCIAS: Dict[str, float] = {
+    'antaq': float(os.getenv('AGENDADOR_CADENCIA_ANTAQ', '24')) * HORA,
+    'anac': float(os.getenv('AGENDADOR_CADENCIA_ANAC', str(7 * 24))) * HORA,
+    'ibge': float(os.getenv('AGENDADOR_CADENCIA_IBGE', str(30 * 24))) * HORA,
+    'receita': float(os.getenv('AGENDADOR_CADENCIA_RECEITA', str(7 * 24))) * HORA
+}
+
+# Fontes monitoradas: grupo (cadência), scrapers executados em sequência e se há arquivo sondável
+FONTES: Dict[str, Dict[str, Any]] = {
+    'maritimos': {'grupo': 'ibge', 'scrapers': ['maritimos']},
+    'fronteira': {'grupo': 'ibge', 'scrapers': ['fronteira']},
+    'suframa': {'grupo': 'ibge', 'scrapers': ['suframa']},
+    'private': {'grupo': 'anac', 'scrapers': ['private']},
+    'public': {'grupo': 'anac', 'scrapers': ['public']},
+    'portos': {'grupo': 'antaq', 'scrapers': ['portos']},
+    'representacoes_fiscais': {
+        'grupo': 'receita',
+        'scrapers': ['representacoes_fiscais_scraper', 'representacoes_fiscais_process'],
+        'sondar': False
+    }
+}
+
+AGENDADOR_MAX_JOBS = int(os.getenv('AGENDADOR_MAX_JOBS', '2'))
+# Variação aleatória da cadência (fração) e espalhamento das primeiras sondas (segundos)
+AGENDADOR_JITTER = float(os.getenv('AGENDADOR_JITTER', '0.1'))
+AGENDADOR_JITTER_INICIAL = float(os.getenv('AGENDADOR_JITTER_INICIAL', '300'))
+# Nova tentativa após falha da sonda ou do scraper (segundos)
+AGENDADOR_ESPERA_FALHA = float(os.getenv('AGENDADOR_ESPERA_FALHA', str(HORA)))
+
+RESULTADO_INALTERADO = 'inalterado'
+RESULTADO_SUCESSO = 'sucesso'
+RESULTADO_FALHA = 'falha'
+RESULTADO_FALHA_SONDA = 'falha_sonda'
+
+
+def _agora() -> float:
+    return time.time()
+
+
+def _data(instante: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(instante, tz=timezone.utc) if instante is not None else None
+
+
+def _com_jitter(segundos: float) -> float:
+    return segundos * (1 + random.uniform(-AGENDADOR_JITTER, AGENDADOR_JITTER))
+
+
+def carregar_estado() -> Dict[str, Dict[str, Any]]:
+    """Estado gravado de cada fonte (validadores e próxima verificação)."""
+    with SessionLocal() as db:
+        rows = db.execute(text("""
+            SELECT fonte, etag, last_modified, content_length, ultimo_resultado,
+                   verificado_em, executado_em, proxima_verificacao
+            FROM fontes_monitoradas
+        """)).fetchall()
+
+    return {
+        row[0]: {
+            'etag': row[1],
+            'last_modified': row[2],
+            'content_length': row[3],
+            'ultimo_resultado': row[4],
+            'verificado_em': row[5],
+            'executado_em': row[6],
+            'proxima_verificacao': row[7]
+        }
+        for row in rows
+    }
+
+
+def gravar_estado(fonte: str, url: Optional[str], resultado: str, proxima: float,
+                  validadores: Optional[Dict[str, Any]] = None, executado: bool = False) -> None:
+    """
+    Atualiza a agenda da fonte. Validadores só são passados após uma carga
+    bem-sucedida; nos demais casos os anteriores são mantidos.
+    """
+    with SessionLocal() as db:
+        db.execute(text("""
+            INSERT INTO fontes_monitoradas
+                (fonte, url, etag, last_modified, content_length, ultimo_resultado,
+                 verificado_em, executado_em, proxima_verificacao)
+            VALUES
+                (:fonte, :url, :etag, :last_modified, :content_length, :resultado,
+                 now(), CASE WHEN :executado THEN now() END, :proxima)
+            ON CONFLICT (fonte) DO UPDATE SET
+                url = EXCLUDED.url,
+                etag = CASE WHEN :atualizar THEN EXCLUDED.etag ELSE fontes_monitoradas.etag END,
+                last_modified = CASE WHEN :atualizar THEN EXCLUDED.last_modified
+                                     ELSE fontes_monitoradas.last_modified END,
+                content_length = CASE WHEN :atualizar THEN EXCLUDED.content_length
+                                      ELSE fontes_monitoradas.content_length END,
+                ultimo_resultado = EXCLUDED.ultimo_resultado,
+                verificado_em = EXCLUDED.verificado_em,
+                executado_em = COALESCE(EXCLUDED.executado_em, fontes_monitoradas.executado_em),
+                proxima_verificacao = EXCLUDED.proxima_verificacao
+        """), {
+            'fonte': fonte,
+            'url': url,
+            'etag': (validadores or {}).get('etag'),
+            'last_modified': (validadores or {}).get('last_modified'),
+            'content_length': (validadores or {}).get('content_length'),
+            'resultado': resultado,
+            'executado': executado,
+            'atualizar': validadores is not None,
+            'proxima': _data(proxima)
+        })
+        db.commit()
+
+
+class Agendador:
+    """Laço de agendamento: fila de prioridade por próxima verificação + pool de jobs."""
+
+    def __init__(self, manager, max_jobs: int = AGENDADOR_MAX_JOBS):
+        self.manager = manager
+        self.max_jobs = max_jobs
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'})
+
+        self._fila: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._em_execucao: set = set()
+
+    def url(self, fonte: str) -> Optional[str]:
+        """Arquivo sondado da fonte (o mesmo que o scraper baixa)."""
+        if not FONTES[fonte].get('sondar', True):
+            return None
+        scraper = self.manager.scrapers[FONTES[fonte]['scrapers'][0]]['scraper']
+        return getattr(scraper, 'url', None)
+
+    def _agendar(self, fonte: str, instante: float) -> None:
+        with self._lock:
+            heapq.heappush(self._fila, (instante, fonte))
+        self._acordar.set()
+
+    def _proxima_cadencia(self, fonte: str) -> float:
+        return _agora() + _com_jitter(CADENCIAS[FONTES[fonte]['grupo']])
+
+    def verificar(self, fonte: str, estado: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Sonda a fonte. Retorna os validadores atuais se o scraper deve rodar,
+        ou None se a fonte não mudou (ou a sonda falhou), já reagendando.
+        """
+        url = self.url(fonte)
+        if url is None:
+            print(f"⏰ {fonte}: cadência vencida (fonte sem sonda)")
+            return {}
+
+        sonda = sondar_alteracao(url, estado, session=self.session)
+        if sonda['alterado'] is None:
+            print(f"⚠️ {fonte}: sonda falhou ({sonda.get('erro')}); nova tentativa em "
+                  f"{AGENDADOR_ESPERA_FALHA / 60:.0f} min")
+            proxima = _agora() + AGENDADOR_ESPERA_FALHA
+            gravar_estado(fonte, url, RESULTADO_FALHA_SONDA, proxima)
+            self._agendar(fonte, proxima)
+            return None
+
+        if not sonda['alterado']:
+            proxima = self._proxima_cadencia(fonte)
+            print(f"💤 {fonte}: inalterada (HTTP {sonda['status']}); próxima verificação em "
+                  f"{_data(proxima).astimezone():%d/%m %H:%M}")
+            gravar_estado(fonte, url, RESULTADO_INALTERADO, proxima)
+            self._agendar(fonte, proxima)
+            return None
+
+        print(f"🆕 {fonte}: fonte alterada (ETag={sonda.get('etag')}, "
+              f"Last-Modified={sonda.get('last_modified')}, {sonda.get('content_length')} bytes)")
+        return {chave: sonda.get(chave) for chave in ('etag', 'last_modified', 'content_length')}
+
+    def executar_fonte(self, fonte: str, validadores: Dict[str, Any]) -> bool:
+        """Roda os scrapers da fonte e grava a agenda conforme o resultado."""
+        sucesso = True
+        try:
+            for scraper_key in FONTES[fonte]['scrapers']:
+                result = self.manager.run_single_scraper(scraper_key)
+                self.manager.registrar_historico({scraper_key: result})
+                if not result['success']:
+                    sucesso = False
+                    break
+        except Exception as e:
+            print(f"💥 {fonte}: erro inesperado no job - {e}")
+            sucesso = False
+
+        if sucesso and SCRAPERS_PERFIL.intersection(FONTES[fonte]['scrapers']):
+            self.manager.atualizar_perfil_municipios()
+
+        if sucesso:
+            proxima = self._proxima_cadencia(fonte)
+            gravar_estado(fonte, self.url(fonte), RESULTADO_SUCESSO, proxima,
+                          validadores=validadores, executado=True)
+        else:
+            proxima = _agora() + AGENDADOR_ESPERA_FALHA
+            gravar_estado(fonte, self.url(fonte), RESULTADO_FALHA, proxima)
+
+        with self._lock:
+            self._em_execucao.discard(fonte)
+        self._agendar(fonte, proxima)
+        return sucesso
+
+    def _carregar_fila(self, imediato: bool = False) -> Dict[str, Dict[str, Any]]:
+        estado = carregar_estado()
+        agora = _agora()
+        for fonte in FONTES:
+            gravada = (estado.get(fonte) or {}).get('proxima_verificacao')
+            if imediato:
+                instante = agora
+            elif gravada is not None:
+                instante = gravada.timestamp()
+            else:
+                instante = agora + random.uniform(0, AGENDADOR_JITTER_INICIAL)
+            heapq.heappush(self._fila, (instante, fonte))
+        return estado
+
+    def parar(self, *_args) -> None:
+        """Encerra após os jobs em andamento (usado nos sinais SIGINT/SIGTERM)."""
+        if not self._parar.is_set():
+            print("\n🛑 Encerrando agendador após os jobs em andamento...")
+        self._parar.set()
+        self._acordar.set()
+
+    def executar(self, uma_vez: bool = False) -> None:
+        """
+        Laço principal. Com `uma_vez`, sonda todas as fontes imediatamente,
+        roda as alteradas e retorna quando os jobs terminam.
+        """
+        create_tables()
+        self._carregar_fila(imediato=uma_vez)
+        restantes = set(FONTES) if uma_vez else None
+
+        print(f"🗓️ Agendador iniciado: {len(FONTES)} fontes, até {self.max_jobs} jobs simultâneos")
+        with ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix='agendador') as executor:
+            while not self._parar.is_set():
+                with self._lock:
+                    vencida = self._fila[0] if self._fila and self._fila[0][0] <= _agora() else None
+                    if vencida:
+                        heapq.heappop(self._fila)
+                    espera = (self._fila[0][0] - _agora()) if self._fila else HORA
+
+                if vencida is None:
+                    if uma_vez and not restantes:
+                        break
+                    self._acordar.clear()
+                    self._acordar.wait(max(0.0, min(espera, 60)))
+                    continue
+
+                _, fonte = vencida
+                if uma_vez:
+                    if fonte not in restantes:
+                        continue
+                    restantes.discard(fonte)
+
+                with self._lock:
+                    if fonte in self._em_execucao:
+                        continue
+                validadores = self.verificar(fonte, carregar_estado().get(fonte) or {})
+                if validadores is None:
+                    continue
+
+                with self._lock:
+                    self._em_execucao.add(fonte)
+                executor.submit(self.executar_fonte, fonte, validadores)
+
+        print("👋 Agendador encerrado")
+
+
+def imprimir_status() -> None:
+    """Tabela com o estado de cada fonte."""
+    create_tables()
+    estado = carregar_estado()
+    print(f"{'fonte':<24} {'cadência':>9} {'resultado':<12} {'verificado em':<17} "
+          f"{'executado em':<17} {'próxima':<17}")
+
+    def formatar(valor: Optional[datetime]) -> str:
+        return valor.astimezone().strftime('%d/%m/%Y %H:%M') if valor else '-'
+
+    for fonte, config in FONTES.items():
+        linha = estado.get(fonte) or {}
+        cadencia = CADENCIAS[config['grupo']] / DIA
+        print(f"{fonte:<24} {cadencia:>8.1f}d {linha.get('ultimo_resultado') or '-':<12} "
+              f"{formatar(linha.get('verificado_em')):<17} {formatar(linha.get('executado_em')):<17} "
+              f"{formatar(linha.get('proxima_verificacao')):<17}")
+
+
+def executar_daemon(manager, uma_vez: bool = False) -> None:
+    """Liga o agendador com tratamento de SIGINT/SIGTERM."""
+    agendador = Agendador(manager)
+    signal.signal(signal.SIGINT, agendador.parar)
+    signal.signal(signal.SIGTERM, agendador.parar)
+    agendador.executar(uma_vez=uma_vez)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Agendador de scrapers por alteração da fonte')
+    parser.add_argument('--uma-vez', action='store_true', help='Sonda todas as fontes, roda as alteradas e sai')
+    parser.add_argument('--status', action='store_true', help='Mostra o estado de cada fonte')
+    args = parser.parse_args()
+
+    if args.status:
+        imprimir_status()
+        return
+
+    from run_scrapers import BrasilDataHubScrapersManager
+    executar_daemon(BrasilDataHubScrapersManager(), uma_vez=args.uma_vez)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""use_uuid7_primary_keys
+
+Revision ID: 1a7c3e9b5d20
+Revises: f08b6d2e4c19
+Create Date: 2026-10-19 15:47:31.229087
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '1a7c3e9b5d20'
+down_revision: Union[str, None] = 'f08b6d2e4c19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABELAS = [
+    'aerodromos_privados', 'aerodromos_publicos', 'municipios_maritimos', 'municipios_fronteira',
+    'municipios_suframa', 'atracacoes_portuarias', 'representacoes_fiscais', 'atracacoes_resumo_mensal'
+]
+
+# Texto fixo da função nesta revisão (UUIDv7 a partir de gen_random_uuid)
+SQL_FUNCAO_UUID7 = """
+CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+BEGIN
+    -- Timestamp em ms nos 48 bits iniciais de um UUIDv4; versão 4 -> 7
+    RETURN encode(
+        set_bit(
+            set_bit(
+                overlay(uuid_send(gen_random_uuid())
+                        PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                        FROM 1 FOR 6),
+                52, 1),
+            53, 1),
+        'hex')::uuid;
+END
+$$ LANGUAGE plpgsql VOLATILE
+"""
+
+
+def upgrade() -> None:
+    """Criar uuid_generate_v7() e usá-la como default das chaves primárias."""
+    op.execute(SQL_FUNCAO_UUID7)
+
+    tabelas_existentes = set(sa.inspect(op.get_bind()).get_table_names())
+    for tabela in TABELAS:
+        if tabela in tabelas_existentes:
+            op.execute(f"ALTER TABLE {tabela} ALTER COLUMN id SET DEFAULT uuid_generate_v7()")
+
+
+def downgrade() -> None:
+    """Voltar ao default gen_random_uuid() (UUIDv4)."""
+    tabelas_existentes = set(sa.inspect(op.get_bind()).get_table_names())
+    for tabela in TABELAS:
+        if tabela in tabelas_existentes:
+            op.execute(f"ALTER TABLE {tabela} ALTER COLUMN id SET DEFAULT gen_random_uuid()")
+
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
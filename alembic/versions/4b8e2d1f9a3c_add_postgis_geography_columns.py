@@ -0,0 +1,57 @@
+"""add_postgis_geography_columns
+
+Revision ID: 4b8e2d1f9a3c
+Revises: 785d665af187
+Create Date: 2026-10-19 09:12:41.208531
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e2d1f9a3c'
+down_revision: Union[str, None] = '785d665af187'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tabelas com coordenadas: (coluna de latitude, coluna de longitude)
+TABELAS_COORDENADAS = {
+    'aerodromos_privados': ('lat_geo_point', 'lon_geo_point'),
+    'aerodromos_publicos': ('latitude', 'longitude'),
+    'atracacoes_portuarias': ('latitude', 'longitude'),
+}
+
+
+def upgrade() -> None:
+    """Adicionar colunas geography(Point,4326) geradas e índices GiST (PostGIS opcional)."""
+    conn = op.get_bind()
+
+    # PostGIS é opcional: sem a extensão no servidor, a migração não altera nada
+    disponivel = conn.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'postgis')"
+    )).scalar()
+    if not disponivel:
+        print("⏭️ Extensão PostGIS não disponível - colunas geográficas não criadas")
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+
+    tabelas_existentes = set(sa.inspect(conn).get_table_names())
+    for tabela, (lat, lon) in TABELAS_COORDENADAS.items():
+        if tabela not in tabelas_existentes:
+            continue
+
+        op.execute(
+            f"ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS geog geography(Point, 4326) "
+            f"GENERATED ALWAYS AS (CAST(ST_SetSRID(ST_MakePoint({lon}, {lat}), 4326) AS geography)) STORED"
+        )
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{tabela}_geog ON {tabela} USING GIST (geog)")
+
+
+def downgrade() -> None:
+    """Remover colunas geográficas e índices GiST."""
+    for tabela in TABELAS_COORDENADAS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{tabela}_geog")
+        op.execute(f"ALTER TABLE IF EXISTS {tabela} DROP COLUMN IF EXISTS geog")
@@ -0,0 +1,53 @@
+"""add_dataset_change_feed
+
+Revision ID: 5c8d1e7f2a36
+Revises: 1a7c3e9b5d20
+Create Date: 2026-10-19 16:32:54.618240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8d1e7f2a36'
+down_revision: Union[str, None] = '1a7c3e9b5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Criar tabelas do feed de mudanças (snapshots e mudanças)."""
+    tabelas_existentes = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'dataset_snapshots' not in tabelas_existentes:
+        op.create_table(
+            'dataset_snapshots',
+            sa.Column('tabela', sa.String(100), nullable=False, comment='Tabela de origem'),
+            sa.Column('chave', sa.Text(collation='C'), nullable=False, comment='Chave natural da linha'),
+            sa.Column('hash_conteudo', sa.String(32), nullable=False, comment='MD5 do conteúdo da linha'),
+            sa.PrimaryKeyConstraint('tabela', 'chave')
+        )
+
+    if 'dataset_changes' not in tabelas_existentes:
+        op.create_table(
+            'dataset_changes',
+            sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('uuid_generate_v7()'), nullable=False),
+            sa.Column('tabela', sa.String(100), nullable=False, comment='Tabela de origem'),
+            sa.Column('geracao', sa.Integer(), nullable=False, comment='Geração da carga que produziu a mudança'),
+            sa.Column('operacao', sa.String(20), nullable=False, comment='adicionado, removido ou alterado'),
+            sa.Column('chave', sa.Text(), nullable=False, comment='Chave natural da linha'),
+            sa.Column('hash_conteudo', sa.String(32), nullable=True, comment='MD5 do novo conteúdo'),
+            sa.Column('dados', postgresql.JSONB(), nullable=True, comment='Conteúdo atual da linha (nulo se removida)'),
+            sa.Column('detectado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_dataset_changes_tabela_geracao', 'dataset_changes', ['tabela', 'geracao'])
+
+
+def downgrade() -> None:
+    """Remover tabelas do feed de mudanças."""
+    op.execute("DROP TABLE IF EXISTS dataset_changes")
+    op.execute("DROP TABLE IF EXISTS dataset_snapshots")
@@ -0,0 +1,45 @@
+"""add_scraper_runs
+
+Revision ID: 7e4b2c9d1f58
+Revises: 5c8d1e7f2a36
+Create Date: 2026-10-19 18:05:12.301744
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4b2c9d1f58'
+down_revision: Union[str, None] = '5c8d1e7f2a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Criar histórico de execuções dos scrapers."""
+    tabelas_existentes = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'scraper_runs' not in tabelas_existentes:
+        op.create_table(
+            'scraper_runs',
+            sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('uuid_generate_v7()'), nullable=False),
+            sa.Column('execucao_id', postgresql.UUID(as_uuid=True), nullable=False, comment='Execução do run_scrapers'),
+            sa.Column('scraper', sa.String(100), nullable=False, comment='Chave do scraper (private, portos, ...)'),
+            sa.Column('sucesso', sa.Boolean(), nullable=False, comment='Scraper concluído sem erro'),
+            sa.Column('erro', sa.Text(), nullable=True, comment='Mensagem de erro, se houver'),
+            sa.Column('elapsed_time', sa.Float(), nullable=False, comment='Tempo total em segundos'),
+            sa.Column('registros', sa.Integer(), nullable=True, comment='Registros gravados'),
+            sa.Column('bytes', sa.BigInteger(), nullable=True, comment='Bytes baixados'),
+            sa.Column('etapas', postgresql.JSONB(), nullable=True, comment='Segundos por etapa (fetch, process, save, ...)'),
+            sa.Column('iniciado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_scraper_runs_scraper_iniciado_em', 'scraper_runs', ['scraper', 'iniciado_em'])
+
+
+def downgrade() -> None:
+    """Remover histórico de execuções dos scrapers."""
+    op.execute("DROP TABLE IF EXISTS scraper_runs")
@@ -0,0 +1,38 @@
+"""add_cd_mun_to_aerodromos_and_atracacoes
+
+Revision ID: 9d2c7a4e1b05
+Revises: 4b8e2d1f9a3c
+Create Date: 2026-10-19 10:03:17.562910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2c7a4e1b05'
+down_revision: Union[str, None] = '4b8e2d1f9a3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABELAS = ['aerodromos_privados', 'aerodromos_publicos', 'atracacoes_portuarias']
+
+
+def upgrade() -> None:
+    """Adicionar coluna cd_mun (código IBGE resolvido na carga) com índice."""
+    tabelas_existentes = set(sa.inspect(op.get_bind()).get_table_names())
+
+    for tabela in TABELAS:
+        if tabela not in tabelas_existentes:
+            continue
+        op.add_column(tabela, sa.Column('cd_mun', sa.String(7), nullable=True,
+                                        comment='Código IBGE do município (resolvido na carga)'))
+        op.create_index(f'ix_{tabela}_cd_mun', tabela, ['cd_mun'])
+
+
+def downgrade() -> None:
+    """Remover coluna cd_mun."""
+    for tabela in TABELAS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{tabela}_cd_mun")
+        op.execute(f"ALTER TABLE IF EXISTS {tabela} DROP COLUMN IF EXISTS cd_mun")
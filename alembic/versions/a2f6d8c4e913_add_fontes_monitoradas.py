@@ -0,0 +1,42 @@
+"""add_fontes_monitoradas
+
+Revision ID: a2f6d8c4e913
+Revises: 7e4b2c9d1f58
+Create Date: 2026-10-19 19:42:37.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2f6d8c4e913'
+down_revision: Union[str, None] = '7e4b2c9d1f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Criar estado do agendador de fontes."""
+    tabelas_existentes = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'fontes_monitoradas' not in tabelas_existentes:
+        op.create_table(
+            'fontes_monitoradas',
+            sa.Column('fonte', sa.String(100), nullable=False, comment='Fonte monitorada (maritimos, portos, ...)'),
+            sa.Column('url', sa.Text(), nullable=True, comment='Arquivo sondado'),
+            sa.Column('etag', sa.Text(), nullable=True, comment='ETag da última carga'),
+            sa.Column('last_modified', sa.Text(), nullable=True, comment='Last-Modified da última carga'),
+            sa.Column('content_length', sa.BigInteger(), nullable=True, comment='Content-Length da última carga'),
+            sa.Column('ultimo_resultado', sa.String(20), nullable=True, comment='inalterado, sucesso, falha ou falha_sonda'),
+            sa.Column('verificado_em', sa.DateTime(timezone=True), nullable=True, comment='Última sonda'),
+            sa.Column('executado_em', sa.DateTime(timezone=True), nullable=True, comment='Última execução bem-sucedida'),
+            sa.Column('proxima_verificacao', sa.DateTime(timezone=True), nullable=True, comment='Próxima sonda agendada'),
+            sa.PrimaryKeyConstraint('fonte')
+        )
+
+
+def downgrade() -> None:
+    """Remover estado do agendador de fontes."""
+    op.execute("DROP TABLE IF EXISTS fontes_monitoradas")
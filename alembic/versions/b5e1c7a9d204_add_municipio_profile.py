@@ -0,0 +1,50 @@
+"""add_municipio_profile
+
+Revision ID: b5e1c7a9d204
+Revises: a2f6d8c4e913
+Create Date: 2026-10-19 20:31:08.552917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1c7a9d204'
+down_revision: Union[str, None] = 'a2f6d8c4e913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Criar perfil denormalizado por município."""
+    tabelas_existentes = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'municipio_profile' not in tabelas_existentes:
+        op.create_table(
+            'municipio_profile',
+            sa.Column('cd_mun', sa.String(7), nullable=False, comment='Código IBGE do município'),
+            sa.Column('nm_mun', sa.Text(), nullable=True, comment='Nome do município'),
+            sa.Column('sigla_uf', sa.String(2), nullable=True, comment='Sigla da UF (derivada do cd_mun)'),
+            sa.Column('maritimo', sa.Boolean(), nullable=False, comment='Município defrontante com o mar'),
+            sa.Column('fronteira', sa.Boolean(), nullable=False, comment='Município da faixa de fronteira'),
+            sa.Column('cidade_gemea', sa.Boolean(), nullable=False, comment='Cidade gêmea'),
+            sa.Column('suframa', sa.Boolean(), nullable=False, comment='Município de zona da SUFRAMA'),
+            sa.Column('zonas_suframa', postgresql.JSONB(), nullable=False, comment='Tipos de zona da SUFRAMA'),
+            sa.Column('area_km2', sa.Float(), nullable=True, comment='Área do município em km²'),
+            sa.Column('area_int', sa.Float(), nullable=True, comment='Área na faixa de fronteira em km²'),
+            sa.Column('aerodromos_publicos', sa.Integer(), nullable=False, comment='Aeródromos públicos no município'),
+            sa.Column('aerodromos_privados', sa.Integer(), nullable=False, comment='Aeródromos privados no município'),
+            sa.Column('atracacoes_total', sa.Integer(), nullable=False, comment='Atracações no município'),
+            sa.Column('atracacoes_por_ano', postgresql.JSONB(), nullable=False, comment='Atracações por ano ({"2024": n, ...})'),
+            sa.Column('atualizado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.PrimaryKeyConstraint('cd_mun')
+        )
+        op.create_index('ix_municipio_profile_sigla_uf', 'municipio_profile', ['sigla_uf'])
+
+
+def downgrade() -> None:
+    """Remover perfil denormalizado por município."""
+    op.execute("DROP TABLE IF EXISTS municipio_profile")
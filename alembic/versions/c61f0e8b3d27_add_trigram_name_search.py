@@ -0,0 +1,100 @@
+"""add_trigram_name_search
+
+Revision ID: c61f0e8b3d27
+Revises: 9d2c7a4e1b05
+Create Date: 2026-10-19 11:26:54.904117
+
+"""
+import re
+import unicodedata
+from typing import Any, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c61f0e8b3d27'
+down_revision: Union[str, None] = '9d2c7a4e1b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tabela -> tamanho da coluna nome
+TABELAS = {
+    'aerodromos_privados': 255,
+    'aerodromos_publicos': 255,
+    'representacoes_fiscais': 500,
+}
+
+# Nomes distintos enviados por lote ao preenchimento
+TAMANHO_LOTE = 5000
+
+# Cópia fixa de municipio_resolver.normalizar_nome na data desta revisão:
+# a migration não muda se a aplicação mudar depois
+_ABREVIACOES = {'STA': 'SANTA', 'STO': 'SANTO'}
+_RE_SEPARADORES = re.compile(r"[-_/.,;:()]+")
+_RE_APOSTROFOS = re.compile(r"[\'`´’‘]")
+_RE_ESPACOS = re.compile(r"\s+")
+
+
+def _normalizar_nome(valor: Any) -> Optional[str]:
+    if valor is None:
+        return None
+
+    texto_valor = unicodedata.normalize('NFKD', str(valor))
+    texto_valor = ''.join(c for c in texto_valor if not unicodedata.combining(c))
+    texto_valor = _RE_APOSTROFOS.sub('', texto_valor).upper()
+    texto_valor = _RE_SEPARADORES.sub(' ', texto_valor)
+    palavras = [_ABREVIACOES.get(p, p) for p in _RE_ESPACOS.split(texto_valor.strip()) if p]
+
+    return ' '.join(palavras) or None
+
+
+def _preencher(bind, tabela: str, tamanho: int) -> None:
+    """Preenche nome_normalizado com a mesma normalização das cargas."""
+    nomes = bind.execute(sa.text(f"SELECT DISTINCT nome FROM {tabela} WHERE nome IS NOT NULL")).scalars().all()
+    if not nomes:
+        return
+
+    bind.execute(sa.text("CREATE TEMP TABLE _nomes_normalizados (nome text, nome_normalizado text) ON COMMIT DROP"))
+    inserir = sa.text("INSERT INTO _nomes_normalizados (nome, nome_normalizado) VALUES (:nome, :normalizado)")
+    for inicio in range(0, len(nomes), TAMANHO_LOTE):
+        bind.execute(inserir, [
+            {'nome': nome, 'normalizado': (_normalizar_nome(nome) or '')[:tamanho] or None}
+            for nome in nomes[inicio:inicio + TAMANHO_LOTE]
+        ])
+
+    bind.execute(sa.text(f"""
+        UPDATE {tabela} t SET nome_normalizado = n.nome_normalizado
+        FROM _nomes_normalizados n
+        WHERE t.nome = n.nome
+    """))
+    bind.execute(sa.text("DROP TABLE _nomes_normalizados"))
+
+
+def upgrade() -> None:
+    """Adicionar nome_normalizado com índice GIN pg_trgm."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    bind = op.get_bind()
+    tabelas_existentes = set(sa.inspect(bind).get_table_names())
+    for tabela, tamanho in TABELAS.items():
+        if tabela not in tabelas_existentes:
+            continue
+
+        op.add_column(tabela, sa.Column('nome_normalizado', sa.String(tamanho), nullable=True,
+                                        comment='Nome sem acentos em maiúsculas (busca trigram)'))
+
+        # Preenchimento inicial com a normalização das cargas (apóstrofos,
+        # pontuação, STA/STO), para as buscas acharem as linhas já existentes
+        _preencher(bind, tabela, tamanho)
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{tabela}_nome_normalizado_trgm "
+            f"ON {tabela} USING gin (nome_normalizado gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Remover nome_normalizado e índices trigram."""
+    for tabela in TABELAS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{tabela}_nome_normalizado_trgm")
+        op.execute(f"ALTER TABLE IF EXISTS {tabela} DROP COLUMN IF EXISTS nome_normalizado")
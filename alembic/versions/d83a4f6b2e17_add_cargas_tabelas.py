@@ -0,0 +1,38 @@
+"""add_cargas_tabelas
+
+Revision ID: d83a4f6b2e17
+Revises: b5e1c7a9d204
+Create Date: 2026-10-19 21:12:40.305618
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd83a4f6b2e17'
+down_revision: Union[str, None] = 'b5e1c7a9d204'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Criar controle de cargas por tabela (geração usada pelo ETag da API)."""
+    tabelas_existentes = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'cargas_tabelas' not in tabelas_existentes:
+        op.create_table(
+            'cargas_tabelas',
+            sa.Column('tabela', sa.String(100), nullable=False, comment='Nome da tabela carregada'),
+            sa.Column('geracao', sa.Integer(), nullable=False, comment='Contador incrementado a cada carga'),
+            sa.Column('total_registros', sa.Integer(), nullable=True, comment='Registros gravados na última carga'),
+            sa.Column('carregado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False,
+                      comment='Data da última carga'),
+            sa.PrimaryKeyConstraint('tabela')
+        )
+
+
+def downgrade() -> None:
+    """Remover controle de cargas por tabela."""
+    op.execute("DROP TABLE IF EXISTS cargas_tabelas")
@@ -0,0 +1,72 @@
+"""add_atracacoes_duracoes_and_resumo_mensal
+
+Revision ID: e3a9f5c17b42
+Revises: c61f0e8b3d27
+Create Date: 2026-10-19 14:21:08.114203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9f5c17b42'
+down_revision: Union[str, None] = 'c61f0e8b3d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Coluna de duração: (início, fim, comentário)
+DURACOES = {
+    'tempo_espera': ('data_chegada', 'data_atracacao', 'Chegada até atracação'),
+    'tempo_atracado': ('data_atracacao', 'data_desatracacao', 'Atracação até desatracação'),
+    'tempo_operacao': ('data_inicio_operacao', 'data_termino_operacao', 'Início até término da operação')
+}
+
+
+def upgrade() -> None:
+    """Adicionar durações das atracações e tabela de resumo mensal."""
+    tabelas_existentes = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'atracacoes_portuarias' in tabelas_existentes:
+        for coluna, (inicio, fim, comentario) in DURACOES.items():
+            op.add_column('atracacoes_portuarias', sa.Column(coluna, sa.Interval(), nullable=True, comment=comentario))
+
+        # Preencher registros existentes (durações negativas ficam nulas)
+        atribuicoes = ', '.join(
+            f"{coluna} = CASE WHEN {fim} >= {inicio} THEN {fim} - {inicio} END"
+            for coluna, (inicio, fim, _) in DURACOES.items()
+        )
+        op.execute(f"UPDATE atracacoes_portuarias SET {atribuicoes}")
+
+        for coluna in DURACOES:
+            op.create_index(f'ix_atracacoes_portuarias_{coluna}', 'atracacoes_portuarias', [coluna])
+
+    if 'atracacoes_resumo_mensal' not in tabelas_existentes:
+        colunas_metricas = [
+            sa.Column(f'{prefixo}_{metrica}_horas', sa.Float(), nullable=True)
+            for prefixo in ('espera', 'atracado', 'operacao')
+            for metrica in ('media', 'p50', 'p90')
+        ]
+        op.create_table(
+            'atracacoes_resumo_mensal',
+            sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('porto_atracacao', sa.String(200), nullable=True, comment='Nome do porto de atracação'),
+            sa.Column('mes_referencia', sa.Date(), nullable=False, comment='Primeiro dia do mês da atracação'),
+            sa.Column('tipo_operacao', sa.String(100), nullable=True, comment='Tipo de operação'),
+            sa.Column('total_atracacoes', sa.Integer(), nullable=False, comment='Quantidade de atracações'),
+            *colunas_metricas,
+            sa.Column('atualizado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_atracacoes_resumo_mensal_porto_atracacao', 'atracacoes_resumo_mensal', ['porto_atracacao'])
+        op.create_index('ix_atracacoes_resumo_mensal_mes_referencia', 'atracacoes_resumo_mensal', ['mes_referencia'])
+
+
+def downgrade() -> None:
+    """Remover resumo mensal e durações."""
+    op.execute("DROP TABLE IF EXISTS atracacoes_resumo_mensal")
+    for coluna in DURACOES:
+        op.execute(f"DROP INDEX IF EXISTS ix_atracacoes_portuarias_{coluna}")
+        op.execute(f"ALTER TABLE IF EXISTS atracacoes_portuarias DROP COLUMN IF EXISTS {coluna}")
@@ -0,0 +1,42 @@
+"""add_checkpoints_cargas
+
+Revision ID: e47c9b1d5a82
+Revises: d83a4f6b2e17
+Create Date: 2026-10-19 21:18:05.642931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e47c9b1d5a82'
+down_revision: Union[str, None] = 'd83a4f6b2e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Criar checkpoints de cargas em lotes (retomada após falha)."""
+    tabelas_existentes = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'checkpoints_cargas' not in tabelas_existentes:
+        op.create_table(
+            'checkpoints_cargas',
+            sa.Column('tabela', sa.String(100), nullable=False, comment='Tabela em carga'),
+            sa.Column('hash_arquivo', sa.String(64), nullable=False, comment='SHA-256 do arquivo bruto'),
+            sa.Column('arquivo_bruto', sa.Text(), nullable=True, comment='Caminho do arquivo bruto'),
+            sa.Column('status', sa.String(20), nullable=False, comment='em_andamento ou concluido'),
+            sa.Column('registros_gravados', sa.Integer(), nullable=False, comment='Registros já commitados'),
+            sa.Column('total_registros', sa.Integer(), nullable=True, comment='Total de registros da carga'),
+            sa.Column('indices_pendentes', sa.Text(), nullable=True, comment='Definições (JSON) dos índices removidos'),
+            sa.Column('iniciado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('atualizado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.PrimaryKeyConstraint('tabela')
+        )
+
+
+def downgrade() -> None:
+    """Remover checkpoints de cargas em lotes."""
+    op.execute("DROP TABLE IF EXISTS checkpoints_cargas")
@@ -0,0 +1,35 @@
+"""add_brin_indexes_atracacoes
+
+Revision ID: f08b6d2e4c19
+Revises: e3a9f5c17b42
+Create Date: 2026-10-19 15:02:44.806512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f08b6d2e4c19'
+down_revision: Union[str, None] = 'e3a9f5c17b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUNAS = ['data_atracacao', 'data_chegada', 'data_desatracacao', 'data_inicio_operacao', 'data_termino_operacao']
+
+
+def upgrade() -> None:
+    """Criar índices BRIN nas datas das atracações."""
+    if 'atracacoes_portuarias' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    for coluna in COLUNAS:
+        op.create_index(f'ix_atracacoes_portuarias_{coluna}_brin', 'atracacoes_portuarias', [coluna],
+                        postgresql_using='brin')
+
+
+def downgrade() -> None:
+    """Remover índices BRIN."""
+    for coluna in COLUNAS:
+        op.execute(f"DROP INDEX IF EXISTS ix_atracacoes_portuarias_{coluna}_brin")
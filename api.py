@@ -0,0 +1,356 @@
+"""
+Serviço HTTP somente leitura sobre as tabelas do Brasil Data Hub.
+
+Rotas:
+    GET /                   Lista as tabelas disponíveis e suas colunas
+    GET /<tabela>           Registros da tabela, paginados por cursor
+
+Parâmetros de /<tabela>:
+    campos=a,b,c            Projeção de colunas
+    limite=100              Registros por página (máximo 1000)
+    cursor=<token>          Token `proximo_cursor` da página anterior
+    uf, sguf, ano, codigo_oaci, cd_mun
+                            Filtros de igualdade nas colunas indexadas
+
+A paginação é por chave primária (keyset: `WHERE id > :cursor ORDER BY id`),
+sem OFFSET; no `municipio_profile` a chave é o `cd_mun`, e `?cd_mun=...`
+vira uma busca de uma linha pela chave. Cada resposta tem ETag derivado da geração da última carga da tabela
+(`cargas_tabelas`), e as respostas ficam num cache LRU em memória que é
+descartado quando a geração muda.
+
+Usage:
+    python api.py                   # Sobe em APP_HOST:APP_PORT (padrão 0.0.0.0:8000)
+    python api.py --port 8081
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import UUID
+
+from database import SessionLocal, get_cargas
+from models import Base
+from serializacao import dumps
+
+# Tabelas de controle interno não são expostas
+TABELAS_INTERNAS = {'cargas_tabelas', 'checkpoints_cargas', 'dataset_snapshots', 'scraper_runs', 'fontes_monitoradas'}
+
+# Colunas indexadas aceitas como filtro (quando existem na tabela)
+COLUNAS_FILTRO = ['uf', 'sguf', 'ano', 'codigo_oaci', 'cd_mun', 'tabela']
+
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 1000
+
+# Intervalo mínimo entre consultas à tabela de cargas (segundos)
+INTERVALO_CARGAS = float(os.getenv('API_INTERVALO_CARGAS', '1.0'))
+
+# Quantidade de respostas mantidas no cache LRU
+TAMANHO_CACHE = int(os.getenv('API_CACHE_TAMANHO', '512'))
+
+
+class ErroRequisicao(Exception):
+    """Parâmetro inválido na requisição (HTTP 400/404)."""
+
+    def __init__(self, mensagem: str, status: int = 400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class GeracoesCargas:
+    """Geração da última carga por tabela, relida no máximo a cada intervalo."""
+
+    def __init__(self, intervalo: float = INTERVALO_CARGAS):
+        self.intervalo = intervalo
+        self._geracoes: Dict[str, int] = {}
+        self._lido_em = 0.0
+        self._lock = threading.Lock()
+
+    def atual(self, tabela: str) -> int:
+        agora = time.monotonic()
+        if agora - self._lido_em >= self.intervalo:
+            with self._lock:
+                if agora - self._lido_em >= self.intervalo:
+                    try:
+                        cargas = get_cargas()
+                        self._geracoes = {t: c['geracao'] for t, c in cargas.items()}
+                    except Exception as e:
+                        print(f"⚠️ Erro ao ler cargas das tabelas: {e}")
+                    self._lido_em = agora
+        return self._geracoes.get(tabela, 0)
+
+
+class CacheRespostas:
+    """Cache LRU de respostas serializadas, invalidado pela geração da tabela."""
+
+    def __init__(self, tamanho: int = TAMANHO_CACHE):
+        self.tamanho = tamanho
+        self._itens: "OrderedDict[Tuple[str, str], Tuple[int, str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, tabela: str, chave: str, geracao: int) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            item = self._itens.get((tabela, chave))
+            if item is None or item[0] != geracao:
+                self.faltas += 1
+                return None
+            self._itens.move_to_end((tabela, chave))
+            self.acertos += 1
+            return item[1], item[2]
+
+    def guardar(self, tabela: str, chave: str, geracao: int, etag: str, corpo: bytes) -> None:
+        with self._lock:
+            # Nova carga da tabela: respostas de gerações anteriores saem do cache
+            obsoletas = [k for k, v in self._itens.items() if k[0] == tabela and v[0] != geracao]
+            for k in obsoletas:
+                del self._itens[k]
+
+            self._itens[(tabela, chave)] = (geracao, etag, corpo)
+            self._itens.move_to_end((tabela, chave))
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+
+def tabelas_publicas() -> Dict[str, Any]:
+    """Tabelas dos modelos expostas pelo serviço."""
+    return {
+        nome: tabela for nome, tabela in Base.metadata.tables.items()
+        if nome not in TABELAS_INTERNAS
+    }
+
+
+def codificar_cursor(valor: Any) -> str:
+    """Token opaco com a chave do último registro da página."""
+    return base64.urlsafe_b64encode(str(valor).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(token: str, como_uuid: bool = True) -> Any:
+    """Converte o token de volta para a chave primária."""
+    try:
+        preenchimento = '=' * (-len(token) % 4)
+        valor = base64.urlsafe_b64decode(token + preenchimento).decode('utf-8')
+        return uuid.UUID(valor) if como_uuid else valor
+    except Exception:
+        raise ErroRequisicao("Cursor inválido")
+
+
+def chave_primaria(tabela) -> Any:
+    """Coluna usada no cursor (`id`, ou a chave natural como `cd_mun`)."""
+    return list(tabela.primary_key.columns)[0]
+
+
+def preparar_consulta(nome_tabela: str, parametros: Dict[str, str]) -> Tuple[Any, List[str], Any, int]:
+    """
+    Valida a requisição e monta a consulta paginada, sem tocar o banco.
+
+    Args:
+        nome_tabela (str): Tabela dos modelos
+        parametros: Parâmetros da query string
+
+    Returns:
+        Tuple: (coluna do cursor, campos, consulta, limite)
+
+    Raises:
+        ErroRequisicao: Tabela inexistente (404) ou parâmetro inválido (400)
+    """
+    tabelas = tabelas_publicas()
+    if nome_tabela not in tabelas:
+        raise ErroRequisicao(f"Tabela '{nome_tabela}' não encontrada", status=404)
+    tabela = tabelas[nome_tabela]
+    chave = chave_primaria(tabela)
+
+    conhecidos = {'campos', 'limite', 'cursor'} | {c for c in COLUNAS_FILTRO if c in tabela.c}
+    desconhecidos = set(parametros) - conhecidos
+    if desconhecidos:
+        raise ErroRequisicao(f"Parâmetros não suportados: {', '.join(sorted(desconhecidos))}")
+
+    # Projeção (a chave primária sempre é retornada para o cursor)
+    if parametros.get('campos'):
+        campos = [c.strip() for c in parametros['campos'].split(',') if c.strip()]
+        invalidos = [c for c in campos if c not in tabela.c]
+        if invalidos:
+            raise ErroRequisicao(f"Colunas inexistentes: {', '.join(invalidos)}")
+        if chave.name not in campos:
+            campos.insert(0, chave.name)
+    else:
+        campos = [c.name for c in tabela.c]
+
+    try:
+        limite = int(parametros.get('limite', LIMITE_PADRAO))
+    except ValueError:
+        raise ErroRequisicao("Parâmetro 'limite' deve ser inteiro")
+    if limite < 1 or limite > LIMITE_MAXIMO:
+        raise ErroRequisicao(f"Parâmetro 'limite' deve estar entre 1 e {LIMITE_MAXIMO}")
+
+    consulta = select(*[tabela.c[c] for c in campos])
+
+    for coluna in COLUNAS_FILTRO:
+        if coluna in parametros and coluna in tabela.c:
+            valor: Any = parametros[coluna]
+            if coluna == 'ano':
+                try:
+                    valor = int(valor)
+                except ValueError:
+                    raise ErroRequisicao("Filtro 'ano' deve ser inteiro")
+            consulta = consulta.where(tabela.c[coluna] == valor)
+
+    if parametros.get('cursor'):
+        como_uuid = isinstance(chave.type, UUID)
+        consulta = consulta.where(chave > decodificar_cursor(parametros['cursor'], como_uuid))
+
+    # Um registro a mais indica se existe próxima página
+    consulta = consulta.order_by(chave).limit(limite + 1)
+    return chave, campos, consulta, limite
+
+
+def consultar_tabela(nome_tabela: str, parametros: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Executa a consulta paginada de uma tabela.
+
+    Args:
+        nome_tabela (str): Tabela dos modelos
+        parametros: Parâmetros da query string
+
+    Returns:
+        Dict: Registros, quantidade e cursor da próxima página
+    """
+    chave, campos, consulta, limite = preparar_consulta(nome_tabela, parametros)
+
+    with SessionLocal() as db:
+        rows = db.execute(consulta).fetchall()
+
+    tem_proxima = len(rows) > limite
+    rows = rows[:limite]
+    registros = [dict(zip(campos, row)) for row in rows]
+
+    return {
+        'tabela': nome_tabela,
+        'quantidade': len(registros),
+        'proximo_cursor': codificar_cursor(registros[-1][chave.name]) if tem_proxima else None,
+        'registros': registros
+    }
+
+
+def listar_tabelas() -> Dict[str, Any]:
+    """Catálogo das tabelas e colunas disponíveis."""
+    return {
+        'tabelas': [
+            {
+                'nome': nome,
+                'colunas': [c.name for c in tabela.c],
+                'filtros': [c for c in COLUNAS_FILTRO if c in tabela.c]
+            }
+            for nome, tabela in sorted(tabelas_publicas().items())
+        ]
+    }
+
+
+def serializar(dados: Any) -> bytes:
+    """Serializa a resposta em JSON (UUID e datas como texto, intervalos em segundos)."""
+    return dumps(dados)
+
+
+class ConsultaHandler(BaseHTTPRequestHandler):
+    """Handler HTTP somente leitura."""
+
+    server_version = 'BrasilDataHub/1.0'
+    geracoes = GeracoesCargas()
+    cache = CacheRespostas()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        caminho = url.path.strip('/')
+
+        try:
+            if not caminho:
+                self._responder(200, serializar(listar_tabelas()))
+                return
+
+            if '/' in caminho:
+                raise ErroRequisicao("Rota não encontrada", status=404)
+
+            parametros = dict(parse_qsl(url.query, keep_blank_values=False))
+            chave = '&'.join(f'{k}={v}' for k, v in sorted(parametros.items()))
+
+            # Tabela e parâmetros validados antes do ETag: requisição inválida nunca recebe 304
+            preparar_consulta(caminho, parametros)
+
+            # ETag: tabela + geração da carga + consulta normalizada
+            geracao = self.geracoes.atual(caminho)
+            etag = '"' + hashlib.sha1(f'{caminho}:{geracao}:{chave}'.encode('utf-8')).hexdigest() + '"'
+
+            # If-None-Match: * casa com qualquer representação atual
+            etags = self._etags_requisicao()
+            if '*' in etags or etag in etags:
+                self._responder(304, b'', etag=etag)
+                return
+
+            em_cache = self.cache.obter(caminho, chave, geracao)
+            if em_cache is not None:
+                self._responder(200, em_cache[1], etag=em_cache[0], cache='HIT')
+                return
+
+            corpo = serializar(consultar_tabela(caminho, parametros))
+            self.cache.guardar(caminho, chave, geracao, etag, corpo)
+            self._responder(200, corpo, etag=etag, cache='MISS')
+
+        except ErroRequisicao as e:
+            self._responder(e.status, serializar({'erro': str(e)}))
+        except Exception as e:
+            print(f"❌ Erro ao processar {self.path}: {e}")
+            self._responder(500, serializar({'erro': 'Erro interno'}))
+
+    def _etags_requisicao(self) -> List[str]:
+        cabecalho = self.headers.get('If-None-Match', '')
+        return [e.strip().removeprefix('W/') for e in cabecalho.split(',') if e.strip()]
+
+    def _responder(self, status: int, corpo: bytes, etag: Optional[str] = None, cache: Optional[str] = None):
+        self.send_response(status)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if cache:
+            self.send_header('X-Cache', cache)
+        self.end_headers()
+        if corpo and status != 304:
+            self.wfile.write(corpo)
+
+    def log_message(self, format, *args):
+        # Sem log por requisição no terminal
+        pass
+
+
+def main():
+    """Interface de linha de comando."""
+    parser = argparse.ArgumentParser(description='Serviço HTTP de consulta do Brasil Data Hub')
+    parser.add_argument('--host', default=os.getenv('APP_HOST', '0.0.0.0'), help='Endereço de escuta')
+    parser.add_argument('--port', type=int, default=int(os.getenv('APP_PORT', '8000')), help='Porta de escuta')
+    args = parser.parse_args()
+
+    servidor = ThreadingHTTPServer((args.host, args.port), ConsultaHandler)
+    print(f"🌐 Serviço de consulta em http://{args.host}:{args.port}/")
+
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Serviço interrompido pelo usuário")
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Busca rápida por nome em aeródromos e representações fiscais.
+
+Usa a coluna `nome_normalizado` (sem acentos, maiúsculas, preenchida na carga)
+com índices GIN `gin_trgm_ops` do pg_trgm, que atendem tanto `LIKE '%termo%'`
+quanto buscas tolerantes a erros de digitação por similaridade.
+
+Usage:
+    python busca.py "congonhas"                        # Busca em todas as tabelas
+    python busca.py "congonhas" --tabela aerodromos_publicos --limite 5
+    python busca.py --benchmark                        # Latência das buscas (p50/p95)
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Dict, List, Any, Optional
+
+from sqlalchemy import text
+
+from database import SessionLocal
+from municipio_resolver import normalizar_nome
+
+# Tabelas pesquisáveis: coluna exibida como nome
+TABELAS_BUSCA = {
+    'aerodromos_privados': 'nome',
+    'aerodromos_publicos': 'nome',
+    'representacoes_fiscais': 'nome'
+}
+
+SIMILARIDADE_MINIMA = 0.3
+
+# Termos usados no benchmark de latência
+TERMOS_BENCHMARK = ['fazenda', 'sao paulo', 'congonhas', 'agropecuaria', 'silva', 'aeroclube', 'santos']
+
+
+def nome_indice_trigram(tabela: str) -> str:
+    """Nome do índice GIN trigram da coluna normalizada de uma tabela."""
+    return f'ix_{tabela}_nome_normalizado_trgm'
+
+
+def garantir_indice_trigram(db, tabela: str) -> bool:
+    """
+    Garante a extensão pg_trgm e o índice GIN da coluna `nome_normalizado`.
+
+    Executado dentro de um savepoint para não abortar a transação da carga
+    quando a extensão não puder ser criada.
+
+    Returns:
+        bool: True se o índice está disponível
+    """
+    if tabela not in TABELAS_BUSCA:
+        raise ValueError(f"Tabela '{tabela}' não é pesquisável")
+
+    try:
+        with db.begin_nested():
+            db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            db.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {nome_indice_trigram(tabela)} "
+                f"ON {tabela} USING gin (nome_normalizado gin_trgm_ops)"
+            ))
+        return True
+
+    except Exception as e:
+        print(f"⚠️ Índice trigram indisponível para {tabela}: {e}")
+        return False
+
+
+def _escapar_like(termo: str) -> str:
+    """Escapa curingas do LIKE."""
+    return termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def buscar_nomes(termo: str, tabelas: Optional[List[str]] = None, limite: int = 20,
+                 similaridade_minima: float = SIMILARIDADE_MINIMA, db=None) -> List[Dict[str, Any]]:
+    """
+    Busca registros cujo nome contém o termo ou é parecido com ele.
+
+    Resultados que contêm o termo vêm primeiro; depois, ordenação por
+    similaridade trigram decrescente.
+
+    Args:
+        termo (str): Texto buscado (acentos e caixa são ignorados)
+        tabelas: Tabelas a pesquisar (padrão: todas)
+        limite (int): Máximo de resultados no total
+        similaridade_minima (float): Limiar do operador `%` do pg_trgm
+        db: Sessão opcional (uma nova é aberta se omitida)
+
+    Returns:
+        List[Dict]: Registros com tabela, id, nome e score
+    """
+    termo_normalizado = normalizar_nome(termo)
+    if not termo_normalizado:
+        return []
+
+    tabelas = tabelas or list(TABELAS_BUSCA.keys())
+    for tabela in tabelas:
+        if tabela not in TABELAS_BUSCA:
+            available = ', '.join(TABELAS_BUSCA.keys())
+            raise ValueError(f"Tabela '{tabela}' não é pesquisável. Disponíveis: {available}")
+
+    sessao = db or SessionLocal()
+    try:
+        sessao.execute(text("SELECT set_config('pg_trgm.similarity_threshold', :limiar, true)"),
+                       {'limiar': str(similaridade_minima)})
+
+        resultados = []
+        for tabela in tabelas:
+            coluna_nome = TABELAS_BUSCA[tabela]
+            rows = sessao.execute(text(f"""
+                SELECT id, {coluna_nome},
+                       nome_normalizado LIKE :padrao AS contem,
+                       similarity(nome_normalizado, :termo) AS score
+                FROM {tabela}
+                WHERE nome_normalizado LIKE :padrao OR nome_normalizado % :termo
+                ORDER BY contem DESC, score DESC, {coluna_nome}
+                LIMIT :limite
+            """), {
+                'termo': termo_normalizado,
+                'padrao': f'%{_escapar_like(termo_normalizado)}%',
+                'limite': limite
+            }).fetchall()
+
+            resultados.extend(
+                {
+                    'tabela': tabela,
+                    'id': str(row[0]),
+                    'nome': row[1],
+                    'contem_termo': bool(row[2]),
+                    'score': float(row[3])
+                }
+                for row in rows
+            )
+
+        if db is None:
+            sessao.rollback()
+
+    finally:
+        if db is None:
+            sessao.close()
+
+    resultados.sort(key=lambda r: (r['contem_termo'], r['score']), reverse=True)
+    return resultados[:limite]
+
+
+def benchmark_busca(termos: Optional[List[str]] = None, repeticoes: int = 20,
+                    limite: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Mede a latência de `buscar_nomes` por tabela, reutilizando uma sessão.
+
+    Returns:
+        Dict: Por tabela, latências p50, p95 e máxima em milissegundos
+    """
+    termos = termos or TERMOS_BENCHMARK
+    resultado = {}
+
+    with SessionLocal() as db:
+        for tabela in TABELAS_BUSCA:
+            # Aquecimento (plano e cache de páginas)
+            buscar_nomes(termos[0], [tabela], limite, db=db)
+
+            latencias = []
+            for _ in range(repeticoes):
+                for termo in termos:
+                    inicio = time.perf_counter()
+                    buscar_nomes(termo, [tabela], limite, db=db)
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+
+            latencias.sort()
+            resultado[tabela] = {
+                'consultas': len(latencias),
+                'p50_ms': statistics.median(latencias),
+                'p95_ms': latencias[int(len(latencias) * 0.95) - 1],
+                'max_ms': latencias[-1]
+            }
+        db.rollback()
+
+    return resultado
+
+
+def main():
+    """Interface de linha de comando."""
+    parser = argparse.ArgumentParser(description='Busca por nome no Brasil Data Hub')
+    parser.add_argument('termo', nargs='?', help='Texto a buscar')
+    parser.add_argument('--tabela', choices=list(TABELAS_BUSCA.keys()), action='append',
+                        help='Restringe a busca a uma tabela (pode repetir)')
+    parser.add_argument('--limite', type=int, default=20, help='Máximo de resultados')
+    parser.add_argument('--similaridade', type=float, default=SIMILARIDADE_MINIMA,
+                        help='Similaridade trigram mínima (0 a 1)')
+    parser.add_argument('--benchmark', action='store_true', help='Mede a latência das buscas')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print("⏱️ Benchmark de busca por nome...")
+        for tabela, metricas in benchmark_busca(limite=args.limite).items():
+            print(f"   {tabela}: p50={metricas['p50_ms']:.2f}ms "
+                  f"p95={metricas['p95_ms']:.2f}ms max={metricas['max_ms']:.2f}ms "
+                  f"({metricas['consultas']} consultas)")
+        return
+
+    if not args.termo:
+        parser.print_help()
+        sys.exit(1)
+
+    inicio = time.perf_counter()
+    resultados = buscar_nomes(args.termo, args.tabela, args.limite, args.similaridade)
+    elapsed_ms = (time.perf_counter() - inicio) * 1000
+
+    print(f"🔎 {len(resultados)} resultados para '{args.termo}' ({elapsed_ms:.1f}ms)")
+    for r in resultados:
+        print(f"   [{r['score']:.2f}] {r['nome']} ({r['tabela']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+"""
+Carga paralela com COPY em várias conexões.
+
+Uma conexão gravando `atracacoes_portuarias` fica presa a um único processo
+do servidor: o parse do COPY, a conversão de tipos e a escrita das páginas
+rodam em um núcleo. A carga sharded divide as linhas em N partes contíguas e
+faz COPY de cada parte por uma conexão própria, ao mesmo tempo, numa tabela
+de staging UNLOGGED (sem WAL) criada para a carga.
+
+Atomicidade: cada shard faz commit na staging, que ninguém lê, e o destino
+não é tocado durante o COPY. Só depois que todos os shards terminam, a
+transação da carga do chamador roda a preparação do destino (`preparar`:
+TRUNCATE, remoção de índices, checkpoint) e o único INSERT ... SELECT da
+staging, e o commit leva tudo junto com resumo, geração e checkpoint. Se
+qualquer shard falhar, ou a movimentação falhar, a staging é descartada e o
+destino continua com os dados anteriores: ou todos os shards entram, ou
+nenhum. Leitores do destino esperam o lock do TRUNCATE durante a
+movimentação, mas nunca veem a tabela vazia. (Two-phase commit exigiria
+`max_prepared_transactions` > 0 no servidor, o que não é o padrão.)
+
+A staging é uma tabela comum, e não TEMP, porque precisa ser visível para as
+N conexões. Stagings órfãs de execuções interrompidas são removidas na
+próxima carga da mesma tabela.
+
+Usage:
+    python carga_paralela.py --benchmark                    # COPY direto vs. N = 1..8 conexões, 300 mil linhas
+    python carga_paralela.py --benchmark --linhas 1000000 --max-conexoes 4
+"""
+
+import argparse
+import io
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Any, Optional, Sequence
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from database import get_engine
+from identificadores import gerar_uuid7
+
+load_dotenv()
+
+# Conexões simultâneas da carga (1 = caminho sequencial dos loaders)
+CARGA_PARALELA_CONEXOES = int(os.getenv('CARGA_PARALELA_CONEXOES', '4'))
+
+PREFIXO_STAGING = 'staging_'
+
+_ESCAPES_COPIA = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def formatar_valor(valor: Any) -> str:
+    """Valor no formato texto do COPY (NULL como \\N, escapes de controle)."""
+    if valor is None:
+        return '\\N'
+    if isinstance(valor, bool):
+        return 't' if valor else 'f'
+    if isinstance(valor, timedelta):
+        return f'{valor.total_seconds()} seconds'
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return str(valor).translate(_ESCAPES_COPIA)
+
+
+def _buffer_copia(linhas: Sequence[Sequence[Any]]) -> io.StringIO:
+    buffer = io.StringIO()
+    for linha in linhas:
+        buffer.write('\t'.join(map(formatar_valor, linha)))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def dividir_shards(total: int, conexoes: int) -> List[range]:
+    """Faixas contíguas de índices, uma por conexão (tamanhos diferem em no máximo 1)."""
+    conexoes = max(1, min(conexoes, total)) if total else 1
+    base, resto = divmod(total, conexoes)
+    faixas, inicio = [], 0
+    for shard in range(conexoes):
+        fim = inicio + base + (1 if shard < resto else 0)
+        faixas.append(range(inicio, fim))
+        inicio = fim
+    return faixas
+
+
+def _executar_isolado(sql: str) -> None:
+    """Executa DDL numa conexão própria, com commit imediato."""
+    with get_engine().begin() as conn:
+        conn.execute(text(sql))
+
+
+def remover_stagings_orfas(tabela: str) -> int:
+    """Remove stagings de cargas anteriores da tabela que não chegaram ao fim."""
+    with get_engine().begin() as conn:
+        orfas = conn.execute(text("""
+            SELECT tablename FROM pg_tables
+            WHERE schemaname = current_schema() AND tablename LIKE :padrao
+        """), {'padrao': f'{PREFIXO_STAGING}{tabela}_%'}).scalars().all()
+        for nome in orfas:
+            conn.execute(text(f'DROP TABLE IF EXISTS {nome}'))
+    return len(orfas)
+
+
+def criar_staging(tabela: str, colunas: Sequence[str]) -> str:
+    """Cria (e commita) a staging UNLOGGED com as colunas da carga."""
+    staging = f'{PREFIXO_STAGING}{tabela}_{uuid.uuid4().hex[:8]}'
+    _executar_isolado(
+        f"CREATE UNLOGGED TABLE {staging} AS SELECT {', '.join(colunas)} FROM {tabela} WITH NO DATA"
+    )
+    return staging
+
+
+def descartar_staging(staging: str) -> None:
+    try:
+        _executar_isolado(f'DROP TABLE IF EXISTS {staging}')
+    except Exception as e:
+        print(f"⚠️ Erro ao descartar staging {staging}: {e}")
+
+
+def _copiar_shard(staging: str, colunas: Sequence[str], linhas: Sequence[Sequence[Any]]) -> float:
+    """COPY de um shard por uma conexão própria; retorna o tempo do shard."""
+    inicio = time.perf_counter()
+    conexao = get_engine().raw_connection()
+    try:
+        cursor = conexao.cursor()
+        cursor.copy_expert(f"COPY {staging} ({', '.join(colunas)}) FROM STDIN", _buffer_copia(linhas))
+        cursor.close()
+        conexao.commit()
+    except Exception:
+        conexao.rollback()
+        raise
+    finally:
+        conexao.close()
+    return time.perf_counter() - inicio
+
+
+def copiar_shards(staging: str, colunas: Sequence[str], linhas: Sequence[Sequence[Any]],
+                  conexoes: int = CARGA_PARALELA_CONEXOES) -> Dict[str, Any]:
+    """
+    Divide as linhas em shards e faz o COPY de cada um em paralelo.
+
+    Returns:
+        Dict: Shards, tempo total e tempo de cada shard
+
+    Raises:
+        Exception: Primeiro erro de shard (a staging fica incompleta)
+    """
+    faixas = dividir_shards(len(linhas), conexoes)
+    inicio = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=len(faixas), thread_name_prefix='copia') as executor:
+        futuros = [
+            executor.submit(_copiar_shard, staging, colunas, linhas[faixa.start:faixa.stop])
+            for faixa in faixas
+        ]
+        # Espera todos antes de propagar o erro: nenhuma conexão fica escrevendo na staging
+        erros = [f.exception() for f in futuros]
+        for erro in erros:
+            if erro is not None:
+                raise erro
+        tempos = [f.result() for f in futuros]
+
+    return {
+        'shards': len(faixas),
+        'tempo_copia_s': time.perf_counter() - inicio,
+        'tempos_shards_s': tempos
+    }
+
+
+def mover_staging(db, staging: str, tabela: str, colunas: Sequence[str], ordem: Optional[str] = None) -> int:
+    """
+    Move as linhas da staging para o destino na transação do chamador e
+    descarta a staging (o DROP só vale com o commit da carga).
+    """
+    lista = ', '.join(colunas)
+    ordenacao = f' ORDER BY {ordem}' if ordem else ''
+    resultado = db.execute(text(f"INSERT INTO {tabela} ({lista}) SELECT {lista} FROM {staging}{ordenacao}"))
+    db.execute(text(f'DROP TABLE {staging}'))
+    return resultado.rowcount
+
+
+def carregar_paralelo(db, tabela: str, colunas: Sequence[str], linhas: Sequence[Sequence[Any]],
+                      conexoes: int = CARGA_PARALELA_CONEXOES, ordem: Optional[str] = None,
+                      preparar: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """
+    Carrega as linhas no destino via staging e COPY em `conexoes` conexões.
+
+    `preparar` e o INSERT no destino ficam na transação de `db`: o commit
+    continua com o chamador. Se a movimentação falhar, a transação é
+    desfeita e a staging descartada antes de propagar o erro.
+
+    Args:
+        db: Sessão SQLAlchemy da carga
+        tabela (str): Tabela de destino
+        colunas: Colunas, na ordem dos valores de cada linha
+        linhas: Tuplas de valores
+        conexoes (int): Conexões simultâneas do COPY
+        ordem (str): ORDER BY da movimentação (ex.: 'id', para manter a ordem física)
+        preparar: Executado em `db` depois do COPY e antes da movimentação
+            (ex.: TRUNCATE do destino), para entrar na mesma transação
+
+    Returns:
+        Dict: Linhas movidas, shards e tempos de cópia e movimentação
+    """
+    orfas = remover_stagings_orfas(tabela)
+    if orfas:
+        print(f"🧹 {orfas} staging(s) órfã(s) de {tabela} removida(s)")
+
+    staging = criar_staging(tabela, colunas)
+    try:
+        metricas = copiar_shards(staging, colunas, linhas, conexoes)
+    except Exception:
+        descartar_staging(staging)
+        raise
+
+    inicio = time.perf_counter()
+    try:
+        if preparar is not None:
+            preparar()
+        metricas['linhas'] = mover_staging(db, staging, tabela, colunas, ordem)
+    except Exception:
+        # Rollback antes do DROP: a transação da carga segura locks do destino
+        db.rollback()
+        descartar_staging(staging)
+        raise
+    metricas['tempo_movimento_s'] = time.perf_counter() - inicio
+    return metricas
+
+
+def _copiar_direto(destino: str, colunas: Sequence[str], linhas: Sequence[Sequence[Any]]) -> float:
+    """COPY por uma única conexão direto no destino, desfeito ao final; retorna o tempo."""
+    inicio = time.perf_counter()
+    conexao = get_engine().raw_connection()
+    try:
+        cursor = conexao.cursor()
+        cursor.copy_expert(f"COPY {destino} ({', '.join(colunas)}) FROM STDIN", _buffer_copia(linhas))
+        cursor.close()
+        return time.perf_counter() - inicio
+    finally:
+        conexao.rollback()
+        conexao.close()
+
+
+def _carga_completa(destino: str, colunas: Sequence[str], linhas: Sequence[Sequence[Any]],
+                    conexoes: int) -> Dict[str, Any]:
+    """Staging + COPY em `conexoes` conexões + movimentação, desfeita ao final."""
+    inicio = time.perf_counter()
+    staging = criar_staging(destino, colunas)
+    try:
+        metricas = copiar_shards(staging, colunas, linhas, conexoes)
+        with get_engine().connect() as conn:
+            inicio_movimento = time.perf_counter()
+            lista = ', '.join(colunas)
+            conn.execute(text(f"INSERT INTO {destino} ({lista}) SELECT {lista} FROM {staging} ORDER BY id"))
+            metricas['tempo_movimento_s'] = time.perf_counter() - inicio_movimento
+            conn.rollback()
+    finally:
+        descartar_staging(staging)
+    metricas['tempo_total_s'] = time.perf_counter() - inicio
+    return metricas
+
+
+def benchmark_conexoes(linhas: int = 300000, maximo: int = 8) -> Dict[int, Dict[str, Any]]:
+    """
+    Mede a carga de ponta a ponta (staging, COPY em N conexões e movimentação
+    para o destino) para N = 1..`maximo`, com linhas sintéticas no formato das
+    atracações, contra a referência de um COPY por uma única conexão direto
+    no destino (chave 0). Nada fica gravado; as tabelas do benchmark são
+    removidas ao final.
+    """
+    destino = 'benchmark_carga_paralela'
+    colunas = ['id', 'id_atracacao', 'porto_atracacao', 'municipio', 'data_atracacao', 'tempo_espera']
+    inicio_datas = datetime(2025, 1, 1)
+    ids = gerar_uuid7(linhas)
+    dados = [
+        (ids[i], str(1000000 + i), f'PORTO {i % 200}', f'MUNICIPIO {i % 900}',
+         inicio_datas + timedelta(minutes=i), timedelta(seconds=i % 86400))
+        for i in range(linhas)
+    ]
+
+    _executar_isolado(f"""
+        CREATE TABLE IF NOT EXISTS {destino} (
+            id uuid PRIMARY KEY,
+            id_atracacao varchar(20),
+            porto_atracacao varchar(200),
+            municipio varchar(200),
+            data_atracacao timestamptz,
+            tempo_espera interval
+        )
+    """)
+
+    resultado = {}
+    try:
+        direto = _copiar_direto(destino, colunas, dados)
+        resultado[0] = {'shards': 1, 'tempo_total_s': direto}
+
+        for conexoes in range(1, maximo + 1):
+            resultado[conexoes] = _carga_completa(destino, colunas, dados, conexoes)
+
+        for metricas in resultado.values():
+            tempo = metricas['tempo_total_s']
+            metricas['linhas_por_segundo'] = linhas / tempo if tempo > 0 else 0.0
+            metricas['ganho'] = direto / tempo if tempo > 0 else 0.0
+    finally:
+        _executar_isolado(f'DROP TABLE IF EXISTS {destino}')
+
+    return resultado
+
+
+def main():
+    """Interface de linha de comando."""
+    parser = argparse.ArgumentParser(description='Carga paralela com COPY em várias conexões')
+    parser.add_argument('--benchmark', action='store_true', help='Carga de ponta a ponta para N = 1..max conexões')
+    parser.add_argument('--linhas', type=int, default=300000, help='Linhas sintéticas do benchmark')
+    parser.add_argument('--max-conexoes', type=int, default=8, help='Maior N do benchmark')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    print(f"⏱️ Carga de {args.linhas:,} linhas (COPY + movimentação), 1 a {args.max_conexoes} conexões...")
+    resultado = benchmark_conexoes(args.linhas, args.max_conexoes)
+    direto = resultado.pop(0)
+    print(f"   COPY direto, 1 conexão: {direto['tempo_total_s']:.2f}s "
+          f"({direto['linhas_por_segundo']:,.0f} linhas/s)")
+    for conexoes, metricas in resultado.items():
+        print(f"   N={conexoes}: {metricas['tempo_total_s']:.2f}s "
+              f"(COPY {metricas['tempo_copia_s']:.2f}s + movimentação {metricas['tempo_movimento_s']:.2f}s, "
+              f"{metricas['linhas_por_segundo']:,.0f} linhas/s, {metricas['ganho']:.2f}x vs. COPY direto)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Checkpoints de cargas em lotes.
+
+Uma carga longa (ANTAQ) grava em lotes com commit a cada lote. O checkpoint
+registra, na mesma transação de cada lote, quantos registros já estão
+gravados, o hash e o caminho do arquivo bruto, e as definições dos índices
+removidos para a carga. Se o processo morrer, a próxima execução com o mesmo
+arquivo continua do último lote commitado e ainda sabe quais índices recriar.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from sqlalchemy import text
+
+from database import SessionLocal
+from downloads import sha256_arquivo
+
+STATUS_EM_ANDAMENTO = 'em_andamento'
+STATUS_CONCLUIDO = 'concluido'
+
+
+def obter_checkpoint(db, tabela: str) -> Optional[Dict[str, Any]]:
+    """Checkpoint atual da tabela, ou None."""
+    row = db.execute(text("""
+        SELECT hash_arquivo, arquivo_bruto, status, registros_gravados, total_registros, indices_pendentes
+        FROM checkpoints_cargas WHERE tabela = :tabela
+    """), {'tabela': tabela}).fetchone()
+
+    if row is None:
+        return None
+
+    return {
+        'hash_arquivo': row[0],
+        'arquivo_bruto': row[1],
+        'status': row[2],
+        'registros_gravados': row[3],
+        'total_registros': row[4],
+        'indices_pendentes': json.loads(row[5]) if row[5] else {}
+    }
+
+
+def checkpoint_pendente(tabela: str) -> Optional[Dict[str, Any]]:
+    """
+    Checkpoint em andamento cujo arquivo bruto ainda existe e confere com o
+    hash registrado; é o que permite retomar sem baixar e processar de novo.
+    """
+    try:
+        with SessionLocal() as db:
+            checkpoint = obter_checkpoint(db, tabela)
+    except Exception as e:
+        print(f"⚠️ Erro ao ler checkpoint de {tabela}: {e}")
+        return None
+
+    if not checkpoint or checkpoint['status'] != STATUS_EM_ANDAMENTO:
+        return None
+
+    caminho = checkpoint['arquivo_bruto']
+    if not caminho or not Path(caminho).is_file():
+        return None
+    if sha256_arquivo(caminho) != checkpoint['hash_arquivo']:
+        return None
+
+    return checkpoint
+
+
+def iniciar_checkpoint(db, tabela: str, hash_arquivo_bruto: str, arquivo_bruto: Optional[str],
+                       total_registros: int, indices_pendentes: Dict[str, str]) -> None:
+    """Registra o início de uma carga (na transação do TRUNCATE)."""
+    db.execute(text("""
+        INSERT INTO checkpoints_cargas (
+            tabela, hash_arquivo, arquivo_bruto, status, registros_gravados,
+            total_registros, indices_pendentes, iniciado_em, atualizado_em
+        )
+        VALUES (:tabela, :hash, :arquivo, :status, 0, :total, :indices, now(), now())
+        ON CONFLICT (tabela) DO UPDATE SET
+            hash_arquivo = EXCLUDED.hash_arquivo,
+            arquivo_bruto = EXCLUDED.arquivo_bruto,
+            status = EXCLUDED.status,
+            registros_gravados = 0,
+            total_registros = EXCLUDED.total_registros,
+            indices_pendentes = EXCLUDED.indices_pendentes,
+            iniciado_em = now(),
+            atualizado_em = now()
+    """), {
+        'tabela': tabela,
+        'hash': hash_arquivo_bruto,
+        'arquivo': arquivo_bruto,
+        'status': STATUS_EM_ANDAMENTO,
+        'total': total_registros,
+        'indices': json.dumps(indices_pendentes, ensure_ascii=False)
+    })
+
+
+def avancar_checkpoint(db, tabela: str, registros_gravados: int) -> None:
+    """Atualiza o progresso; chamar antes do commit de cada lote."""
+    db.execute(text("""
+        UPDATE checkpoints_cargas
+        SET registros_gravados = :registros, atualizado_em = now()
+        WHERE tabela = :tabela
+    """), {'tabela': tabela, 'registros': registros_gravados})
+
+
+def concluir_checkpoint(db, tabela: str) -> None:
+    """
+    Marca os dados como completamente gravados. Os índices continuam
+    pendentes até `limpar_indices_pendentes`, chamado após a reconstrução.
+    """
+    db.execute(text("""
+        UPDATE checkpoints_cargas
+        SET status = :status, atualizado_em = now()
+        WHERE tabela = :tabela
+    """), {'tabela': tabela, 'status': STATUS_CONCLUIDO})
+
+
+def limpar_indices_pendentes(tabela: str) -> None:
+    """Registra que os índices removidos para a carga foram recriados."""
+    with SessionLocal() as db:
+        db.execute(text("""
+            UPDATE checkpoints_cargas
+            SET indices_pendentes = NULL, atualizado_em = now()
+            WHERE tabela = :tabela
+        """), {'tabela': tabela})
+        db.commit()
+
+
+def arquivos_pendentes() -> List[str]:
+    """Arquivos brutos de cargas em andamento (não devem ser apagados)."""
+    try:
+        with SessionLocal() as db:
+            rows = db.execute(text(
+                "SELECT arquivo_bruto FROM checkpoints_cargas WHERE status = :status AND arquivo_bruto IS NOT NULL"
+            ), {'status': STATUS_EM_ANDAMENTO}).fetchall()
+        return [row[0] for row in rows]
+    except Exception:
+        return []
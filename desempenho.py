@@ -0,0 +1,249 @@
+"""
+Histórico de desempenho dos scrapers e detecção de regressões.
+
+Cada execução do `run_scrapers.py` grava uma linha por scraper em
+`scraper_runs`: tempo total, registros, bytes baixados e o tempo de cada
+etapa (fetch, process, save, stats, cleanup). Depois, o tempo atual de cada
+scraper e de cada etapa é comparado com as últimas `REGRESSAO_JANELA`
+execuções bem-sucedidas. A linha de base é a mediana, e a dispersão é o MAD
+(desvio absoluto mediano), que não é arrastado por uma noite ruim isolada.
+
+Há regressão quando o tempo atual passa da mediana por mais que o maior de:
+    - REGRESSAO_LIMIAR_MAD × MAD normalizado (1,4826 × MAD ≈ desvio padrão)
+    - REGRESSAO_LIMIAR_RELATIVO × mediana
+    - REGRESSAO_MIN_SEGUNDOS
+O limite relativo e o mínimo absoluto evitam alarmes quando o MAD é zero ou
+quando a etapa dura frações de segundo.
+
+Usage:
+    python desempenho.py --scraper portos          # Últimas execuções do ANTAQ
+    python desempenho.py --linha-base               # Mediana/MAD por scraper e etapa
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from typing import Dict, List, Any, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from database import SessionLocal
+from identificadores import gerar_uuid7
+
+load_dotenv()
+
+REGRESSAO_JANELA = int(os.getenv('REGRESSAO_JANELA', '20'))
+REGRESSAO_MIN_AMOSTRAS = int(os.getenv('REGRESSAO_MIN_AMOSTRAS', '5'))
+REGRESSAO_LIMIAR_MAD = float(os.getenv('REGRESSAO_LIMIAR_MAD', '3.0'))
+REGRESSAO_LIMIAR_RELATIVO = float(os.getenv('REGRESSAO_LIMIAR_RELATIVO', '0.25'))
+REGRESSAO_MIN_SEGUNDOS = float(os.getenv('REGRESSAO_MIN_SEGUNDOS', '1.0'))
+
+# MAD × 1,4826 estima o desvio padrão de uma distribuição normal
+FATOR_MAD = 1.4826
+
+ETAPA_TOTAL = 'total'
+
+
+class Cronometro:
+    """
+    Tempo por etapa de um `run()`, no estilo volta de cronômetro: cada
+    `marcar(etapa)` registra o tempo desde a marca anterior.
+    """
+
+    def __init__(self):
+        self.tempos: Dict[str, float] = {}
+        self._ultimo = time.perf_counter()
+
+    def marcar(self, etapa: str) -> float:
+        agora = time.perf_counter()
+        duracao = agora - self._ultimo
+        self.tempos[etapa] = self.tempos.get(etapa, 0.0) + duracao
+        self._ultimo = agora
+        return duracao
+
+
+def _linha_base(db, execucao_id: Optional[uuid.UUID], janela: int) -> Dict[tuple, Dict[str, Any]]:
+    """Mediana e MAD das últimas execuções bem-sucedidas, por (scraper, etapa)."""
+    rows = db.execute(text("""
+        WITH tempos AS (
+            SELECT r.scraper, r.iniciado_em, :total AS etapa, r.elapsed_time AS segundos
+            FROM scraper_runs r
+            WHERE r.sucesso AND r.execucao_id IS DISTINCT FROM :execucao_id
+            UNION ALL
+            SELECT r.scraper, r.iniciado_em, e.key, e.value::float
+            FROM scraper_runs r, jsonb_each_text(r.etapas) e
+            WHERE r.sucesso AND r.execucao_id IS DISTINCT FROM :execucao_id
+        ),
+        janela AS (
+            SELECT scraper, etapa, segundos
+            FROM (
+                SELECT *, row_number() OVER (PARTITION BY scraper, etapa ORDER BY iniciado_em DESC) AS n
+                FROM tempos
+            ) t
+            WHERE n <= :janela
+        ),
+        medianas AS (
+            SELECT scraper, etapa, count(*) AS amostras,
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY segundos) AS mediana
+            FROM janela
+            GROUP BY scraper, etapa
+        )
+        SELECT m.scraper, m.etapa, m.amostras, m.mediana,
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY abs(j.segundos - m.mediana)) AS mad
+        FROM medianas m
+        JOIN janela j ON j.scraper = m.scraper AND j.etapa = m.etapa
+        GROUP BY m.scraper, m.etapa, m.amostras, m.mediana
+    """), {'total': ETAPA_TOTAL, 'execucao_id': execucao_id, 'janela': janela}).fetchall()
+
+    return {
+        (row[0], row[1]): {'amostras': row[2], 'mediana': row[3], 'mad': row[4]}
+        for row in rows
+    }
+
+
+def limite_regressao(mediana: float, mad: float) -> float:
+    """Tempo acima do qual a execução é considerada regressão."""
+    return mediana + max(
+        REGRESSAO_LIMIAR_MAD * FATOR_MAD * mad,
+        REGRESSAO_LIMIAR_RELATIVO * mediana,
+        REGRESSAO_MIN_SEGUNDOS
+    )
+
+
+def registrar_execucao(execucao_id: uuid.UUID, resultados: Dict[str, Dict[str, Any]]) -> int:
+    """
+    Grava em `scraper_runs` o resultado de cada scraper da execução.
+
+    Args:
+        execucao_id (UUID): Identificador comum a todos os scrapers da execução
+        resultados (Dict): Resultados do run_scrapers, por chave do scraper
+
+    Returns:
+        int: Linhas gravadas
+    """
+    linhas = [
+        {
+            'id': id_linha,
+            'execucao_id': execucao_id,
+            'scraper': scraper,
+            'sucesso': bool(resultado.get('success')),
+            'erro': resultado.get('error'),
+            'elapsed_time': resultado.get('execution_time', resultado.get('elapsed_time', 0.0)),
+            'registros': resultado.get('saved_count'),
+            'bytes': resultado.get('bytes'),
+            'etapas': json.dumps(resultado['etapas']) if resultado.get('etapas') else None
+        }
+        for (scraper, resultado), id_linha in zip(resultados.items(), gerar_uuid7(len(resultados)))
+    ]
+    if not linhas:
+        return 0
+
+    with SessionLocal() as db:
+        db.execute(text("""
+            INSERT INTO scraper_runs
+                (id, execucao_id, scraper, sucesso, erro, elapsed_time, registros, bytes, etapas)
+            VALUES
+                (:id, :execucao_id, :scraper, :sucesso, :erro, :elapsed_time, :registros, :bytes,
+                 CAST(:etapas AS jsonb))
+        """), linhas)
+        db.commit()
+
+    return len(linhas)
+
+
+def detectar_regressoes(execucao_id: uuid.UUID, resultados: Dict[str, Dict[str, Any]],
+                        janela: int = REGRESSAO_JANELA) -> List[Dict[str, Any]]:
+    """
+    Compara os tempos da execução com a linha de base de cada scraper e etapa.
+
+    Só scrapers bem-sucedidos são avaliados, e só contra linhas de base com
+    pelo menos `REGRESSAO_MIN_AMOSTRAS` execuções anteriores.
+
+    Returns:
+        List[Dict]: Regressões, da maior para a menor razão sobre a mediana
+    """
+    with SessionLocal() as db:
+        base = _linha_base(db, execucao_id, janela)
+
+    regressoes = []
+    for scraper, resultado in resultados.items():
+        if not resultado.get('success'):
+            continue
+
+        tempos = {ETAPA_TOTAL: resultado.get('execution_time', resultado.get('elapsed_time'))}
+        tempos.update(resultado.get('etapas') or {})
+
+        for etapa, segundos in tempos.items():
+            referencia = base.get((scraper, etapa))
+            if segundos is None or referencia is None or referencia['amostras'] < REGRESSAO_MIN_AMOSTRAS:
+                continue
+
+            limite = limite_regressao(referencia['mediana'], referencia['mad'])
+            if segundos > limite:
+                regressoes.append({
+                    'scraper': scraper,
+                    'etapa': etapa,
+                    'segundos': segundos,
+                    'mediana': referencia['mediana'],
+                    'mad': referencia['mad'],
+                    'limite': limite,
+                    'amostras': referencia['amostras'],
+                    'razao': segundos / referencia['mediana'] if referencia['mediana'] else None
+                })
+
+    regressoes.sort(key=lambda r: r['razao'] or 0, reverse=True)
+    return regressoes
+
+
+def historico(scraper: str, limite: int = 20) -> List[Dict[str, Any]]:
+    """Últimas execuções de um scraper."""
+    with SessionLocal() as db:
+        rows = db.execute(text("""
+            SELECT iniciado_em, sucesso, elapsed_time, registros, bytes, etapas, erro
+            FROM scraper_runs
+            WHERE scraper = :scraper
+            ORDER BY iniciado_em DESC
+            LIMIT :limite
+        """), {'scraper': scraper, 'limite': limite}).fetchall()
+
+    return [
+        {
+            'iniciado_em': row[0].isoformat() if row[0] else None,
+            'sucesso': row[1],
+            'elapsed_time': row[2],
+            'registros': row[3],
+            'bytes': row[4],
+            'etapas': row[5],
+            'erro': row[6]
+        }
+        for row in rows
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Histórico de desempenho dos scrapers')
+    parser.add_argument('--scraper', help='Lista as últimas execuções do scraper')
+    parser.add_argument('--limite', type=int, default=20, help='Execuções listadas')
+    parser.add_argument('--linha-base', action='store_true', help='Mediana, MAD e limite por scraper e etapa')
+    args = parser.parse_args()
+
+    if args.scraper:
+        print(json.dumps(historico(args.scraper, args.limite), indent=2, ensure_ascii=False, default=str))
+    elif args.linha_base:
+        with SessionLocal() as db:
+            base = _linha_base(db, None, REGRESSAO_JANELA)
+        print(f"{'scraper':<32} {'etapa':<10} {'n':>4} {'mediana':>10} {'MAD':>8} {'limite':>10}")
+        for (scraper, etapa), ref in sorted(base.items()):
+            print(f"{scraper:<32} {etapa:<10} {ref['amostras']:>4} {ref['mediana']:>9.2f}s "
+                  f"{ref['mad']:>7.2f}s {limite_regressao(ref['mediana'], ref['mad']):>9.2f}s")
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Downloads retomáveis e segmentados dos arquivos de origem.
+
+O arquivo é gravado em disco em blocos (`<destino>.part`) em vez de ficar
+inteiro em memória. Uma conexão que cai no meio é retomada com `Range` a
+partir do último byte recebido. Quando o servidor aceita faixas e o arquivo
+é grande, ele é baixado em segmentos paralelos. Antes de ser entregue ao
+parser, o arquivo tem o tamanho conferido com o `Content-Length` e o SHA-256
+calculado (e comparado, se informado).
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HTTP_TIMEOUT = int(os.getenv('HTTP_TIMEOUT', '30'))
+MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
+RETRY_DELAY = float(os.getenv('RETRY_DELAY', '5'))
+
+# Segmentos paralelos para arquivos grandes
+DOWNLOAD_SEGMENTOS = int(os.getenv('DOWNLOAD_SEGMENTOS', '4'))
+TAMANHO_MINIMO_SEGMENTADO = 16 * 1024 * 1024
+
+TAMANHO_BLOCO = 1024 * 1024
+
+# Sem compressão de transporte: o tamanho em disco deve bater com o Content-Length
+HEADERS_DOWNLOAD = {'Accept-Encoding': 'identity'}
+
+
+class ErroDownload(Exception):
+    """Download incompleto ou com tamanho/checksum divergente."""
+
+
+def _tamanho(caminho: str) -> int:
+    return os.path.getsize(caminho) if os.path.exists(caminho) else 0
+
+
+def _sondar(session: requests.Session, url: str, timeout: int) -> Tuple[Optional[int], bool, str]:
+    """HEAD: tamanho, suporte a faixas e content-type (None/False se indisponível)."""
+    try:
+        response = session.head(url, headers=HEADERS_DOWNLOAD, timeout=timeout, allow_redirects=True)
+        response.raise_for_status()
+    except requests.RequestException:
+        return None, False, ''
+
+    tamanho = response.headers.get('Content-Length')
+    aceita_ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+    return (int(tamanho) if tamanho and tamanho.isdigit() else None), aceita_ranges, \
+        response.headers.get('Content-Type', '')
+
+
+def sondar_alteracao(url: str, anterior: Optional[Dict[str, Any]] = None,
+                     session: Optional[requests.Session] = None, timeout: int = HTTP_TIMEOUT) -> Dict[str, Any]:
+    """
+    Verifica, sem baixar o corpo, se o arquivo mudou desde `anterior`.
+
+    Envia um HEAD condicional (`If-None-Match`/`If-Modified-Since`). Um 304
+    indica arquivo inalterado. Num 200, compara ETag, Last-Modified e
+    Content-Length com os valores anteriores. Se o servidor recusar HEAD, usa
+    um GET condicional fechado logo após os cabeçalhos.
+
+    Args:
+        url (str): Endereço do arquivo
+        anterior (Dict): Validadores da última carga (etag, last_modified, content_length)
+
+    Returns:
+        Dict: alterado (True/False, ou None se a sonda falhou), validadores atuais e status HTTP
+    """
+    session = session or requests.Session()
+    anterior = anterior or {}
+
+    headers = dict(HEADERS_DOWNLOAD)
+    if anterior.get('etag'):
+        headers['If-None-Match'] = anterior['etag']
+    if anterior.get('last_modified'):
+        headers['If-Modified-Since'] = anterior['last_modified']
+
+    try:
+        response = session.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+        if response.status_code in (403, 405, 501):
+            with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+                pass
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.RequestException as e:
+        return {'alterado': None, 'status': None, 'erro': str(e)}
+
+    if response.status_code == 304:
+        return {
+            'alterado': False,
+            'status': 304,
+            'etag': anterior.get('etag'),
+            'last_modified': anterior.get('last_modified'),
+            'content_length': anterior.get('content_length')
+        }
+
+    tamanho = response.headers.get('Content-Length')
+    atual = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_length': int(tamanho) if tamanho and tamanho.isdigit() else None
+    }
+
+    comparaveis = [chave for chave, valor in atual.items() if valor is not None and anterior.get(chave) is not None]
+    if comparaveis:
+        alterado = any(atual[chave] != anterior[chave] for chave in comparaveis)
+    else:
+        # Sem validadores em comum não há como provar que não mudou
+        alterado = True
+
+    return {'alterado': alterado, 'status': response.status_code, **atual}
+
+
+def _baixar_faixa(session: requests.Session, url: str, caminho: str, inicio: int, fim: Optional[int],
+                  timeout: int, max_retries: int, retry_delay: float) -> None:
+    """
+    Baixa os bytes [inicio, fim] (fim inclusivo; None = até o final) em
+    `caminho`, retomando do que já foi gravado a cada nova tentativa.
+    """
+    esperado = None if fim is None else fim - inicio + 1
+
+    for tentativa in range(max_retries + 1):
+        recebido = _tamanho(caminho)
+        if esperado is not None and recebido >= esperado:
+            return
+
+        headers = dict(HEADERS_DOWNLOAD)
+        posicao = inicio + recebido
+        if posicao > 0 or fim is not None:
+            headers['Range'] = f"bytes={posicao}-{'' if fim is None else fim}"
+
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+
+                modo = 'ab'
+                if 'Range' in headers and response.status_code != 206:
+                    # Servidor ignorou o Range: só dá para recomeçar do zero
+                    if inicio > 0:
+                        raise ErroDownload("Servidor não respeitou o Range do segmento")
+                    modo = 'wb'
+
+                with open(caminho, modo) as f:
+                    for bloco in response.iter_content(TAMANHO_BLOCO):
+                        f.write(bloco)
+
+            if esperado is None or _tamanho(caminho) >= esperado:
+                return
+            motivo = f"conexão encerrada com {_tamanho(caminho):,} de {esperado:,} bytes"
+
+        except (requests.RequestException, OSError) as e:
+            motivo = str(e)
+
+        if tentativa < max_retries:
+            espera = retry_delay * (tentativa + 1)
+            print(f"⚠️ Download interrompido ({motivo}); retomando em {espera:.0f}s "
+                  f"(tentativa {tentativa + 1}/{max_retries})")
+            time.sleep(espera)
+
+    raise ErroDownload(f"Download incompleto após {max_retries + 1} tentativas: {motivo}")
+
+
+def sha256_arquivo(caminho: str) -> str:
+    """SHA-256 de um arquivo, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO), b''):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def baixar_arquivo(url: str, destino: str, session: Optional[requests.Session] = None,
+                   timeout: int = HTTP_TIMEOUT, max_retries: int = MAX_RETRIES,
+                   retry_delay: float = RETRY_DELAY, segmentos: int = DOWNLOAD_SEGMENTOS,
+                   sha256: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Baixa `url` para `destino` com retomada e, se possível, em segmentos.
+
+    Args:
+        url (str): Endereço do arquivo
+        destino (str): Caminho final (o arquivo só aparece após a verificação)
+        session: Sessão HTTP do scraper (headers e cookies reaproveitados)
+        timeout (int): Timeout de conexão/leitura por requisição (segundos)
+        max_retries (int): Tentativas extras por faixa após falhas
+        retry_delay (float): Espera base entre tentativas (segundos)
+        segmentos (int): Segmentos paralelos para arquivos grandes
+        sha256 (str): Checksum esperado (opcional)
+
+    Returns:
+        Dict: Arquivo, bytes, sha256, segmentos, content_type e tempo
+    """
+    session = session or requests.Session()
+    start_time = time.time()
+
+    tamanho, aceita_ranges, content_type = _sondar(session, url, timeout)
+    parcial = f'{destino}.part'
+    Path(destino).parent.mkdir(parents=True, exist_ok=True)
+
+    usar_segmentos = (
+        aceita_ranges and tamanho is not None and segmentos > 1 and tamanho >= TAMANHO_MINIMO_SEGMENTADO
+    )
+    quantidade = segmentos if usar_segmentos else 1
+    partes = [f'{parcial}{i}' for i in range(quantidade)] if usar_segmentos else [parcial]
+    for parte in partes:
+        if os.path.exists(parte):
+            os.remove(parte)
+
+    try:
+        if usar_segmentos:
+            tamanho_segmento = -(-tamanho // quantidade)
+            faixas = [
+                (i * tamanho_segmento, min((i + 1) * tamanho_segmento, tamanho) - 1)
+                for i in range(quantidade)
+            ]
+            print(f"⬇️ Baixando {tamanho / (1024 * 1024):.1f} MB em {quantidade} segmentos...")
+            with ThreadPoolExecutor(max_workers=quantidade) as executor:
+                futuros = [
+                    executor.submit(_baixar_faixa, session, url, parte, inicio, fim,
+                                    timeout, max_retries, retry_delay)
+                    for parte, (inicio, fim) in zip(partes, faixas)
+                ]
+                for futuro in futuros:
+                    futuro.result()
+
+            # Junta os segmentos na ordem
+            with open(parcial, 'wb') as saida:
+                for parte in partes:
+                    with open(parte, 'rb') as entrada:
+                        for bloco in iter(lambda: entrada.read(TAMANHO_BLOCO), b''):
+                            saida.write(bloco)
+                    os.remove(parte)
+        else:
+            fim = tamanho - 1 if (aceita_ranges and tamanho) else None
+            _baixar_faixa(session, url, parcial, 0, fim, timeout, max_retries, retry_delay)
+
+        recebido = _tamanho(parcial)
+        if tamanho is not None and recebido != tamanho:
+            raise ErroDownload(f"Tamanho divergente: {recebido:,} bytes recebidos, {tamanho:,} esperados")
+
+        checksum = sha256_arquivo(parcial)
+        if sha256 and checksum.lower() != sha256.lower():
+            raise ErroDownload(f"Checksum divergente: {checksum} (esperado {sha256})")
+
+        os.replace(parcial, destino)
+
+    except Exception:
+        for parte in set(partes + [parcial]):
+            if os.path.exists(parte):
+                os.remove(parte)
+        raise
+
+    elapsed_time = time.time() - start_time
+    print(f"✅ Download concluído: {recebido:,} bytes em {elapsed_time:.2f}s "
+          f"({recebido / (1024 * 1024) / elapsed_time if elapsed_time > 0 else 0:.1f} MB/s)")
+
+    return {
+        'arquivo': destino,
+        'bytes': recebido,
+        'sha256': checksum,
+        'segmentos': quantidade,
+        'content_type': content_type,
+        'elapsed_time': elapsed_time
+    }
@@ -0,0 +1,267 @@
+"""
+Exportação em streaming de qualquer tabela para CSV, NDJSON ou Parquet.
+
+Os registros são lidos por cursor no servidor (`yield_per`) e gravados lote a
+lote, com memória constante independentemente do tamanho da tabela. Para CSV
+também há o caminho `COPY ... TO STDOUT`, que delega a serialização ao
+PostgreSQL.
+
+Usage:
+    python exportar.py atracacoes_portuarias --formato csv
+    python exportar.py atracacoes_portuarias --formato parquet --campos id_atracacao,porto_atracacao,ano
+    python exportar.py atracacoes_portuarias --formato ndjson --filtro sguf=PA --filtro ano=2025
+    python exportar.py atracacoes_portuarias --formato csv --copy
+"""
+
+import argparse
+import csv
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from sqlalchemy import select, Boolean, Integer, Float, DateTime, Interval
+from sqlalchemy.dialects import postgresql
+
+from database import get_engine, SessionLocal
+from models import Base
+from serializacao import converter_padrao, dumps, dumps_texto
+
+FORMATOS = ['csv', 'ndjson', 'parquet']
+
+TAMANHO_LOTE = 10000
+
+# Intervalo entre mensagens de progresso (registros)
+INTERVALO_PROGRESSO = 100000
+
+
+def _montar_consulta(nome_tabela: str, campos: Optional[List[str]], filtros: Optional[Dict[str, str]]):
+    """Monta o SELECT com projeção e filtros de igualdade."""
+    if nome_tabela not in Base.metadata.tables:
+        available = ', '.join(sorted(Base.metadata.tables.keys()))
+        raise ValueError(f"Tabela '{nome_tabela}' não encontrada. Disponíveis: {available}")
+    tabela = Base.metadata.tables[nome_tabela]
+
+    campos = campos or [c.name for c in tabela.c]
+    invalidos = [c for c in campos + list((filtros or {}).keys()) if c not in tabela.c]
+    if invalidos:
+        raise ValueError(f"Colunas inexistentes em {nome_tabela}: {', '.join(invalidos)}")
+
+    consulta = select(*[tabela.c[c] for c in campos])
+    for coluna, valor in (filtros or {}).items():
+        if isinstance(tabela.c[coluna].type, Integer):
+            valor = int(valor)
+        elif isinstance(tabela.c[coluna].type, Float):
+            valor = float(valor)
+        consulta = consulta.where(tabela.c[coluna] == valor)
+
+    return consulta, [tabela.c[c] for c in campos]
+
+
+def _valor_texto(valor: Any) -> Optional[str]:
+    """
+    Valor de uma coluna texto: JSONB (dict/list) e booleanos em JSON;
+    datetime, intervalo (segundos), Decimal e UUID como na serialização JSON.
+    """
+    if valor is None or isinstance(valor, str):
+        return valor
+    if isinstance(valor, (dict, list, tuple, bool)):
+        return dumps_texto(valor)
+    if isinstance(valor, (int, float)):
+        return str(valor)
+    return str(converter_padrao(valor))
+
+
+def _valor_csv(valor: Any) -> Any:
+    """JSONB (dict/list) em JSON; os demais valores como o módulo csv grava."""
+    return dumps_texto(valor) if isinstance(valor, (dict, list)) else valor
+
+
+class _EscritorCSV:
+    def __init__(self, destino: Path, campos: List[str]):
+        self.arquivo = open(destino, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.arquivo)
+        self.writer.writerow(campos)
+
+    def escrever(self, linhas: List[Any]) -> None:
+        self.writer.writerows([_valor_csv(valor) for valor in linha] for linha in linhas)
+
+    def fechar(self) -> None:
+        self.arquivo.close()
+
+
+class _EscritorNDJSON:
+    def __init__(self, destino: Path, campos: List[str]):
+        self.arquivo = open(destino, 'wb')
+        self.campos = campos
+
+    def escrever(self, linhas: List[Any]) -> None:
+        self.arquivo.writelines(
+            dumps(dict(zip(self.campos, linha))) + b'\n'
+            for linha in linhas
+        )
+
+    def fechar(self) -> None:
+        self.arquivo.close()
+
+
+class _EscritorParquet:
+    def __init__(self, destino: Path, colunas: List[Any]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Exportação Parquet requer o pacote 'pyarrow' (pip install pyarrow)")
+
+        self.pa = pa
+        self.campos = [c.name for c in colunas]
+        self.tipos = []
+        for coluna in colunas:
+            if isinstance(coluna.type, Integer):
+                tipo = pa.int64()
+            elif isinstance(coluna.type, Float):
+                tipo = pa.float64()
+            elif isinstance(coluna.type, DateTime):
+                tipo = pa.timestamp('us', tz='UTC' if coluna.type.timezone else None)
+            elif isinstance(coluna.type, Interval):
+                tipo = pa.duration('us')
+            elif isinstance(coluna.type, Boolean):
+                tipo = pa.bool_()
+            else:
+                tipo = pa.string()
+            self.tipos.append(tipo)
+
+        self.schema = pa.schema(list(zip(self.campos, self.tipos)))
+        self.writer = pq.ParquetWriter(str(destino), self.schema, compression='zstd')
+
+    def escrever(self, linhas: List[Any]) -> None:
+        arrays = []
+        for i, tipo in enumerate(self.tipos):
+            valores = [linha[i] for linha in linhas]
+            if tipo == self.pa.string():
+                valores = [_valor_texto(v) for v in valores]
+            arrays.append(self.pa.array(valores, type=tipo))
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def fechar(self) -> None:
+        self.writer.close()
+
+
+def exportar_tabela(nome_tabela: str, destino: Optional[str] = None, formato: str = 'csv',
+                    campos: Optional[List[str]] = None, filtros: Optional[Dict[str, str]] = None,
+                    tamanho_lote: int = TAMANHO_LOTE, usar_copy: bool = False) -> Dict[str, Any]:
+    """
+    Exporta uma tabela em streaming.
+
+    Args:
+        nome_tabela (str): Tabela dos modelos
+        destino (str): Arquivo de saída (padrão: data/exports/<tabela>_<timestamp>.<formato>)
+        formato (str): csv, ndjson ou parquet
+        campos: Colunas exportadas (padrão: todas)
+        filtros: Filtros de igualdade {coluna: valor}
+        tamanho_lote (int): Registros por lote lido do cursor
+        usar_copy (bool): Para CSV, usa COPY ... TO STDOUT
+
+    Returns:
+        Dict: Arquivo, registros, tempo e registros/segundo
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato '{formato}' inválido. Disponíveis: {', '.join(FORMATOS)}")
+    if usar_copy and formato != 'csv':
+        raise ValueError("COPY TO STDOUT só está disponível para CSV")
+
+    consulta, colunas = _montar_consulta(nome_tabela, campos, filtros)
+    nomes_campos = [c.name for c in colunas]
+
+    if destino is None:
+        Path('data/exports').mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        destino = f'data/exports/{nome_tabela}_{timestamp}.{formato}'
+    destino_path = Path(destino)
+
+    print(f"📤 Exportando {nome_tabela} para {destino_path} ({formato})...")
+    start_time = time.time()
+    total = 0
+
+    if usar_copy:
+        sql = str(consulta.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+        conexao = get_engine().raw_connection()
+        try:
+            with open(destino_path, 'w', encoding='utf-8', newline='') as f:
+                cursor = conexao.cursor()
+                cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER true)", f)
+                total = cursor.rowcount
+                cursor.close()
+            conexao.rollback()
+        finally:
+            conexao.close()
+    else:
+        if formato == 'csv':
+            escritor = _EscritorCSV(destino_path, nomes_campos)
+        elif formato == 'ndjson':
+            escritor = _EscritorNDJSON(destino_path, nomes_campos)
+        else:
+            escritor = _EscritorParquet(destino_path, colunas)
+
+        try:
+            with SessionLocal() as db:
+                # yield_per ativa cursor no servidor: só um lote fica em memória
+                resultado = db.execute(consulta.execution_options(yield_per=tamanho_lote))
+                proximo_progresso = INTERVALO_PROGRESSO
+                for lote in resultado.partitions():
+                    escritor.escrever(lote)
+                    total += len(lote)
+                    if total >= proximo_progresso:
+                        elapsed = time.time() - start_time
+                        print(f"   📊 {total:,} registros ({total / elapsed:,.0f} registros/s)")
+                        proximo_progresso += INTERVALO_PROGRESSO
+                db.rollback()
+        finally:
+            escritor.fechar()
+
+    elapsed_time = time.time() - start_time
+    taxa = total / elapsed_time if elapsed_time > 0 else 0.0
+
+    print(f"✅ {total:,} registros exportados em {elapsed_time:.2f}s ({taxa:,.0f} registros/s)")
+    print(f"📁 Arquivo: {destino_path} ({destino_path.stat().st_size / (1024 * 1024):.2f} MB)")
+
+    return {
+        'arquivo': str(destino_path),
+        'registros': total,
+        'elapsed_time': elapsed_time,
+        'registros_por_segundo': taxa
+    }
+
+
+def main():
+    """Interface de linha de comando."""
+    parser = argparse.ArgumentParser(description='Exportação em streaming de tabelas do Brasil Data Hub')
+    parser.add_argument('tabela', choices=sorted(Base.metadata.tables.keys()), help='Tabela a exportar')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv', help='Formato de saída')
+    parser.add_argument('--saida', help='Arquivo de saída')
+    parser.add_argument('--campos', help='Colunas separadas por vírgula')
+    parser.add_argument('--filtro', action='append', default=[], metavar='COLUNA=VALOR',
+                        help='Filtro de igualdade (pode repetir)')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Registros por lote do cursor')
+    parser.add_argument('--copy', action='store_true', help='Usa COPY TO STDOUT (apenas CSV)')
+    args = parser.parse_args()
+
+    filtros = {}
+    for filtro in args.filtro:
+        if '=' not in filtro:
+            parser.error(f"Filtro inválido '{filtro}': use COLUNA=VALOR")
+        coluna, valor = filtro.split('=', 1)
+        filtros[coluna.strip()] = valor.strip()
+
+    campos = [c.strip() for c in args.campos.split(',')] if args.campos else None
+
+    try:
+        exportar_tabela(args.tabela, args.saida, args.formato, campos, filtros, args.lote, args.copy)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Geração de chaves primárias UUIDv7 (RFC 9562).
+
+O UUIDv7 começa com o timestamp Unix em milissegundos, então chaves geradas
+em sequência ficam próximas no B-tree da chave primária: as inserções vão
+para as últimas páginas do índice em vez de espalhar escritas aleatórias como
+o UUIDv4. O tipo da coluna continua `uuid`, sem mudança de esquema.
+
+Dentro do mesmo milissegundo, os 12 bits `rand_a` funcionam como contador,
+o que mantém as chaves estritamente crescentes no processo.
+"""
+
+import os
+import threading
+import time
+import uuid
+from typing import List
+
+_MASCARA_CONTADOR = 0xFFF
+_lock = threading.Lock()
+_ultimo_ms = 0
+_contador = 0
+
+
+def _proximo_timestamp(quantidade: int):
+    """Reserva `quantidade` posições (ms, contador) crescentes."""
+    global _ultimo_ms, _contador
+    with _lock:
+        agora = time.time_ns() // 1_000_000
+        if agora > _ultimo_ms:
+            _ultimo_ms = agora
+            # Contador começa num valor aleatório da metade inferior
+            _contador = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        ms, contador = _ultimo_ms, _contador
+
+        # Avança o relógio lógico quando o contador estoura
+        fim = _contador + quantidade
+        _ultimo_ms += fim >> 12
+        _contador = fim & _MASCARA_CONTADOR
+    return ms, contador
+
+
+def _montar(ms: int, contador: int, aleatorio: int) -> uuid.UUID:
+    valor = (ms & 0xFFFFFFFFFFFF) << 80
+    valor |= 0x7 << 76
+    valor |= (contador & _MASCARA_CONTADOR) << 64
+    valor |= 0x2 << 62
+    valor |= aleatorio & 0x3FFFFFFFFFFFFFFF
+    return uuid.UUID(int=valor)
+
+
+def uuid7() -> uuid.UUID:
+    """Gera um UUIDv7 (usado como default das chaves primárias)."""
+    ms, contador = _proximo_timestamp(1)
+    return _montar(ms, contador, int.from_bytes(os.urandom(8), 'big'))
+
+
+def gerar_uuid7(quantidade: int) -> List[uuid.UUID]:
+    """
+    Gera `quantidade` UUIDv7 crescentes de uma vez.
+
+    Os bytes aleatórios vêm de uma única chamada a `os.urandom`, e o
+    intervalo de (ms, contador) é reservado sob um único lock.
+    """
+    if quantidade <= 0:
+        return []
+
+    ms, contador = _proximo_timestamp(quantidade)
+    aleatorios = os.urandom(8 * quantidade)
+
+    ids = []
+    for i in range(quantidade):
+        posicao = contador + i
+        ids.append(_montar(
+            ms + (posicao >> 12),
+            posicao,
+            int.from_bytes(aleatorios[i * 8:(i + 1) * 8], 'big')
+        ))
+    return ids
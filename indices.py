@@ -0,0 +1,152 @@
+"""
+Ciclo de vida dos índices secundários durante cargas completas.
+
+Manter cada índice linha a linha durante um INSERT em massa custa mais do que
+construí-lo uma vez ao final. O gerenciador captura as definições dos índices
+não únicos da tabela, remove-os antes da carga e, depois do commit, recria
+todos em paralelo (uma conexão por índice), respeitando o orçamento de
+`max_parallel_maintenance_workers` do servidor, e roda `ANALYZE` apenas na
+tabela carregada.
+
+Uso típico num loader:
+
+    indices = GerenciadorIndices('atracacoes_portuarias')
+    with SessionLocal() as db:
+        db.execute(text("TRUNCATE ..."))
+        indices.remover(db)
+        ...  # INSERTs
+        db.commit()
+    indices.recriar()
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional
+
+from sqlalchemy import text
+
+from database import get_engine
+
+# Índices construídos simultaneamente (cada um numa conexão)
+INDICES_PARALELOS = int(os.getenv('INDICES_PARALELOS', '4'))
+
+_RE_CREATE_INDEX = re.compile(r'^CREATE INDEX ', re.IGNORECASE)
+
+
+class GerenciadorIndices:
+    """Remove e recria os índices não únicos de uma tabela em torno da carga."""
+
+    def __init__(self, tabela: str, paralelos: int = INDICES_PARALELOS):
+        self.tabela = tabela
+        self.paralelos = max(1, paralelos)
+        self.definicoes: Dict[str, str] = {}
+        self.tempos: Dict[str, float] = {}
+
+    def capturar(self, db) -> Dict[str, str]:
+        """
+        Lê as definições dos índices removíveis: não únicos, que não sejam a
+        chave primária nem sustentem uma constraint.
+        """
+        rows = db.execute(text("""
+            SELECT ci.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i
+            JOIN pg_class ci ON ci.oid = i.indexrelid
+            JOIN pg_class ct ON ct.oid = i.indrelid
+            JOIN pg_namespace n ON n.oid = ct.relnamespace
+            WHERE ct.relname = :tabela
+              AND n.nspname = current_schema()
+              AND NOT i.indisunique
+              AND NOT i.indisprimary
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+            ORDER BY ci.relname
+        """), {'tabela': self.tabela}).fetchall()
+
+        self.definicoes = {row[0]: row[1] for row in rows}
+        return self.definicoes
+
+    def remover(self, db) -> int:
+        """
+        Captura e remove os índices na transação da carga.
+
+        Returns:
+            int: Quantidade de índices removidos
+        """
+        self.capturar(db)
+        for nome in self.definicoes:
+            db.execute(text(f'DROP INDEX IF EXISTS "{nome}"'))
+
+        if self.definicoes:
+            print(f"🗂️ {len(self.definicoes)} índices de {self.tabela} removidos para a carga")
+        return len(self.definicoes)
+
+    def _workers_por_indice(self, conn) -> int:
+        """Divide o orçamento de workers de manutenção entre as construções simultâneas."""
+        maximo = int(conn.execute(text("SHOW max_parallel_maintenance_workers")).scalar())
+        simultaneos = min(self.paralelos, len(self.definicoes)) or 1
+        return maximo // simultaneos
+
+    def _construir(self, nome: str, definicao: str, workers: int) -> float:
+        inicio = time.perf_counter()
+        with get_engine().connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.execute(text(f"SET max_parallel_maintenance_workers = {workers}"))
+            conn.execute(text(_RE_CREATE_INDEX.sub('CREATE INDEX IF NOT EXISTS ', definicao)))
+        return time.perf_counter() - inicio
+
+    def recriar(self, analisar: bool = True) -> Dict[str, float]:
+        """
+        Recria os índices removidos em paralelo e roda ANALYZE na tabela.
+
+        Returns:
+            Dict: Tempo de construção (segundos) por índice
+        """
+        if not self.definicoes:
+            return {}
+
+        start_time = time.time()
+
+        with get_engine().connect() as conn:
+            workers = self._workers_por_indice(conn)
+
+        simultaneos = min(self.paralelos, len(self.definicoes))
+        print(f"🏗️ Recriando {len(self.definicoes)} índices de {self.tabela} "
+              f"({simultaneos} simultâneos, {workers} workers cada)...")
+
+        self.tempos = {}
+        falhas: List[str] = []
+        with ThreadPoolExecutor(max_workers=simultaneos) as executor:
+            futuros = {
+                executor.submit(self._construir, nome, definicao, workers): nome
+                for nome, definicao in self.definicoes.items()
+            }
+            for futuro in as_completed(futuros):
+                nome = futuros[futuro]
+                try:
+                    self.tempos[nome] = futuro.result()
+                    print(f"   ✅ {nome}: {self.tempos[nome]:.2f}s")
+                except Exception as e:
+                    falhas.append(nome)
+                    print(f"   ❌ {nome}: {e}")
+
+        if analisar:
+            with get_engine().connect() as conn:
+                conn.execution_options(isolation_level="AUTOCOMMIT").execute(text(f"ANALYZE {self.tabela}"))
+
+        print(f"✅ Índices de {self.tabela} recriados em {time.time() - start_time:.2f}s")
+
+        if falhas:
+            raise RuntimeError(f"Falha ao recriar índices de {self.tabela}: {', '.join(falhas)}")
+
+        self.definicoes = {}
+        return self.tempos
+
+    def relatorio(self) -> Optional[Dict[str, Any]]:
+        """Tempos da última reconstrução, para o resultado do loader."""
+        if not self.tempos:
+            return None
+        return {
+            'indices': dict(sorted(self.tempos.items(), key=lambda item: item[1], reverse=True)),
+            'total_s': sum(self.tempos.values())
+        }
@@ -114,7 +114,7 @@ version: '3.8'
 
 services:
   postgres:
-    image: postgres:15-alpine
+    image: postgis/postgis:15-3.4-alpine
     container_name: thetrace_postgres
     restart: unless-stopped
     environment:
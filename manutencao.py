@@ -0,0 +1,291 @@
+"""
+Manutenção física das tabelas do Brasil Data Hub.
+
+A carga da ANTAQ grava as atracações ordenadas por `data_atracacao`, o que
+mantém alta a correlação entre a data e a posição física das linhas e permite
+que os índices BRIN descartem quase todas as páginas numa consulta por mês.
+Com o tempo (cargas incrementais, UPDATEs) a ordem se perde; o `CLUSTER`
+abaixo reescreve a tabela na ordem das datas.
+
+Usage:
+    python manutencao.py --reordenar        # CLUSTER por data_atracacao + ANALYZE
+    python manutencao.py --benchmark-brin   # EXPLAIN (ANALYZE, BUFFERS) de um mês: BRIN x seq scan
+    python manutencao.py --benchmark-chaves # Inserção e tamanho do índice: UUIDv4 x UUIDv7 x BIGINT
+    python manutencao.py --resumir-brin     # Resume faixas de páginas novas nos índices BRIN
+"""
+
+import argparse
+import io
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+from sqlalchemy import text
+
+from database import SessionLocal, get_engine
+from identificadores import gerar_uuid7
+from models import AtracacaoPortuaria
+
+TABELA_ATRACACOES = AtracacaoPortuaria.__tablename__
+COLUNA_ORDENACAO = 'data_atracacao'
+
+
+def indices_brin(modelo=AtracacaoPortuaria) -> List[str]:
+    """Nomes dos índices BRIN declarados no modelo."""
+    return [
+        indice.name for indice in modelo.__table__.indexes
+        if indice.dialect_options['postgresql']['using'] == 'brin'
+    ]
+
+
+def resumir_indices_brin(db, modelo=AtracacaoPortuaria) -> int:
+    """
+    Resume as faixas de páginas ainda não indexadas pelos BRIN.
+
+    Páginas gravadas depois da criação do índice só entram no BRIN após o
+    VACUUM. Cargas que recriam os índices ao final (ver `indices.py`) já
+    saem resumidas; este passo serve às cargas incrementais.
+
+    Returns:
+        int: Faixas de páginas resumidas
+    """
+    total = 0
+    for indice in indices_brin(modelo):
+        try:
+            with db.begin_nested():
+                total += db.execute(
+                    text("SELECT brin_summarize_new_values(CAST(:indice AS regclass))"),
+                    {'indice': indice}
+                ).scalar() or 0
+        except Exception as e:
+            print(f"⚠️ Não foi possível resumir o índice {indice}: {e}")
+    return total
+
+
+def correlacao_fisica(conexao, tabela: str = TABELA_ATRACACOES, coluna: str = COLUNA_ORDENACAO) -> Optional[float]:
+    """Correlação (pg_stats) entre a ordem da coluna e a ordem física das linhas."""
+    return conexao.execute(text("""
+        SELECT correlation FROM pg_stats
+        WHERE schemaname = current_schema() AND tablename = :tabela AND attname = :coluna
+    """), {'tabela': tabela, 'coluna': coluna}).scalar()
+
+
+def reordenar_tabela(tabela: str = TABELA_ATRACACOES, coluna: str = COLUNA_ORDENACAO) -> Dict[str, Any]:
+    """
+    Reescreve a tabela na ordem da coluna com CLUSTER.
+
+    O CLUSTER precisa de um índice B-tree; um índice temporário é criado e
+    removido ao final. A tabela fica bloqueada (ACCESS EXCLUSIVE) durante a
+    reescrita.
+
+    Returns:
+        Dict: Correlação antes/depois e tempo gasto
+    """
+    indice_temporario = f'ix_{tabela}_{coluna}_cluster_tmp'
+    start_time = time.time()
+
+    with get_engine().connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text(f"ANALYZE {tabela}"))
+        antes = correlacao_fisica(conn, tabela, coluna)
+
+        print(f"🔃 Reordenando {tabela} por {coluna} (correlação atual: {antes})...")
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {indice_temporario} ON {tabela} ({coluna})"))
+        try:
+            conn.execute(text(f"CLUSTER {tabela} USING {indice_temporario}"))
+        finally:
+            conn.execute(text(f"DROP INDEX IF EXISTS {indice_temporario}"))
+        conn.execute(text(f"ANALYZE {tabela}"))
+
+        depois = correlacao_fisica(conn, tabela, coluna)
+
+    elapsed_time = time.time() - start_time
+    print(f"✅ {tabela} reordenada em {elapsed_time:.2f}s (correlação: {antes} → {depois})")
+
+    return {'correlacao_antes': antes, 'correlacao_depois': depois, 'elapsed_time': elapsed_time}
+
+
+def _resumo_plano(plano: Any) -> Dict[str, Any]:
+    """Extrai tempo, buffers e tipos de nó de um EXPLAIN (FORMAT JSON)."""
+    if isinstance(plano, str):
+        plano = json.loads(plano)
+    raiz = plano[0]
+
+    nos = []
+
+    def _visitar(no: Dict[str, Any]) -> None:
+        nos.append(no.get('Node Type'))
+        for filho in no.get('Plans', []):
+            _visitar(filho)
+
+    _visitar(raiz['Plan'])
+
+    return {
+        'tempo_ms': raiz.get('Execution Time'),
+        'buffers_hit': raiz['Plan'].get('Shared Hit Blocks', 0),
+        'buffers_lidos': raiz['Plan'].get('Shared Read Blocks', 0),
+        'nos': nos
+    }
+
+
+def benchmark_brin(tabela: str = TABELA_ATRACACOES, coluna: str = COLUNA_ORDENACAO) -> Dict[str, Any]:
+    """
+    Compara uma consulta de um mês usando o índice BRIN e com varredura
+    sequencial forçada, via EXPLAIN (ANALYZE, BUFFERS).
+
+    O mês escolhido é o de maior volume na tabela.
+    """
+    with SessionLocal() as db:
+        mes = db.execute(text(f"""
+            SELECT date_trunc('month', {coluna}) AS mes
+            FROM {tabela}
+            WHERE {coluna} IS NOT NULL
+            GROUP BY 1 ORDER BY COUNT(*) DESC LIMIT 1
+        """)).scalar()
+        if mes is None:
+            raise ValueError(f"Tabela {tabela} sem valores em {coluna}")
+
+        paginas = db.execute(text(
+            "SELECT relpages FROM pg_class WHERE oid = CAST(:tabela AS regclass)"
+        ), {'tabela': tabela}).scalar()
+
+        consulta = f"""
+            EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)
+            SELECT COUNT(*) FROM {tabela}
+            WHERE {coluna} >= :inicio AND {coluna} < CAST(:inicio AS timestamptz) + INTERVAL '1 month'
+        """
+
+        # Com os índices disponíveis (o planejador deve escolher o BRIN)
+        com_brin = _resumo_plano(db.execute(text(consulta), {'inicio': mes}).scalar())
+
+        # Varredura sequencial forçada para comparação
+        db.execute(text("SET LOCAL enable_bitmapscan = off"))
+        db.execute(text("SET LOCAL enable_indexscan = off"))
+        sem_indice = _resumo_plano(db.execute(text(consulta), {'inicio': mes}).scalar())
+
+        correlacao = correlacao_fisica(db, tabela, coluna)
+        db.rollback()
+
+    return {
+        'mes': mes,
+        'paginas_tabela': paginas,
+        'correlacao': correlacao,
+        'brin': com_brin,
+        'seq_scan': sem_indice
+    }
+
+
+def benchmark_chaves(linhas: int = 300000) -> Dict[str, Dict[str, Any]]:
+    """
+    Compara a carga de `linhas` registros com chave UUIDv4, UUIDv7 e BIGINT
+    identity: tempo do COPY e tamanho da tabela e do índice da chave primária.
+
+    As chaves UUID são geradas no cliente, como nos loaders. As tabelas são
+    criadas e descartadas dentro de uma transação revertida ao final.
+    """
+    variantes = {
+        'uuid4': ('uuid PRIMARY KEY', lambda n: [uuid.uuid4() for _ in range(n)]),
+        'uuid7': ('uuid PRIMARY KEY', gerar_uuid7),
+        'bigint': ('bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY', None)
+    }
+    inicio_datas = datetime(2025, 1, 1)
+    resultado = {}
+
+    conexao = get_engine().raw_connection()
+    try:
+        cursor = conexao.cursor()
+        for nome, (tipo_id, gerador) in variantes.items():
+            tabela = f'benchmark_chaves_{nome}'
+            cursor.execute(f"""
+                CREATE TABLE {tabela} (
+                    id {tipo_id},
+                    id_atracacao varchar(20),
+                    porto_atracacao varchar(200),
+                    data_atracacao timestamptz
+                )
+            """)
+
+            start_time = time.perf_counter()
+            ids = gerador(linhas) if gerador else None
+
+            buffer = io.StringIO()
+            for i in range(linhas):
+                campos = [str(1000000 + i), f'PORTO {i % 200}', (inicio_datas + timedelta(minutes=i)).isoformat()]
+                if ids is not None:
+                    campos.insert(0, str(ids[i]))
+                buffer.write('\t'.join(campos) + '\n')
+            buffer.seek(0)
+
+            colunas = '(id, id_atracacao, porto_atracacao, data_atracacao)' if ids is not None \
+                else '(id_atracacao, porto_atracacao, data_atracacao)'
+            cursor.copy_expert(f"COPY {tabela} {colunas} FROM STDIN", buffer)
+            elapsed_time = time.perf_counter() - start_time
+
+            cursor.execute(f"""
+                SELECT pg_relation_size('{tabela}'), pg_relation_size('{tabela}_pkey')
+            """)
+            tamanho_tabela, tamanho_indice = cursor.fetchone()
+
+            resultado[nome] = {
+                'linhas': linhas,
+                'tempo_s': elapsed_time,
+                'linhas_por_segundo': linhas / elapsed_time if elapsed_time > 0 else 0.0,
+                'tabela_mb': tamanho_tabela / (1024 * 1024),
+                'indice_pk_mb': tamanho_indice / (1024 * 1024)
+            }
+        cursor.close()
+    finally:
+        conexao.rollback()
+        conexao.close()
+
+    return resultado
+
+
+def main():
+    """Interface de linha de comando."""
+    parser = argparse.ArgumentParser(description='Manutenção física das tabelas do Brasil Data Hub')
+    parser.add_argument('--reordenar', action='store_true',
+                        help='Reescreve atracacoes_portuarias na ordem de data_atracacao (CLUSTER)')
+    parser.add_argument('--benchmark-brin', action='store_true',
+                        help='EXPLAIN (ANALYZE, BUFFERS) de uma consulta mensal: BRIN x seq scan')
+    parser.add_argument('--benchmark-chaves', action='store_true',
+                        help='Compara inserção e tamanho do índice: UUIDv4 x UUIDv7 x BIGINT')
+    parser.add_argument('--linhas', type=int, default=300000, help='Linhas do benchmark de chaves')
+    parser.add_argument('--resumir-brin', action='store_true',
+                        help='Resume as faixas de páginas novas nos índices BRIN')
+    args = parser.parse_args()
+
+    if args.resumir_brin:
+        with SessionLocal() as db:
+            faixas = resumir_indices_brin(db)
+            db.commit()
+        print(f"✅ {faixas} faixas de páginas resumidas nos índices BRIN")
+
+    if args.reordenar:
+        reordenar_tabela()
+
+    if args.benchmark_brin:
+        resultado = benchmark_brin()
+        print(f"⏱️ Consulta do mês {resultado['mes']:%Y-%m} em {TABELA_ATRACACOES} "
+              f"({resultado['paginas_tabela']} páginas, correlação {resultado['correlacao']})")
+        for nome, chave in (('BRIN', 'brin'), ('Seq scan', 'seq_scan')):
+            plano = resultado[chave]
+            print(f"   {nome}: {plano['tempo_ms']:.2f}ms, "
+                  f"{plano['buffers_hit'] + plano['buffers_lidos']} páginas "
+                  f"(hit={plano['buffers_hit']}, read={plano['buffers_lidos']}) "
+                  f"[{' → '.join(plano['nos'])}]")
+
+    if args.benchmark_chaves:
+        print(f"⏱️ Carga de {args.linhas:,} linhas por tipo de chave primária...")
+        for nome, metricas in benchmark_chaves(args.linhas).items():
+            print(f"   {nome}: {metricas['tempo_s']:.2f}s ({metricas['linhas_por_segundo']:,.0f} linhas/s), "
+                  f"tabela {metricas['tabela_mb']:.1f} MB, índice PK {metricas['indice_pk_mb']:.1f} MB")
+
+    if not (args.reordenar or args.benchmark_brin or args.benchmark_chaves or args.resumir_brin):
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,12 @@ Modelos de dados para aeródromos da ANAC.
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, String, Float, DateTime, Text, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Float, DateTime, Text, Integer, BigInteger, Boolean, Date, Interval, Index
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
-import uuid
+
+from identificadores import uuid7
 
 Base = declarative_base()
 
@@ -18,7 +19,7 @@ class AerodromoPrivado(Base):
     __tablename__ = "aerodromos_privados"
     
     # Chave primária
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     
     # Identificadores
     codigo_oaci = Column(String(4), nullable=True, index=True, comment="Código OACI do aeródromo")
@@ -26,8 +27,10 @@ class AerodromoPrivado(Base):
     
     # Dados básicos
     nome = Column(String(255), nullable=False, index=True, comment="Nome do aeródromo")
+    nome_normalizado = Column(String(255), nullable=True, comment="Nome sem acentos em maiúsculas (busca trigram)")
     municipio = Column(String(100), nullable=True, index=True, comment="Município")
     uf = Column(String(50), nullable=True, index=True, comment="Unidade Federativa")
+    cd_mun = Column(String(7), nullable=True, index=True, comment="Código IBGE do município (resolvido na carga)")
     
     # Coordenadas
     lat_geo_point = Column(Float, nullable=True, comment="Latitude")
@@ -48,7 +51,7 @@ class AerodromoPublico(Base):
     __tablename__ = "aerodromos_publicos"
     
     # Chave primária
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     
     # Identificadores
     codigo_oaci = Column(String(4), nullable=True, index=True, comment="Código OACI do aeródromo")
@@ -56,8 +59,10 @@ class AerodromoPublico(Base):
     
     # Dados básicos
     nome = Column(String(255), nullable=False, index=True, comment="Nome do aeródromo")
+    nome_normalizado = Column(String(255), nullable=True, comment="Nome sem acentos em maiúsculas (busca trigram)")
     municipio = Column(String(100), nullable=True, index=True, comment="Município")
     uf = Column(String(50), nullable=True, index=True, comment="Unidade Federativa")
+    cd_mun = Column(String(7), nullable=True, index=True, comment="Código IBGE do município (resolvido na carga)")
     
     # Coordenadas (nomenclatura diferente dos privados)
     latitude = Column(Float, nullable=True, comment="Latitude")
@@ -78,7 +83,7 @@ class MunicipioMaritimo(Base):
     __tablename__ = "municipios_maritimos"
     
     # Chave primária
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     
     # Dados do município
     cd_mun = Column(String(7), nullable=False, index=True, comment="Código do município")
@@ -120,7 +125,7 @@ class MunicipioFronteira(Base):
     __tablename__ = "municipios_fronteira"
     
     # Chave primária
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     
     # Dados do município
     cd_mun = Column(String(7), nullable=False, index=True, comment="Código do município")
@@ -167,7 +172,7 @@ class MunicipioSuframa(Base):
     __tablename__ = "municipios_suframa"
     
     # Chave primária
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     
     # Dados do município
     cd_mun = Column(String(7), nullable=False, index=True, comment="Código do município")
@@ -190,8 +195,15 @@ class AtracacaoPortuaria(Base):
     
     __tablename__ = "atracacoes_portuarias"
     
+    # BRIN nas datas: a carga grava as linhas ordenadas por data_atracacao
+    __table_args__ = tuple(
+        Index(f'ix_atracacoes_portuarias_{coluna}_brin', coluna, postgresql_using='brin')
+        for coluna in ('data_atracacao', 'data_chegada', 'data_desatracacao',
+                       'data_inicio_operacao', 'data_termino_operacao')
+    )
+    
     # Chave primária
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     
     # Identificadores
     id_atracacao = Column(String(20), nullable=False, index=True, comment="ID único da atracação")
@@ -215,6 +227,11 @@ class AtracacaoPortuaria(Base):
     data_inicio_operacao = Column(DateTime(timezone=True), nullable=True, comment="Data de início da operação")
     data_termino_operacao = Column(DateTime(timezone=True), nullable=True, comment="Data de término da operação")
     
+    # Durações (calculadas na carga)
+    tempo_espera = Column(Interval, nullable=True, index=True, comment="Chegada até atracação")
+    tempo_atracado = Column(Interval, nullable=True, index=True, comment="Atracação até desatracação")
+    tempo_operacao = Column(Interval, nullable=True, index=True, comment="Início até término da operação")
+    
     # Dados temporais
     ano = Column(Integer, nullable=True, index=True, comment="Ano da operação")
     mes = Column(String(10), nullable=True, index=True, comment="Mês da operação")
@@ -230,6 +247,7 @@ class AtracacaoPortuaria(Base):
     municipio = Column(String(200), nullable=True, index=True, comment="Município")
     uf = Column(String(100), nullable=True, index=True, comment="Unidade Federativa")
     sguf = Column(String(2), nullable=True, index=True, comment="Sigla da UF")
+    cd_mun = Column(String(7), nullable=True, index=True, comment="Código IBGE do município (resolvido na carga)")
     regiao_geografica = Column(String(50), nullable=True, comment="Região geográfica")
     regiao_hidrografica = Column(String(100), nullable=True, comment="Região hidrográfica")
     instalacao_em_rio = Column(String(10), nullable=True, comment="Instalação portuária em rio")
@@ -251,11 +269,12 @@ class RepresentacaoFiscal(Base):
     __tablename__ = "representacoes_fiscais"
     
     # Chave primária
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     
     # Dados da representação fiscal
     cpf_cnpj = Column(String(20), nullable=False, index=True, comment="CPF ou CNPJ (pode estar mascarado)")
     nome = Column(String(500), nullable=False, index=True, comment="Nome da pessoa física ou jurídica")
+    nome_normalizado = Column(String(500), nullable=True, comment="Nome sem acentos em maiúsculas (busca trigram)")
     valor_formatado = Column(String(500), nullable=True, comment="Valor formatado com R$ e separadores")
     
     # Categorização
@@ -269,3 +288,217 @@ class RepresentacaoFiscal(Base):
     
     def __repr__(self):
         return f"<RepresentacaoFiscal(cpf_cnpj='{self.cpf_cnpj}', nome='{self.nome}', valor='{self.valor_formatado}')>"
+
+class AtracacaoResumoMensal(Base):
+    """Resumo mensal das atracações por porto e tipo de operação."""
+    
+    __tablename__ = "atracacoes_resumo_mensal"
+    
+    # Chave primária
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    
+    # Dimensões
+    porto_atracacao = Column(String(200), nullable=True, index=True, comment="Nome do porto de atracação")
+    mes_referencia = Column(Date, nullable=False, index=True, comment="Primeiro dia do mês da atracação")
+    tipo_operacao = Column(String(100), nullable=True, comment="Tipo de operação")
+    
+    # Contagens
+    total_atracacoes = Column(Integer, nullable=False, comment="Quantidade de atracações")
+    
+    # Tempo de espera (horas)
+    espera_media_horas = Column(Float, nullable=True, comment="Espera média")
+    espera_p50_horas = Column(Float, nullable=True, comment="Mediana da espera")
+    espera_p90_horas = Column(Float, nullable=True, comment="Percentil 90 da espera")
+    
+    # Tempo atracado (horas)
+    atracado_media_horas = Column(Float, nullable=True, comment="Tempo atracado médio")
+    atracado_p50_horas = Column(Float, nullable=True, comment="Mediana do tempo atracado")
+    atracado_p90_horas = Column(Float, nullable=True, comment="Percentil 90 do tempo atracado")
+    
+    # Tempo de operação (horas)
+    operacao_media_horas = Column(Float, nullable=True, comment="Tempo de operação médio")
+    operacao_p50_horas = Column(Float, nullable=True, comment="Mediana do tempo de operação")
+    operacao_p90_horas = Column(Float, nullable=True, comment="Percentil 90 do tempo de operação")
+    
+    # Metadados
+    atualizado_em = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<AtracacaoResumoMensal(porto='{self.porto_atracacao}', mes='{self.mes_referencia}', total={self.total_atracacoes})>"
+
+
+class CargaTabela(Base):
+    """Controle da última carga de cada tabela (geração e horário)."""
+    
+    __tablename__ = "cargas_tabelas"
+    
+    # Chave primária
+    tabela = Column(String(100), primary_key=True, comment="Nome da tabela carregada")
+    
+    # Controle de carga
+    geracao = Column(Integer, nullable=False, default=0, comment="Contador incrementado a cada carga")
+    total_registros = Column(Integer, nullable=True, comment="Registros gravados na última carga")
+    carregado_em = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, comment="Data da última carga")
+    
+    def __repr__(self):
+        return f"<CargaTabela(tabela='{self.tabela}', geracao={self.geracao}, carregado_em='{self.carregado_em}')>"
+
+
+class CheckpointCarga(Base):
+    """Progresso de uma carga em lotes, para retomada após falha."""
+    
+    __tablename__ = "checkpoints_cargas"
+    
+    # Chave primária
+    tabela = Column(String(100), primary_key=True, comment="Tabela em carga")
+    
+    # Arquivo de origem
+    hash_arquivo = Column(String(64), nullable=False, comment="SHA-256 do arquivo bruto")
+    arquivo_bruto = Column(Text, nullable=True, comment="Caminho do arquivo bruto")
+    
+    # Progresso
+    status = Column(String(20), nullable=False, comment="em_andamento ou concluido")
+    registros_gravados = Column(Integer, nullable=False, default=0, comment="Registros já commitados")
+    total_registros = Column(Integer, nullable=True, comment="Total de registros da carga")
+    indices_pendentes = Column(Text, nullable=True, comment="Definições (JSON) dos índices removidos")
+    
+    # Metadados
+    iniciado_em = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    atualizado_em = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<CheckpointCarga(tabela='{self.tabela}', status='{self.status}', registros={self.registros_gravados})>"
+
+
+
+class DatasetSnapshot(Base):
+    """Hash do conteúdo de cada linha na última carga (base do diff)."""
+    
+    __tablename__ = "dataset_snapshots"
+    
+    # Chave primária (chave em COLLATE "C" para o merge ordenado usar o índice)
+    tabela = Column(String(100), primary_key=True, comment="Tabela de origem")
+    chave = Column(Text(collation='C'), primary_key=True, comment="Chave natural da linha")
+    
+    hash_conteudo = Column(String(32), nullable=False, comment="MD5 do conteúdo da linha")
+    
+    def __repr__(self):
+        return f"<DatasetSnapshot(tabela='{self.tabela}', chave='{self.chave}')>"
+
+
+class DatasetChange(Base):
+    """Linha adicionada, removida ou alterada entre duas cargas."""
+    
+    __tablename__ = "dataset_changes"
+    
+    __table_args__ = (
+        Index('ix_dataset_changes_tabela_geracao', 'tabela', 'geracao'),
+    )
+    
+    # Chave primária
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    
+    # Origem da mudança
+    tabela = Column(String(100), nullable=False, comment="Tabela de origem")
+    geracao = Column(Integer, nullable=False, comment="Geração da carga que produziu a mudança")
+    
+    # Mudança
+    operacao = Column(String(20), nullable=False, comment="adicionado, removido ou alterado")
+    chave = Column(Text, nullable=False, comment="Chave natural da linha")
+    hash_conteudo = Column(String(32), nullable=True, comment="MD5 do novo conteúdo")
+    dados = Column(JSONB, nullable=True, comment="Conteúdo atual da linha (nulo se removida)")
+    
+    # Metadados
+    detectado_em = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<DatasetChange(tabela='{self.tabela}', geracao={self.geracao}, operacao='{self.operacao}')>"
+
+
+class ScraperRun(Base):
+    """Resultado de um scraper numa execução do run_scrapers (histórico de desempenho)."""
+    
+    __tablename__ = "scraper_runs"
+    
+    __table_args__ = (
+        Index('ix_scraper_runs_scraper_iniciado_em', 'scraper', 'iniciado_em'),
+    )
+    
+    # Chave primária
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    
+    # Execução
+    execucao_id = Column(UUID(as_uuid=True), nullable=False, comment="Execução do run_scrapers")
+    scraper = Column(String(100), nullable=False, comment="Chave do scraper (private, portos, ...)")
+    sucesso = Column(Boolean, nullable=False, comment="Scraper concluído sem erro")
+    erro = Column(Text, nullable=True, comment="Mensagem de erro, se houver")
+    
+    # Métricas
+    elapsed_time = Column(Float, nullable=False, comment="Tempo total em segundos")
+    registros = Column(Integer, nullable=True, comment="Registros gravados")
+    bytes = Column(BigInteger, nullable=True, comment="Bytes baixados")
+    etapas = Column(JSONB, nullable=True, comment="Segundos por etapa (fetch, process, save, ...)")
+    
+    # Metadados
+    iniciado_em = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<ScraperRun(scraper='{self.scraper}', sucesso={self.sucesso}, elapsed_time={self.elapsed_time})>"
+
+
+class FonteMonitorada(Base):
+    """Estado do agendador para cada fonte: validadores HTTP e próxima verificação."""
+    
+    __tablename__ = "fontes_monitoradas"
+    
+    # Chave primária
+    fonte = Column(String(100), primary_key=True, comment="Fonte monitorada (maritimos, portos, ...)")
+    url = Column(Text, nullable=True, comment="Arquivo sondado")
+    
+    # Validadores da última carga bem-sucedida
+    etag = Column(Text, nullable=True, comment="ETag da última carga")
+    last_modified = Column(Text, nullable=True, comment="Last-Modified da última carga")
+    content_length = Column(BigInteger, nullable=True, comment="Content-Length da última carga")
+    
+    # Agenda
+    ultimo_resultado = Column(String(20), nullable=True, comment="inalterado, sucesso, falha ou falha_sonda")
+    verificado_em = Column(DateTime(timezone=True), nullable=True, comment="Última sonda")
+    executado_em = Column(DateTime(timezone=True), nullable=True, comment="Última execução bem-sucedida")
+    proxima_verificacao = Column(DateTime(timezone=True), nullable=True, comment="Próxima sonda agendada")
+    
+    def __repr__(self):
+        return f"<FonteMonitorada(fonte='{self.fonte}', proxima_verificacao='{self.proxima_verificacao}')>"
+
+
+class MunicipioProfile(Base):
+    """Perfil denormalizado por município, reconstruído ao final de cada carga."""
+    
+    __tablename__ = "municipio_profile"
+    
+    # Chave primária
+    cd_mun = Column(String(7), primary_key=True, comment="Código IBGE do município")
+    nm_mun = Column(Text, nullable=True, comment="Nome do município")
+    sigla_uf = Column(String(2), nullable=True, index=True, comment="Sigla da UF (derivada do cd_mun)")
+    
+    # Flags dos conjuntos do IBGE
+    maritimo = Column(Boolean, nullable=False, comment="Município defrontante com o mar")
+    fronteira = Column(Boolean, nullable=False, comment="Município da faixa de fronteira")
+    cidade_gemea = Column(Boolean, nullable=False, comment="Cidade gêmea")
+    suframa = Column(Boolean, nullable=False, comment="Município de zona da SUFRAMA")
+    zonas_suframa = Column(JSONB, nullable=False, comment="Tipos de zona da SUFRAMA")
+    
+    # Áreas
+    area_km2 = Column(Float, nullable=True, comment="Área do município em km²")
+    area_int = Column(Float, nullable=True, comment="Área na faixa de fronteira em km²")
+    
+    # Agregados
+    aerodromos_publicos = Column(Integer, nullable=False, comment="Aeródromos públicos no município")
+    aerodromos_privados = Column(Integer, nullable=False, comment="Aeródromos privados no município")
+    atracacoes_total = Column(Integer, nullable=False, comment="Atracações no município")
+    atracacoes_por_ano = Column(JSONB, nullable=False, comment="Atracações por ano ({\"2024\": n, ...})")
+    
+    # Metadados
+    atualizado_em = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<MunicipioProfile(cd_mun='{self.cd_mun}', nome='{self.nm_mun}', uf='{self.sigla_uf}')>"
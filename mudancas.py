@@ -0,0 +1,296 @@
+"""
+Feed de mudanças por carga (diff entre snapshots).
+
+A cada carga, cada linha da tabela vira um par (chave natural, hash do
+conteúdo). O snapshot anterior fica em `dataset_snapshots`. Os dois fluxos
+são lidos ordenados pela chave e comparados num merge ordenado, em memória
+constante. As linhas adicionadas, removidas e alteradas vão para
+`dataset_changes` e para um arquivo NDJSON em `data/changes/`. Consumidores
+sincronizam só o delta em vez de reler a tabela inteira.
+
+A primeira carga de uma tabela apenas grava o snapshot de referência. Se o
+cálculo do diff falhar, o erro é reportado sem afetar a carga (já commitada),
+o snapshot anterior é mantido e a carga seguinte inclui as mudanças pendentes.
+
+Usage:
+    python mudancas.py --tabela municipios_fronteira        # Calcula o diff da tabela
+    python mudancas.py --consultar atracacoes_portuarias --desde 12
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from sqlalchemy import text
+
+from database import SessionLocal, get_engine, registrar_carga
+from identificadores import gerar_uuid7
+from postgis import COLUNA_GEOGRAFICA
+
+# Chave natural de cada tabela (colunas concatenadas com '|')
+CHAVES_NATURAIS: Dict[str, List[str]] = {
+    'aerodromos_privados': ['ciad', 'codigo_oaci', 'nome'],
+    'aerodromos_publicos': ['ciad', 'codigo_oaci', 'nome'],
+    'municipios_maritimos': ['cd_mun'],
+    'municipios_fronteira': ['cd_mun'],
+    'municipios_suframa': ['cd_mun', 'tipo_zona'],
+    'atracacoes_portuarias': ['id_atracacao'],
+    'representacoes_fiscais': ['cpf_cnpj', 'nome']
+}
+
+# Colunas que mudam a cada carga sem mudar o dado
+COLUNAS_IGNORADAS = ('id', 'created_at', 'updated_at', 'scraped_at', COLUNA_GEOGRAFICA)
+
+OP_ADICIONADO = 'adicionado'
+OP_REMOVIDO = 'removido'
+OP_ALTERADO = 'alterado'
+
+DIRETORIO_MUDANCAS = Path('data/changes')
+TAMANHO_LOTE = 10000
+
+
+def _sql_chave(tabela: str) -> str:
+    colunas = [f"coalesce(t.{coluna}::text, '')" for coluna in CHAVES_NATURAIS[tabela]]
+    return colunas[0] if len(colunas) == 1 else f"concat_ws('|', {', '.join(colunas)})"
+
+
+def _sql_documento() -> str:
+    ignoradas = ', '.join(f"'{coluna}'" for coluna in COLUNAS_IGNORADAS)
+    return f"(to_jsonb(t) - ARRAY[{ignoradas}]::text[])"
+
+
+def _mesclar(anteriores: Iterator[Tuple[str, str]],
+             atuais: Iterator[Tuple[str, str]]) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Merge ordenado de dois fluxos (chave, hash) ordenados pela chave.
+
+    A ordenação vem do banco com COLLATE "C" (bytes UTF-8), que coincide com
+    a comparação de strings do Python (pontos de código).
+    """
+    anterior = next(anteriores, None)
+    atual = next(atuais, None)
+
+    while anterior is not None or atual is not None:
+        if atual is None or (anterior is not None and anterior[0] < atual[0]):
+            yield OP_REMOVIDO, anterior[0], None
+            anterior = next(anteriores, None)
+        elif anterior is None or atual[0] < anterior[0]:
+            yield OP_ADICIONADO, atual[0], atual[1]
+            atual = next(atuais, None)
+        else:
+            if anterior[1] != atual[1]:
+                yield OP_ALTERADO, atual[0], atual[1]
+            anterior = next(anteriores, None)
+            atual = next(atuais, None)
+
+
+def _gravar_ndjson(conn, tabela: str, geracao: int) -> str:
+    """Exporta as mudanças da geração para NDJSON (uma linha por mudança)."""
+    DIRETORIO_MUDANCAS.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    arquivo = DIRETORIO_MUDANCAS / f'{tabela}_g{geracao:06d}_{timestamp}.ndjson'
+
+    linhas = conn.execute(text("""
+        SELECT jsonb_build_object(
+            'tabela', tabela, 'geracao', geracao, 'operacao', operacao,
+            'chave', chave, 'dados', dados
+        )::text
+        FROM dataset_changes
+        WHERE tabela = :tabela AND geracao = :geracao
+        ORDER BY id
+    """), {'tabela': tabela, 'geracao': geracao},
+        execution_options={'stream_results': True, 'yield_per': TAMANHO_LOTE})
+
+    with open(arquivo, 'w', encoding='utf-8') as f:
+        for (linha,) in linhas:
+            f.write(linha)
+            f.write('\n')
+
+    return str(arquivo)
+
+
+def calcular_mudancas(tabela: str) -> Dict[str, Any]:
+    """
+    Compara a tabela com o snapshot anterior e registra o delta.
+
+    Deve ser chamado depois do commit da carga (e de `registrar_carga`), pois
+    as mudanças são associadas à geração atual da tabela.
+
+    Returns:
+        Dict: Contagens por operação, geração, arquivo NDJSON e tempo
+    """
+    start_time = time.time()
+    contagens = {OP_ADICIONADO: 0, OP_REMOVIDO: 0, OP_ALTERADO: 0}
+    arquivo = None
+
+    with get_engine().connect() as conn:
+        geracao = conn.execute(text(
+            "SELECT geracao FROM cargas_tabelas WHERE tabela = :tabela"
+        ), {'tabela': tabela}).scalar() or 0
+        baseline = not conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM dataset_snapshots WHERE tabela = :tabela)"
+        ), {'tabela': tabela}).scalar()
+
+        # Snapshot atual: um hash por chave (chaves repetidas combinam os hashes)
+        conn.execute(text(f"""
+            CREATE TEMP TABLE _snapshot_atual ON COMMIT DROP AS
+            SELECT chave COLLATE "C" AS chave, md5(string_agg(hash, '' ORDER BY hash)) AS hash
+            FROM (
+                SELECT {_sql_chave(tabela)} AS chave, md5({_sql_documento()}::text) AS hash
+                FROM {tabela} t
+            ) linhas
+            GROUP BY chave
+        """))
+
+        if not baseline:
+            conn.execute(text("""
+                CREATE TEMP TABLE _mudancas (id uuid, operacao text, chave text COLLATE "C", hash text)
+                ON COMMIT DROP
+            """))
+
+            opcoes = {'stream_results': True, 'yield_per': TAMANHO_LOTE}
+            anteriores = conn.execute(text("""
+                SELECT chave, hash_conteudo FROM dataset_snapshots
+                WHERE tabela = :tabela ORDER BY chave COLLATE "C"
+            """), {'tabela': tabela}, execution_options=opcoes)
+            atuais = conn.execute(text(
+                'SELECT chave, hash FROM _snapshot_atual ORDER BY chave COLLATE "C"'
+            ), execution_options=opcoes)
+
+            # Chaves UUIDv7 geradas aqui, na ordem do merge (sem função no banco)
+            lote: List[Dict[str, Any]] = []
+            inserir = text(
+                "INSERT INTO _mudancas (id, operacao, chave, hash) VALUES (:id, :operacao, :chave, :hash)"
+            )
+
+            def gravar_lote(mudancas: List[Dict[str, Any]]):
+                for mudanca, id_mudanca in zip(mudancas, gerar_uuid7(len(mudancas))):
+                    mudanca['id'] = id_mudanca
+                conn.execute(inserir, mudancas)
+
+            for operacao, chave, hash_conteudo in _mesclar(iter(anteriores), iter(atuais)):
+                contagens[operacao] += 1
+                lote.append({'operacao': operacao, 'chave': chave, 'hash': hash_conteudo})
+                if len(lote) >= TAMANHO_LOTE:
+                    gravar_lote(lote)
+                    lote = []
+            if lote:
+                gravar_lote(lote)
+
+            if any(contagens.values()):
+                # Documento completo só das linhas do delta (chaves repetidas viram lista)
+                conn.execute(text(f"""
+                    INSERT INTO dataset_changes (id, tabela, geracao, operacao, chave, hash_conteudo, dados)
+                    SELECT m.id, :tabela, :geracao, m.operacao, m.chave, m.hash, d.dados
+                    FROM _mudancas m
+                    LEFT JOIN (
+                        SELECT m2.chave,
+                               CASE WHEN count(*) = 1 THEN (array_agg({_sql_documento()}))[1]
+                                    ELSE jsonb_agg({_sql_documento()}) END AS dados
+                        FROM {tabela} t
+                        JOIN _mudancas m2 ON m2.chave = {_sql_chave(tabela)} AND m2.operacao <> :removido
+                        GROUP BY m2.chave
+                    ) d ON d.chave = m.chave
+                """), {'tabela': tabela, 'geracao': geracao, 'removido': OP_REMOVIDO})
+
+        # Substitui o snapshot de referência
+        conn.execute(text("DELETE FROM dataset_snapshots WHERE tabela = :tabela"), {'tabela': tabela})
+        conn.execute(text("""
+            INSERT INTO dataset_snapshots (tabela, chave, hash_conteudo)
+            SELECT :tabela, chave, hash FROM _snapshot_atual
+        """), {'tabela': tabela})
+
+        if any(contagens.values()):
+            # Nova geração de dataset_changes (invalida o cache da API)
+            registrar_carga(conn, 'dataset_changes', sum(contagens.values()))
+            arquivo = _gravar_ndjson(conn, tabela, geracao)
+
+        conn.commit()
+
+    elapsed_time = time.time() - start_time
+    if baseline:
+        print(f"📸 Snapshot de referência de {tabela} gravado ({elapsed_time:.2f}s)")
+    else:
+        print(f"🔀 Mudanças em {tabela} (geração {geracao}): "
+              f"+{contagens[OP_ADICIONADO]} -{contagens[OP_REMOVIDO]} ~{contagens[OP_ALTERADO]} "
+              f"({elapsed_time:.2f}s)")
+        if arquivo:
+            print(f"📄 Delta salvo em: {arquivo}")
+
+    return {
+        'tabela': tabela,
+        'geracao': geracao,
+        'baseline': baseline,
+        'adicionados': contagens[OP_ADICIONADO],
+        'removidos': contagens[OP_REMOVIDO],
+        'alterados': contagens[OP_ALTERADO],
+        'arquivo': arquivo,
+        'elapsed_time': elapsed_time
+    }
+
+
+def registrar_mudancas(tabela: str) -> Optional[Dict[str, Any]]:
+    """
+    Calcula o delta da tabela após uma carga.
+
+    Falhas são reportadas sem interromper a carga, que já foi commitada; o
+    snapshot anterior é mantido e a próxima carga inclui as mudanças.
+
+    Returns:
+        Dict com as contagens do delta, ou None se o cálculo falhou
+    """
+    try:
+        return calcular_mudancas(tabela)
+    except Exception as e:
+        print(f"⚠️ Erro ao registrar mudanças de {tabela}: {e}")
+        return None
+
+
+def consultar_mudancas(tabela: str, desde_geracao: int = 0, limite: int = 1000) -> List[Dict[str, Any]]:
+    """Mudanças de uma tabela em gerações posteriores a `desde_geracao`."""
+    with SessionLocal() as db:
+        rows = db.execute(text("""
+            SELECT geracao, operacao, chave, dados, detectado_em
+            FROM dataset_changes
+            WHERE tabela = :tabela AND geracao > :desde
+            ORDER BY id
+            LIMIT :limite
+        """), {'tabela': tabela, 'desde': desde_geracao, 'limite': limite}).fetchall()
+
+    return [
+        {
+            'geracao': row[0],
+            'operacao': row[1],
+            'chave': row[2],
+            'dados': row[3],
+            'detectado_em': row[4].isoformat() if row[4] else None
+        }
+        for row in rows
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feed de mudanças entre cargas")
+    parser.add_argument('--tabela', choices=sorted(CHAVES_NATURAIS), help='Calcula o diff da tabela agora')
+    parser.add_argument('--consultar', choices=sorted(CHAVES_NATURAIS), help='Lista mudanças registradas')
+    parser.add_argument('--desde', type=int, default=0, help='Geração a partir da qual listar')
+    parser.add_argument('--limite', type=int, default=1000, help='Máximo de mudanças listadas')
+    args = parser.parse_args()
+
+    if args.tabela:
+        resultado = calcular_mudancas(args.tabela)
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    elif args.consultar:
+        mudancas = consultar_mudancas(args.consultar, args.desde, args.limite)
+        print(json.dumps(mudancas, indent=2, ensure_ascii=False, default=str))
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
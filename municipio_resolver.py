@@ -0,0 +1,233 @@
+"""
+Resolução de nomes de municípios para o código IBGE (cd_mun).
+
+Os datasets da ANAC e da ANTAQ trazem apenas `municipio`/`uf` em texto livre.
+O resolvedor monta, uma vez por execução, um índice em memória com chave
+(nome normalizado, sigla da UF) a partir das tabelas do IBGE, de forma que
+os loaders anexem o `cd_mun` com uma consulta de dicionário por registro.
+"""
+
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+from sqlalchemy import text
+
+from database import SessionLocal
+
+# Código IBGE da UF -> sigla (os dois primeiros dígitos do cd_mun)
+UF_POR_CODIGO = {
+    '11': 'RO', '12': 'AC', '13': 'AM', '14': 'RR', '15': 'PA', '16': 'AP', '17': 'TO',
+    '21': 'MA', '22': 'PI', '23': 'CE', '24': 'RN', '25': 'PB', '26': 'PE', '27': 'AL',
+    '28': 'SE', '29': 'BA', '31': 'MG', '32': 'ES', '33': 'RJ', '35': 'SP', '41': 'PR',
+    '42': 'SC', '43': 'RS', '50': 'MS', '51': 'MT', '52': 'GO', '53': 'DF'
+}
+
+# Nome normalizado da UF -> sigla
+UF_POR_NOME = {
+    'RONDONIA': 'RO', 'ACRE': 'AC', 'AMAZONAS': 'AM', 'RORAIMA': 'RR', 'PARA': 'PA',
+    'AMAPA': 'AP', 'TOCANTINS': 'TO', 'MARANHAO': 'MA', 'PIAUI': 'PI', 'CEARA': 'CE',
+    'RIO GRANDE DO NORTE': 'RN', 'PARAIBA': 'PB', 'PERNAMBUCO': 'PE', 'ALAGOAS': 'AL',
+    'SERGIPE': 'SE', 'BAHIA': 'BA', 'MINAS GERAIS': 'MG', 'ESPIRITO SANTO': 'ES',
+    'RIO DE JANEIRO': 'RJ', 'SAO PAULO': 'SP', 'PARANA': 'PR', 'SANTA CATARINA': 'SC',
+    'RIO GRANDE DO SUL': 'RS', 'MATO GROSSO DO SUL': 'MS', 'MATO GROSSO': 'MT',
+    'GOIAS': 'GO', 'DISTRITO FEDERAL': 'DF'
+}
+
+# Abreviações expandidas palavra a palavra
+ABREVIACOES = {
+    'STA': 'SANTA',
+    'STO': 'SANTO'
+}
+
+# Grafias alternativas -> nome oficial, por UF (ambos já normalizados)
+ALIASES = {
+    ('EMBU', 'SP'): 'EMBU DAS ARTES',
+    ('MOJI MIRIM', 'SP'): 'MOGI MIRIM',
+    ('MOJI DAS CRUZES', 'SP'): 'MOGI DAS CRUZES',
+    ('PARATI', 'RJ'): 'PARATY',
+    ('ASSU', 'RN'): 'ACU',
+    ('ITAPAGE', 'CE'): 'ITAPAJE',
+    ('SAO VALERIO DA NATIVIDADE', 'TO'): 'SAO VALERIO',
+    ('BELEM DE SAO FRANCISCO', 'PE'): 'BELEM DO SAO FRANCISCO',
+    ('SANTA IZABEL DO PARA', 'PA'): 'SANTA ISABEL DO PARA',
+    ('ELDORADO DOS CARAJAS', 'PA'): 'ELDORADO DO CARAJAS'
+}
+
+_RE_SEPARADORES = re.compile(r"[-_/.,;:()]+")
+_RE_APOSTROFOS = re.compile(r"[\'`´’‘]")
+_RE_ESPACOS = re.compile(r"\s+")
+
+
+def normalizar_nome(valor: Any) -> Optional[str]:
+    """
+    Normaliza um nome para comparação: remove acentos, apóstrofos e
+    pontuação, converte para maiúsculas e colapsa espaços.
+
+    Exemplo: "Sant'Ana do Livramento" -> "SANTANA DO LIVRAMENTO"
+    """
+    if valor is None:
+        return None
+
+    texto_valor = unicodedata.normalize('NFKD', str(valor))
+    texto_valor = ''.join(c for c in texto_valor if not unicodedata.combining(c))
+    texto_valor = _RE_APOSTROFOS.sub('', texto_valor).upper()
+    texto_valor = _RE_SEPARADORES.sub(' ', texto_valor)
+    palavras = [ABREVIACOES.get(p, p) for p in _RE_ESPACOS.split(texto_valor.strip()) if p]
+
+    return ' '.join(palavras) or None
+
+
+def normalizar_uf(valor: Any) -> Optional[str]:
+    """Converte sigla ou nome da UF para a sigla de duas letras."""
+    nome = normalizar_nome(valor)
+    if not nome:
+        return None
+    if len(nome) == 2 and nome in UF_POR_CODIGO.values():
+        return nome
+    return UF_POR_NOME.get(nome)
+
+
+class MunicipioResolver:
+    """Índice em memória (nome normalizado, UF) -> cd_mun."""
+
+    def __init__(self, municipios: Iterable[Tuple[str, str, Optional[str]]]):
+        """
+        Constrói o índice.
+
+        Args:
+            municipios: Tuplas (cd_mun, nm_mun, sigla_uf); sem sigla, a UF é
+                derivada dos dois primeiros dígitos do código
+        """
+        self._por_nome_uf: Dict[Tuple[str, str], str] = {}
+        self._por_nome: Dict[str, Optional[str]] = {}
+        self._cache: Dict[Tuple[Any, Any], Optional[str]] = {}
+
+        for cd_mun, nm_mun, sigla_uf in municipios:
+            cd_mun = str(cd_mun).strip() if cd_mun is not None else ''
+            nome = normalizar_nome(nm_mun)
+            if len(cd_mun) != 7 or not cd_mun.isdigit() or not nome:
+                continue
+
+            uf = normalizar_uf(sigla_uf) or UF_POR_CODIGO.get(cd_mun[:2])
+            if uf:
+                self._por_nome_uf[(nome, uf)] = cd_mun
+
+            # Nomes repetidos em UFs diferentes ficam ambíguos sem a UF
+            anterior = self._por_nome.get(nome, cd_mun)
+            self._por_nome[nome] = cd_mun if anterior == cd_mun else None
+
+    def __len__(self) -> int:
+        return len(self._por_nome_uf)
+
+    def resolve(self, municipio: Any, uf: Any = None) -> Optional[str]:
+        """Retorna o cd_mun do município ou None se não encontrado."""
+        chave_cache = (municipio, uf)
+        if chave_cache in self._cache:
+            return self._cache[chave_cache]
+
+        cd_mun = None
+        nome = normalizar_nome(municipio)
+        if nome:
+            sigla = normalizar_uf(uf)
+            if sigla:
+                nome = ALIASES.get((nome, sigla), nome)
+                cd_mun = self._por_nome_uf.get((nome, sigla))
+            else:
+                cd_mun = self._por_nome.get(nome)
+
+        self._cache[chave_cache] = cd_mun
+        return cd_mun
+
+    def resolve_many(self, registros: List[Dict[str, Any]], campo_municipio: str = 'municipio',
+                     campos_uf: Tuple[str, ...] = ('uf',), campo_destino: str = 'cd_mun') -> int:
+        """
+        Anexa o cd_mun a cada registro (in-place).
+
+        Args:
+            registros: Lista de dicionários processados
+            campo_municipio: Campo com o nome do município
+            campos_uf: Campos com a UF, em ordem de preferência
+            campo_destino: Campo onde gravar o código
+
+        Returns:
+            int: Quantidade de registros resolvidos
+        """
+        resolvidos = 0
+        for registro in registros:
+            uf = next((registro.get(c) for c in campos_uf if registro.get(c)), None)
+            cd_mun = self.resolve(registro.get(campo_municipio), uf)
+            registro[campo_destino] = cd_mun
+            if cd_mun:
+                resolvidos += 1
+        return resolvidos
+
+
+# Consultas de origem do índice; cada tabela é opcional
+CONSULTAS_MUNICIPIOS = [
+    "SELECT cd_mun, nm_mun, sigla_uf FROM municipios_maritimos",
+    "SELECT cd_mun, nm_mun, sigla_uf FROM municipios_fronteira",
+    "SELECT cd_mun, nm_mun, NULL FROM municipios_suframa"
+]
+
+
+def build_municipio_resolver() -> MunicipioResolver:
+    """Carrega os municípios das tabelas do IBGE e constrói o resolvedor."""
+    municipios = []
+
+    with SessionLocal() as db:
+        for consulta in CONSULTAS_MUNICIPIOS:
+            try:
+                municipios.extend(db.execute(text(consulta)).fetchall())
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️ Tabela de municípios indisponível para o resolvedor: {e}")
+
+    return MunicipioResolver(municipios)
+
+
+# Resolvedor compartilhado, construído uma vez por execução
+_resolver: Optional[MunicipioResolver] = None
+_lock = threading.Lock()
+
+
+def get_municipio_resolver() -> MunicipioResolver:
+    """Retorna o resolvedor do processo, construindo-o na primeira chamada."""
+    global _resolver
+    if _resolver is None:
+        with _lock:
+            if _resolver is None:
+                _resolver = build_municipio_resolver()
+                print(f"🗺️ Resolvedor de municípios carregado: {len(_resolver)} municípios")
+    return _resolver
+
+
+def invalidate_municipio_resolver() -> None:
+    """Descarta o resolvedor para que seja reconstruído após uma carga do IBGE."""
+    global _resolver
+    with _lock:
+        _resolver = None
+
+
+def anexar_cd_mun(registros: List[Dict[str, Any]], campos_uf: Tuple[str, ...] = ('uf',)) -> int:
+    """
+    Anexa o cd_mun aos registros processados de um loader.
+
+    Falhas na construção do índice não interrompem a carga: os registros
+    ficam com cd_mun nulo.
+
+    Returns:
+        int: Quantidade de registros resolvidos
+    """
+    try:
+        resolver = get_municipio_resolver()
+    except Exception as e:
+        print(f"⚠️ Erro ao carregar resolvedor de municípios: {e}")
+        for registro in registros:
+            registro['cd_mun'] = None
+        return 0
+
+    resolvidos = resolver.resolve_many(registros, campos_uf=campos_uf)
+    print(f"🗺️ Código IBGE anexado a {resolvidos} de {len(registros)} registros")
+    return resolvidos
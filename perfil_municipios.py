@@ -0,0 +1,197 @@
+"""
+Perfil denormalizado por município (`municipio_profile`).
+
+"Tudo o que sabemos sobre o município X" exigiria juntar as três tabelas do
+IBGE e agregar aeródromos e atracações a cada consulta. O perfil guarda esse
+resultado numa linha por `cd_mun` (chave primária), e a leitura vira uma
+busca pela chave:
+
+    - flags: marítimo, faixa de fronteira, cidade gêmea e SUFRAMA (com as zonas)
+    - área do município (`area_km2`) e área na faixa de fronteira (`area_int`)
+    - quantidade de aeródromos públicos e privados
+    - atracações no total e por ano
+
+A tabela é reconstruída inteira, com um único INSERT ... SELECT, ao final do
+pipeline (`run_scrapers.py`) e depois de cada fonte executada pelo
+agendador. A reconstrução roda numa só transação: os leitores veem o perfil
+anterior até o commit. Um advisory lock serializa reconstruções simultâneas
+(jobs do agendador terminando juntos).
+
+Usage:
+    python perfil_municipios.py 1302603 4314100     # Perfis dos municípios
+    python perfil_municipios.py --reconstruir       # Reconstrói a tabela
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Any, Optional
+
+from sqlalchemy import text
+
+from database import SessionLocal, create_tables, registrar_carga
+from municipio_resolver import UF_POR_CODIGO
+from serializacao import dumps_texto
+
+TABELA_PERFIL = 'municipio_profile'
+
+# Scrapers cujas tabelas alimentam o perfil
+SCRAPERS_PERFIL = {'maritimos', 'fronteira', 'suframa', 'private', 'public', 'portos'}
+
+# Chave do advisory lock que serializa as reconstruções
+CHAVE_LOCK = 47001
+
+COLUNAS_PERFIL = [
+    'cd_mun', 'nm_mun', 'sigla_uf', 'maritimo', 'fronteira', 'cidade_gemea', 'suframa',
+    'zonas_suframa', 'area_km2', 'area_int', 'aerodromos_publicos', 'aerodromos_privados',
+    'atracacoes_total', 'atracacoes_por_ano', 'atualizado_em'
+]
+
+
+def _ufs_sql() -> str:
+    """Tabela VALUES (código da UF, sigla) para derivar a UF do cd_mun."""
+    return ', '.join(f"('{codigo}', '{sigla}')" for codigo, sigla in sorted(UF_POR_CODIGO.items()))
+
+
+def reconstruir_perfil(db) -> int:
+    """
+    Recalcula todo o perfil na transação do chamador.
+
+    Args:
+        db: Sessão SQLAlchemy (o commit fica com o chamador)
+
+    Returns:
+        int: Municípios gravados no perfil
+    """
+    db.execute(text("SELECT pg_advisory_xact_lock(:chave)"), {'chave': CHAVE_LOCK})
+    db.execute(text(f"DELETE FROM {TABELA_PERFIL}"))
+
+    resultado = db.execute(text(f"""
+        WITH fronteira AS (
+            SELECT cd_mun, min(nm_mun) AS nm_mun, max(area_int) AS area_int,
+                   bool_or(UPPER(cid_gemea) = 'SIM') AS cidade_gemea
+            FROM municipios_fronteira
+            GROUP BY cd_mun
+        ),
+        maritimos AS (
+            SELECT cd_mun, min(nm_mun) AS nm_mun, max(area_km2) AS area_km2
+            FROM municipios_maritimos
+            GROUP BY cd_mun
+        ),
+        suframa AS (
+            SELECT cd_mun, min(nm_mun) AS nm_mun,
+                   jsonb_agg(DISTINCT tipo_zona ORDER BY tipo_zona) AS zonas
+            FROM municipios_suframa
+            GROUP BY cd_mun
+        ),
+        aerodromos AS (
+            SELECT cd_mun, min(municipio) AS municipio,
+                   count(*) FILTER (WHERE publico) AS publicos,
+                   count(*) FILTER (WHERE NOT publico) AS privados
+            FROM (
+                SELECT cd_mun, municipio, true AS publico FROM aerodromos_publicos WHERE cd_mun IS NOT NULL
+                UNION ALL
+                SELECT cd_mun, municipio, false FROM aerodromos_privados WHERE cd_mun IS NOT NULL
+            ) a
+            GROUP BY cd_mun
+        ),
+        atracacoes_ano AS (
+            SELECT cd_mun, ano, min(municipio) AS municipio, count(*) AS total
+            FROM atracacoes_portuarias
+            WHERE cd_mun IS NOT NULL
+            GROUP BY cd_mun, ano
+        ),
+        atracacoes AS (
+            SELECT cd_mun, min(municipio) AS municipio, sum(total) AS total,
+                   jsonb_object_agg(ano::text, total ORDER BY ano) FILTER (WHERE ano IS NOT NULL) AS por_ano
+            FROM atracacoes_ano
+            GROUP BY cd_mun
+        ),
+        codigos AS (
+            SELECT cd_mun FROM fronteira
+            UNION SELECT cd_mun FROM maritimos
+            UNION SELECT cd_mun FROM suframa
+            UNION SELECT cd_mun FROM aerodromos
+            UNION SELECT cd_mun FROM atracacoes
+        )
+        INSERT INTO {TABELA_PERFIL} ({', '.join(COLUNAS_PERFIL)})
+        SELECT c.cd_mun,
+               COALESCE(f.nm_mun, m.nm_mun, s.nm_mun, a.municipio, p.municipio),
+               uf.sigla,
+               m.cd_mun IS NOT NULL,
+               f.cd_mun IS NOT NULL,
+               COALESCE(f.cidade_gemea, false),
+               s.cd_mun IS NOT NULL,
+               COALESCE(s.zonas, '[]'::jsonb),
+               m.area_km2,
+               f.area_int,
+               COALESCE(a.publicos, 0),
+               COALESCE(a.privados, 0),
+               COALESCE(p.total, 0),
+               COALESCE(p.por_ano, '{{}}'::jsonb),
+               now()
+        FROM codigos c
+        LEFT JOIN fronteira f ON f.cd_mun = c.cd_mun
+        LEFT JOIN maritimos m ON m.cd_mun = c.cd_mun
+        LEFT JOIN suframa s ON s.cd_mun = c.cd_mun
+        LEFT JOIN aerodromos a ON a.cd_mun = c.cd_mun
+        LEFT JOIN atracacoes p ON p.cd_mun = c.cd_mun
+        LEFT JOIN (VALUES {_ufs_sql()}) AS uf (codigo, sigla) ON uf.codigo = left(c.cd_mun, 2)
+    """))
+
+    return resultado.rowcount
+
+
+def atualizar_perfil() -> int:
+    """Reconstrói o perfil e registra a carga (geração usada pelo ETag da API)."""
+    inicio = time.time()
+    with SessionLocal() as db:
+        total = reconstruir_perfil(db)
+        registrar_carga(db, TABELA_PERFIL, total)
+        db.commit()
+
+    print(f"🧭 Perfil de municípios reconstruído: {total} municípios em {time.time() - inicio:.2f}s")
+    return total
+
+
+def obter_perfil(cd_mun: str) -> Optional[Dict[str, Any]]:
+    """Perfil de um município (busca pela chave primária)."""
+    with SessionLocal() as db:
+        row = db.execute(text(f"""
+            SELECT {', '.join(COLUNAS_PERFIL)}
+            FROM {TABELA_PERFIL}
+            WHERE cd_mun = :cd_mun
+        """), {'cd_mun': cd_mun}).fetchone()
+
+    return dict(zip(COLUNAS_PERFIL, row)) if row else None
+
+
+def main():
+    """Interface de linha de comando."""
+    parser = argparse.ArgumentParser(description='Perfil denormalizado por município')
+    parser.add_argument('cd_mun', nargs='*', help='Códigos IBGE a consultar')
+    parser.add_argument('--reconstruir', action='store_true', help='Reconstrói a tabela municipio_profile')
+    args = parser.parse_args()
+
+    if not args.cd_mun and not args.reconstruir:
+        parser.print_help()
+        sys.exit(1)
+
+    if args.reconstruir:
+        create_tables()
+        atualizar_perfil()
+
+    perfis: List[Dict[str, Any]] = []
+    for cd_mun in args.cd_mun:
+        perfil = obter_perfil(cd_mun)
+        if perfil is None:
+            print(f"⚠️ Município {cd_mun} não encontrado no perfil")
+            continue
+        perfis.append(perfil)
+
+    if perfis:
+        print(dumps_texto(perfis, indentar=True))
+
+
+if __name__ == "__main__":
+    main()
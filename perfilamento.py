@@ -0,0 +1,261 @@
+"""
+Perfilamento sob demanda dos scrapers (CPU e memória).
+
+Com `--profile cpu`, o `run()` do scraper roda sob cProfile e um amostrador
+de pilhas. Com `--profile mem`, roda sob tracemalloc. Os artefatos vão para
+`logs/`:
+
+    profile_<nome>_<ts>.pstats       # cProfile (snakeviz, python -m pstats)
+    profile_<nome>_<ts>.collapsed    # pilhas colapsadas (flamegraph.pl, speedscope)
+    profile_<nome>_<ts>_mem.txt      # alocações no pico de memória, por linha e por pilha
+
+Sem `--profile`, nada deste módulo é ligado: a função é chamada diretamente.
+
+Usage:
+    python run_scrapers.py --scraper portos --profile cpu
+    python scrapers/municipios_suframa.py --profile mem
+    python perfilamento.py logs/profile_portos_20250101_120000.pstats   # Top funções
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Any, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MODOS_PERFIL = ('cpu', 'mem')
+
+PROFILE_DIR = Path(os.getenv('LOG_DIR', 'logs'))
+# Intervalo entre amostras de pilha (segundos)
+PROFILE_INTERVALO = float(os.getenv('PROFILE_INTERVALO', '0.005'))
+# Quadros guardados por alocação no tracemalloc
+PROFILE_QUADROS_MEM = int(os.getenv('PROFILE_QUADROS_MEM', '25'))
+# Intervalo entre leituras do pico de memória (segundos)
+PROFILE_INTERVALO_MEM = float(os.getenv('PROFILE_INTERVALO_MEM', '0.05'))
+# Crescimento mínimo do pico (fração) para um novo snapshot
+PROFILE_LIMIAR_PICO = float(os.getenv('PROFILE_LIMIAR_PICO', '0.05'))
+TOP_RELATORIO = 30
+
+
+class AmostradorPilhas(threading.Thread):
+    """
+    Amostra periodicamente as pilhas de todas as threads (exceto a própria)
+    e acumula no formato colapsado: `thread;quadro;quadro... contagem`.
+    """
+
+    def __init__(self, intervalo: float = PROFILE_INTERVALO):
+        super().__init__(name='amostrador-pilhas', daemon=True)
+        self.intervalo = intervalo
+        self.pilhas: Counter = Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+
+    def run(self) -> None:
+        proprio = threading.get_ident()
+        while not self._parar.wait(self.intervalo):
+            nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == proprio:
+                    continue
+                quadros = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    quadros.append(f"{codigo.co_name} ({Path(codigo.co_filename).name}:{codigo.co_firstlineno})")
+                    frame = frame.f_back
+                quadros.append(nomes.get(ident, str(ident)))
+                self.pilhas[';'.join(reversed(quadros))] += 1
+            self.amostras += 1
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
+
+    def gravar(self, arquivo: Path) -> None:
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            for pilha, contagem in self.pilhas.most_common():
+                f.write(f"{pilha} {contagem}\n")
+
+
+class AmostradorPico(threading.Thread):
+    """
+    Acompanha o pico do tracemalloc durante a execução e tira um snapshot
+    sempre que ele cresce mais que `limiar`. O snapshot guardado mostra o
+    que estava alocado perto do pico, e não só o que sobreviveu até o fim.
+
+    O próprio snapshot guardado é memória rastreada: o tamanho dele
+    (`sobrecarga`) é descontado das leituras seguintes, e o pico do
+    tracemalloc é reiniciado depois de cada snapshot.
+    """
+
+    def __init__(self, intervalo: float = PROFILE_INTERVALO_MEM, limiar: float = PROFILE_LIMIAR_PICO):
+        super().__init__(name='amostrador-pico', daemon=True)
+        self.intervalo = intervalo
+        self.limiar = limiar
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.pico = 0
+        self.pico_snapshot = 0
+        self.snapshots = 0
+        self.sobrecarga = 0
+        self._parar = threading.Event()
+
+    def ler(self) -> None:
+        """Atualiza o pico e, se ele cresceu o bastante, tira um novo snapshot."""
+        pico = tracemalloc.get_traced_memory()[1] - self.sobrecarga
+        if pico <= self.pico_snapshot * (1 + self.limiar):
+            self.pico = max(self.pico, pico)
+            return
+
+        self.pico = max(self.pico, pico)
+        self.pico_snapshot = pico
+        self.snapshot = None
+        antes = tracemalloc.get_traced_memory()[0]
+        snapshot = tracemalloc.take_snapshot()
+        self.sobrecarga = tracemalloc.get_traced_memory()[0] - antes
+        self.snapshot = snapshot
+        self.snapshots += 1
+        tracemalloc.reset_peak()
+
+    def run(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.ler()
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
+        self.ler()
+        if self.snapshot is None:
+            # Execução sem crescimento de memória: snapshot do estado final
+            self.snapshot = tracemalloc.take_snapshot()
+
+
+def _prefixo(nome: str) -> Path:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return PROFILE_DIR / f'profile_{nome}_{timestamp}'
+
+
+def _perfil_cpu(nome: str, funcao: Callable[[], Any]) -> Any:
+    prefixo = _prefixo(nome)
+    perfil = cProfile.Profile()
+    amostrador = AmostradorPilhas()
+
+    amostrador.start()
+    perfil.enable()
+    try:
+        return funcao()
+    finally:
+        perfil.disable()
+        amostrador.parar()
+
+        arquivo_pstats = prefixo.with_suffix('.pstats')
+        arquivo_pilhas = prefixo.with_suffix('.collapsed')
+        perfil.dump_stats(str(arquivo_pstats))
+        amostrador.gravar(arquivo_pilhas)
+
+        print(f"\n🔬 Perfil de CPU de {nome} ({amostrador.amostras} amostras de pilha):")
+        pstats.Stats(perfil, stream=sys.stdout).sort_stats('cumulative').print_stats(15)
+        print(f"   📄 pstats: {arquivo_pstats}")
+        print(f"   🔥 Pilhas colapsadas: {arquivo_pilhas}")
+
+
+def _perfil_mem(nome: str, funcao: Callable[[], Any]) -> Any:
+    prefixo = _prefixo(nome)
+    ja_ativo = tracemalloc.is_tracing()
+    if not ja_ativo:
+        tracemalloc.start(PROFILE_QUADROS_MEM)
+    tracemalloc.reset_peak()
+    amostrador = AmostradorPico()
+    amostrador.start()
+
+    try:
+        return funcao()
+    finally:
+        amostrador.parar()
+        atual = tracemalloc.get_traced_memory()[0] - amostrador.sobrecarga
+        pico = amostrador.pico
+        snapshot = amostrador.snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>')
+        ])
+        amostrador.snapshot = None
+        if not ja_ativo:
+            tracemalloc.stop()
+
+        arquivo = Path(f'{prefixo}_mem.txt')
+        por_linha = snapshot.statistics('lineno')[:TOP_RELATORIO]
+        por_pilha = snapshot.statistics('traceback')[:10]
+
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            f.write(f"Perfil de memória: {nome}\n")
+            f.write(f"Pico: {pico / 1024 / 1024:.1f} MB | Snapshot em {amostrador.pico_snapshot / 1024 / 1024:.1f} MB "
+                    f"({amostrador.snapshots} snapshots) | Ainda alocado ao final: {atual / 1024 / 1024:.1f} MB\n\n")
+            f.write(f"Top {TOP_RELATORIO} alocações no pico, por linha\n")
+            for stat in por_linha:
+                f.write(f"{stat}\n")
+            f.write("\nTop 10 alocações no pico, por pilha\n")
+            for stat in por_pilha:
+                f.write(f"\n{stat.size / 1024:.1f} KiB em {stat.count} blocos\n")
+                for linha in stat.traceback.format():
+                    f.write(f"{linha}\n")
+
+        print(f"\n🧠 Perfil de memória de {nome}: pico {pico / 1024 / 1024:.1f} MB "
+              f"(alocações no snapshot de {amostrador.pico_snapshot / 1024 / 1024:.1f} MB)")
+        for stat in por_linha[:10]:
+            print(f"   {stat}")
+        print(f"   📄 Relatório: {arquivo}")
+
+
+def perfilar(nome: str, modo: Optional[str], funcao: Callable[[], Any]) -> Any:
+    """
+    Executa `funcao` sob o perfilador pedido e grava os artefatos em logs/.
+
+    Args:
+        nome (str): Nome do scraper (prefixo dos arquivos)
+        modo (str): 'cpu', 'mem' ou None (sem perfilamento)
+        funcao (Callable): Função sem argumentos, tipicamente `scraper.run`
+
+    Returns:
+        Any: O retorno de `funcao`
+    """
+    if not modo:
+        return funcao()
+    if modo == 'cpu':
+        return _perfil_cpu(nome, funcao)
+    if modo == 'mem':
+        return _perfil_mem(nome, funcao)
+    raise ValueError(f"Modo de perfil inválido: {modo}. Use: {', '.join(MODOS_PERFIL)}")
+
+
+def argumento_perfil(argv: Optional[List[str]] = None) -> Optional[str]:
+    """Lê `--profile cpu|mem` da linha de comando de um scraper avulso."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', choices=MODOS_PERFIL)
+    args, _ = parser.parse_known_args(argv)
+    return args.profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resumo de um arquivo .pstats gerado com --profile cpu')
+    parser.add_argument('arquivo', help='Arquivo .pstats em logs/')
+    parser.add_argument('--ordem', default='cumulative', choices=['cumulative', 'tottime', 'ncalls'],
+                        help='Critério de ordenação')
+    parser.add_argument('--limite', type=int, default=TOP_RELATORIO, help='Funções listadas')
+    args = parser.parse_args()
+
+    pstats.Stats(args.arquivo).sort_stats(args.ordem).print_stats(args.limite)
+
+
+if __name__ == "__main__":
+    main()
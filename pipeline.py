@@ -0,0 +1,218 @@
+"""
+Execução em pipeline: processamento e gravação no banco ao mesmo tempo.
+
+No modo sequencial, o `run()` processa tudo e só então grava tudo: a parte de
+CPU (parse, conversões) e a de I/O (INSERT/COMMIT) nunca se sobrepõem, e o
+tempo total é a soma das duas. No pipeline, a thread chamadora produz lotes
+numa fila limitada e uma thread escritora grava cada lote enquanto o próximo
+é produzido. O tempo total tende a max(processamento, gravação).
+
+A fila tem no máximo `PIPELINE_PROFUNDIDADE` lotes, o que limita a memória:
+se a gravação for o gargalo, o produtor espera (espera do produtor); se o
+processamento for o gargalo, a escritora espera (espera da escritora). As
+duas esperas e a profundidade da fila entram nas métricas, que indicam qual
+lado limita a carga.
+
+A função de gravação roda só na thread escritora. A sessão do banco usada
+por ela não deve ser tocada pela thread chamadora enquanto o pipeline roda.
+
+Usage:
+    python pipeline.py --simular                              # Lotes sintéticos (sleep)
+    python pipeline.py --simular --lotes 50 --processamento 0.02 --gravacao 0.05
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Any, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Modo pipeline ligado nos loaders que o suportam
+PIPELINE_ATIVO = os.getenv('PIPELINE_ATIVO', '1') not in ('0', 'false', 'False')
+# Lotes em espera na fila (limita a memória entre produtor e escritora)
+PIPELINE_PROFUNDIDADE = int(os.getenv('PIPELINE_PROFUNDIDADE', '4'))
+
+# Espera máxima de cada put antes de verificar se a escritora falhou (segundos)
+INTERVALO_VERIFICACAO = 0.5
+
+Lote = TypeVar('Lote')
+
+_FIM = object()
+
+
+class ErroPipeline(Exception):
+    """Falha na thread escritora, propagada para a thread chamadora."""
+
+
+class _Escritora(threading.Thread):
+    """Consome a fila e grava cada lote, medindo o tempo ocioso."""
+
+    def __init__(self, fila: queue.Queue, gravar: Callable[[Any], Optional[int]], nome: str):
+        super().__init__(name=f'{nome}-escritora', daemon=True)
+        self.fila = fila
+        self.gravar = gravar
+        self.erro: Optional[BaseException] = None
+        self.registros = 0
+        self.lotes = 0
+        self.tempo_gravacao = 0.0
+        self.espera = 0.0
+
+    def run(self):
+        while True:
+            inicio = time.perf_counter()
+            lote = self.fila.get()
+            self.espera += time.perf_counter() - inicio
+            if lote is _FIM:
+                return
+            if self.erro is not None:
+                # Após uma falha, só esvazia a fila para não bloquear o produtor
+                continue
+
+            inicio = time.perf_counter()
+            try:
+                gravados = self.gravar(lote)
+            except BaseException as e:
+                self.erro = e
+                continue
+            self.tempo_gravacao += time.perf_counter() - inicio
+            self.registros += gravados or 0
+            self.lotes += 1
+
+
+def executar_pipeline(lotes: Iterable[Lote], gravar: Callable[[Lote], Optional[int]],
+                      profundidade: int = PIPELINE_PROFUNDIDADE, nome: str = 'pipeline') -> Dict[str, Any]:
+    """
+    Produz os lotes nesta thread e grava cada um numa thread escritora.
+
+    Args:
+        lotes: Iterável (geralmente um gerador) que faz o processamento
+        gravar: Grava um lote e retorna os registros gravados
+        profundidade (int): Máximo de lotes na fila
+        nome (str): Prefixo da thread escritora
+
+    Returns:
+        Dict: Registros, lotes, tempos e métricas da fila
+
+    Raises:
+        ErroPipeline: Falha na gravação (com a exceção original em __cause__)
+    """
+    fila: queue.Queue = queue.Queue(maxsize=max(1, profundidade))
+    escritora = _Escritora(fila, gravar, nome)
+
+    tempo_producao = 0.0
+    espera_produtor = 0.0
+    soma_profundidade = 0
+    profundidade_maxima = 0
+    produzidos = 0
+
+    inicio_total = time.perf_counter()
+    escritora.start()
+    try:
+        iterador = iter(lotes)
+        while escritora.erro is None:
+            inicio = time.perf_counter()
+            try:
+                lote = next(iterador)
+            except StopIteration:
+                break
+            tempo_producao += time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            while escritora.erro is None:
+                try:
+                    fila.put(lote, timeout=INTERVALO_VERIFICACAO)
+                    break
+                except queue.Full:
+                    continue
+            espera_produtor += time.perf_counter() - inicio
+
+            # Profundidade logo após enfileirar (lotes aguardando a escritora)
+            ocupacao = fila.qsize()
+            soma_profundidade += ocupacao
+            profundidade_maxima = max(profundidade_maxima, ocupacao)
+            produzidos += 1
+    finally:
+        fila.put(_FIM)
+        escritora.join()
+
+    if escritora.erro is not None:
+        raise ErroPipeline(f"Falha ao gravar lote em {nome}: {escritora.erro}") from escritora.erro
+
+    tempo_total = time.perf_counter() - inicio_total
+    return {
+        'registros': escritora.registros,
+        'lotes': escritora.lotes,
+        'tempo_total_s': tempo_total,
+        'tempo_processamento_s': tempo_producao,
+        'tempo_gravacao_s': escritora.tempo_gravacao,
+        'espera_produtor_s': espera_produtor,
+        'espera_escritora_s': escritora.espera,
+        'profundidade': fila.maxsize,
+        'profundidade_maxima': profundidade_maxima,
+        'profundidade_media': soma_profundidade / produzidos if produzidos else 0.0,
+        'gargalo': 'gravacao' if espera_produtor > escritora.espera else 'processamento',
+        # 1.0 = tempo total igual a max(processamento, gravação); 0.0 = igual à soma
+        'sobreposicao': _sobreposicao(tempo_total, tempo_producao, escritora.tempo_gravacao)
+    }
+
+
+def _sobreposicao(total: float, processamento: float, gravacao: float) -> float:
+    menor = min(processamento, gravacao)
+    if menor <= 0:
+        return 0.0
+    return max(0.0, min(1.0, (processamento + gravacao - total) / menor))
+
+
+def formatar_metricas(metricas: Dict[str, Any]) -> str:
+    """Resumo de uma linha das métricas do pipeline."""
+    return (f"{metricas['lotes']} lotes em {metricas['tempo_total_s']:.2f}s "
+            f"(processamento {metricas['tempo_processamento_s']:.2f}s, gravação {metricas['tempo_gravacao_s']:.2f}s, "
+            f"sobreposição {metricas['sobreposicao']:.0%}) | fila máx {metricas['profundidade_maxima']}/"
+            f"{metricas['profundidade']}, média {metricas['profundidade_media']:.1f} | espera produtor "
+            f"{metricas['espera_produtor_s']:.2f}s, escritora {metricas['espera_escritora_s']:.2f}s "
+            f"→ gargalo: {metricas['gargalo']}")
+
+
+def simular(lotes: int, processamento: float, gravacao: float,
+            profundidade: int = PIPELINE_PROFUNDIDADE) -> Dict[str, Any]:
+    """Pipeline com lotes sintéticos (sleep), para comparar com a soma sequencial."""
+    def produzir():
+        for i in range(lotes):
+            time.sleep(processamento)
+            yield i
+
+    def gravar(_lote):
+        time.sleep(gravacao)
+        return 1
+
+    return executar_pipeline(produzir(), gravar, profundidade, nome='simulacao')
+
+
+def main():
+    """Interface de linha de comando."""
+    parser = argparse.ArgumentParser(description='Pipeline processamento/gravação com fila limitada')
+    parser.add_argument('--simular', action='store_true', help='Executa com lotes sintéticos')
+    parser.add_argument('--lotes', type=int, default=40, help='Lotes da simulação')
+    parser.add_argument('--processamento', type=float, default=0.03, help='Segundos de processamento por lote')
+    parser.add_argument('--gravacao', type=float, default=0.02, help='Segundos de gravação por lote')
+    parser.add_argument('--profundidade', type=int, default=PIPELINE_PROFUNDIDADE, help='Lotes na fila')
+    args = parser.parse_args()
+
+    if not args.simular:
+        parser.print_help()
+        return
+
+    sequencial = args.lotes * (args.processamento + args.gravacao)
+    metricas = simular(args.lotes, args.processamento, args.gravacao, args.profundidade)
+    print(f"⏱️ Sequencial estimado: {sequencial:.2f}s | "
+          f"max(processamento, gravação): {args.lotes * max(args.processamento, args.gravacao):.2f}s")
+    print(f"🔀 Pipeline: {formatar_metricas(metricas)}")
+
+
+if __name__ == '__main__':
+    main()
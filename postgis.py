@@ -0,0 +1,226 @@
+"""
+Suporte opcional a PostGIS para as tabelas com coordenadas.
+
+Cada tabela ganha uma coluna `geog geography(Point,4326)` gerada a partir das
+colunas de latitude/longitude, com índice GiST. Como a coluna é gerada
+(STORED), ela é preenchida pelo próprio INSERT da carga, sem UPDATE posterior.
+Se a extensão não estiver disponível no servidor, tudo é ignorado.
+
+Usage:
+    python postgis.py --explain    # Verifica se ST_DWithin e KNN usam o índice GiST
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Any, Tuple
+
+from sqlalchemy import text
+
+from database import SessionLocal
+
+# Tabelas com coordenadas: (coluna de latitude, coluna de longitude)
+TABELAS_COORDENADAS: Dict[str, Tuple[str, str]] = {
+    'aerodromos_privados': ('lat_geo_point', 'lon_geo_point'),
+    'aerodromos_publicos': ('latitude', 'longitude'),
+    'atracacoes_portuarias': ('latitude', 'longitude')
+}
+
+COLUNA_GEOGRAFICA = 'geog'
+
+
+def nome_indice_geografico(tabela: str) -> str:
+    """Nome do índice GiST da coluna geográfica de uma tabela."""
+    return f'ix_{tabela}_{COLUNA_GEOGRAFICA}'
+
+
+def sql_coluna_geografica(tabela: str) -> str:
+    """DDL que adiciona a coluna geográfica gerada à tabela."""
+    lat, lon = TABELAS_COORDENADAS[tabela]
+    return (
+        f"ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS {COLUNA_GEOGRAFICA} geography(Point, 4326) "
+        f"GENERATED ALWAYS AS (CAST(ST_SetSRID(ST_MakePoint({lon}, {lat}), 4326) AS geography)) STORED"
+    )
+
+
+def sql_indice_geografico(tabela: str) -> str:
+    """DDL do índice GiST sobre a coluna geográfica."""
+    return (
+        f"CREATE INDEX IF NOT EXISTS {nome_indice_geografico(tabela)} "
+        f"ON {tabela} USING GIST ({COLUNA_GEOGRAFICA})"
+    )
+
+
+def postgis_disponivel(db) -> bool:
+    """Indica se a extensão PostGIS está instalada ou pode ser instalada no banco."""
+    return db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'postgis')"
+    )).scalar()
+
+
+def garantir_coluna_geografica(db, tabela: str) -> bool:
+    """
+    Garante a extensão, a coluna geográfica e o índice GiST de uma tabela.
+
+    Executado dentro de um savepoint: se o PostGIS não estiver disponível ou
+    faltar permissão para criar a extensão, a transação da carga segue intacta.
+
+    Args:
+        db: Sessão SQLAlchemy da carga
+        tabela (str): Nome da tabela com coordenadas
+
+    Returns:
+        bool: True se a coluna geográfica está disponível
+    """
+    if tabela not in TABELAS_COORDENADAS:
+        raise ValueError(f"Tabela '{tabela}' não possui coordenadas mapeadas")
+
+    try:
+        if not postgis_disponivel(db):
+            return False
+
+        with db.begin_nested():
+            db.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+            db.execute(text(sql_coluna_geografica(tabela)))
+            db.execute(text(sql_indice_geografico(tabela)))
+        return True
+
+    except Exception as e:
+        print(f"⚠️ PostGIS indisponível para {tabela}: {e}")
+        return False
+
+
+def buscar_no_raio(db, tabela: str, lat: float, lon: float, raio_km: float) -> List[Dict[str, Any]]:
+    """Registros a até `raio_km` do ponto usando ST_DWithin (índice GiST)."""
+    rows = db.execute(text(f"""
+        SELECT id,
+               ST_Distance({COLUNA_GEOGRAFICA},
+                           CAST(ST_SetSRID(ST_MakePoint(:lon, :lat), 4326) AS geography)) / 1000.0 AS distancia_km
+        FROM {tabela}
+        WHERE ST_DWithin({COLUNA_GEOGRAFICA},
+                         CAST(ST_SetSRID(ST_MakePoint(:lon, :lat), 4326) AS geography), :raio_m)
+        ORDER BY distancia_km
+    """), {'lat': lat, 'lon': lon, 'raio_m': raio_km * 1000.0}).fetchall()
+
+    return [{'id': row[0], 'distancia_km': float(row[1])} for row in rows]
+
+
+def buscar_mais_proximos(db, tabela: str, lat: float, lon: float, k: int = 1) -> List[Dict[str, Any]]:
+    """Os `k` registros mais próximos do ponto usando o operador KNN `<->`."""
+    rows = db.execute(text(f"""
+        SELECT id, {COLUNA_GEOGRAFICA} <-> CAST(ST_SetSRID(ST_MakePoint(:lon, :lat), 4326) AS geography) AS distancia_m
+        FROM {tabela}
+        WHERE {COLUNA_GEOGRAFICA} IS NOT NULL
+        ORDER BY {COLUNA_GEOGRAFICA} <-> CAST(ST_SetSRID(ST_MakePoint(:lon, :lat), 4326) AS geography)
+        LIMIT :k
+    """), {'lat': lat, 'lon': lon, 'k': k}).fetchall()
+
+    return [{'id': row[0], 'distancia_km': float(row[1]) / 1000.0} for row in rows]
+
+
+def _usa_indice(plano: Any, indice: str) -> bool:
+    """Procura recursivamente no plano JSON um nó que use o índice."""
+    if isinstance(plano, dict):
+        if plano.get('Index Name') == indice:
+            return True
+        return any(_usa_indice(valor, indice) for valor in plano.values())
+    if isinstance(plano, list):
+        return any(_usa_indice(item, indice) for item in plano)
+    return False
+
+
+def verificar_uso_indices(lat: float = -23.5505, lon: float = -46.6333) -> Dict[str, Dict[str, bool]]:
+    """
+    Roda EXPLAIN das consultas de raio e KNN em cada tabela e verifica se o
+    índice GiST aparece no plano.
+
+    A varredura sequencial é desabilitada localmente para que tabelas pequenas
+    não escondam a disponibilidade do índice.
+    """
+    resultado = {}
+
+    with SessionLocal() as db:
+        for tabela in TABELAS_COORDENADAS:
+            indice = nome_indice_geografico(tabela)
+            existe = db.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = :indice)"
+            ), {'indice': indice}).scalar()
+
+            if not existe:
+                resultado[tabela] = {'indice_existe': False, 'st_dwithin': False, 'knn': False}
+                continue
+
+            db.execute(text("SET LOCAL enable_seqscan = off"))
+
+            plano_raio = db.execute(text(f"""
+                EXPLAIN (FORMAT JSON)
+                SELECT id FROM {tabela}
+                WHERE ST_DWithin({COLUNA_GEOGRAFICA},
+                                 CAST(ST_SetSRID(ST_MakePoint(:lon, :lat), 4326) AS geography), 50000)
+            """), {'lat': lat, 'lon': lon}).scalar()
+
+            plano_knn = db.execute(text(f"""
+                EXPLAIN (FORMAT JSON)
+                SELECT id FROM {tabela}
+                ORDER BY {COLUNA_GEOGRAFICA} <-> CAST(ST_SetSRID(ST_MakePoint(:lon, :lat), 4326) AS geography)
+                LIMIT 5
+            """), {'lat': lat, 'lon': lon}).scalar()
+
+            if isinstance(plano_raio, str):
+                plano_raio = json.loads(plano_raio)
+            if isinstance(plano_knn, str):
+                plano_knn = json.loads(plano_knn)
+
+            resultado[tabela] = {
+                'indice_existe': True,
+                'st_dwithin': _usa_indice(plano_raio, indice),
+                'knn': _usa_indice(plano_knn, indice)
+            }
+
+        db.rollback()
+
+    return resultado
+
+
+def main():
+    """Interface de linha de comando."""
+    parser = argparse.ArgumentParser(description='Suporte PostGIS do Brasil Data Hub')
+    parser.add_argument(
+        '--explain',
+        action='store_true',
+        help='Verifica via EXPLAIN se ST_DWithin e KNN usam o índice GiST'
+    )
+    parser.add_argument(
+        '--criar',
+        action='store_true',
+        help='Cria colunas geográficas e índices GiST nas tabelas existentes'
+    )
+    args = parser.parse_args()
+
+    if args.criar:
+        with SessionLocal() as db:
+            for tabela in TABELAS_COORDENADAS:
+                status = "✅" if garantir_coluna_geografica(db, tabela) else "⏭️"
+                print(f"{status} {tabela}")
+            db.commit()
+
+    if args.explain:
+        resultado = verificar_uso_indices()
+        falhas = 0
+        for tabela, checks in resultado.items():
+            if not checks['indice_existe']:
+                print(f"⚠️ {tabela}: índice {nome_indice_geografico(tabela)} não existe")
+                falhas += 1
+                continue
+            for consulta in ('st_dwithin', 'knn'):
+                ok = checks[consulta]
+                falhas += 0 if ok else 1
+                print(f"{'✅' if ok else '❌'} {tabela}: {consulta} {'usa' if ok else 'não usa'} o índice GiST")
+        sys.exit(0 if falhas == 0 else 1)
+
+    if not args.criar:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
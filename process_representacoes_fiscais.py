@@ -6,32 +6,33 @@ import pandas as pd
 import re
 import os
 import time
-import logging
 from datetime import datetime
 from decimal import InvalidOperation
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import text
-from database import engine, create_tables, SessionLocal
+from busca import garantir_indice_trigram
+from database import get_engine, create_tables, SessionLocal, registrar_carga
+from identificadores import gerar_uuid7
+from indices import GerenciadorIndices
 from models import RepresentacaoFiscal
+from mudancas import registrar_mudancas
+from municipio_resolver import normalizar_nome
+from perfilamento import argumento_perfil, perfilar
+from pipeline import PIPELINE_ATIVO, executar_pipeline, formatar_metricas
+from registro import configurar_logging, obter_logger
+from validacao import Validador, comprimento, para_registros
 
 # --- CONFIGURAÇÕES ---
 BATCH_SIZE = 1000   # Registros por inserção no banco
+CHUNK_LINHAS = int(os.getenv('REPRESENTACOES_CHUNK_LINHAS', '100000'))   # Linhas do CSV por bloco no pipeline
 
 # --- CONFIGURAÇÃO DE LOGS ---
+logger_lotes = obter_logger('representacoes_fiscais.lotes')
+
 def configurar_logs():
-    """Configura sistema de logs para arquivo e console."""
-    os.makedirs('logs', exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_filename = f'logs/process_representacoes_{timestamp}.log'
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_filename, encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
-    logger = logging.getLogger(__name__)
+    """Liga o logging do projeto (JSON lines em logs/ e console, via fila)."""
+    log_filename = configurar_logging('process_representacoes')
+    logger = obter_logger('representacoes_fiscais')
     logger.info(f"📋 Log iniciado: {log_filename}")
     logger.log_filename = log_filename
     return logger
@@ -48,44 +49,47 @@ def processar_dados(df):
     - Processo.Nome Contribuinte → CPF/CNPJ (***046789**)
     - Processo.Número de Inscrição com Máscara → VALOR NUMÉRICO (2318845.5799999996)
     - Medidas.Valor Total com Máscara → VALOR FORMATADO (R$ 2.318.845,58)
+
+    As colunas são convertidas de uma vez; registros que não sejam CPF (11)
+    ou CNPJ (14) são descartados pela validação, com contagem e amostra.
     """
-    dados_processados = []
-    for _, row in df.iterrows():
-        cpf_cnpj = str(row.get('Processo.Nome Contribuinte', ''))
-        
-        # Determinar tipo de documento baseado no tamanho e filtrar apenas CPF/CNPJ válidos
-        tipo_documento = None
-        if len(cpf_cnpj) == 11:
-            tipo_documento = 'CPF'
-        elif len(cpf_cnpj) == 14:
-            tipo_documento = 'CNPJ'
-        else:
-            # Pular registros que não sejam CPF (11) ou CNPJ (14)
-            continue
-        
-        dados_processados.append({
-            'cpf_cnpj': cpf_cnpj,  # CPF/CNPJ está aqui
-            'nome': str(row.get('Sum(Processo.Valor Total Processo)', '')),  # Nome está aqui
-            'valor_numerico': row.get('Processo.Número de Inscrição com Máscara', None),  # Valor numérico está aqui
-            'valor_formatado': str(row.get('Medidas.Valor Total com Máscara', '')),  # Valor formatado está correto
-            'tipo_documento': tipo_documento,
-            'mascarado': None,
-            'scraped_at': datetime.now()
-        })
-    return dados_processados
+    def coluna(nome, padrao=''):
+        return df[nome] if nome in df.columns else pd.Series(padrao, index=df.index, dtype=object)
+
+    dados = pd.DataFrame({
+        'cpf_cnpj': coluna('Processo.Nome Contribuinte').astype(str),  # CPF/CNPJ está aqui
+        'nome': coluna('Sum(Processo.Valor Total Processo)').astype(str),  # Nome está aqui
+        'nome_normalizado': coluna('Sum(Processo.Valor Total Processo)').map(normalizar_nome),
+        'valor_numerico': coluna('Processo.Número de Inscrição com Máscara', None),  # Valor numérico está aqui
+        'valor_formatado': coluna('Medidas.Valor Total com Máscara').astype(str),  # Valor formatado está correto
+    })
+
+    dados, _ = Validador('representacoes_fiscais', [
+        comprimento('cpf_cnpj', (11, 14), nome='cpf_cnpj_11_ou_14_digitos')
+    ]).validar(dados)
+
+    # Tipo de documento pelo tamanho
+    dados['tipo_documento'] = dados['cpf_cnpj'].str.len().map({11: 'CPF', 14: 'CNPJ'})
+    dados['mascarado'] = None
+    dados['scraped_at'] = datetime.now()
+    return para_registros(dados)
 
 def inserir_batch_otimizado(session, dados_batch):
     """Insere um batch de dados usando bulk insert otimizado."""
     if not dados_batch:
         return 0
     
+    # Chaves UUIDv7 geradas em bloco, crescentes na ordem de inserção
+    for registro, id_registro in zip(dados_batch, gerar_uuid7(len(dados_batch))):
+        registro.setdefault('id', id_registro)
+    
     try:
         session.bulk_insert_mappings(RepresentacaoFiscal, dados_batch)
         session.commit()
         return len(dados_batch)
     except Exception as e:
         session.rollback()
-        print(f"⚠️  Erro ao inserir batch: {e}")
+        logger_lotes.warning("⚠️  Erro ao inserir batch: %s", e)
         inserted = 0
         for item in dados_batch:
             try:
@@ -95,9 +99,69 @@ def inserir_batch_otimizado(session, dados_batch):
                 inserted += 1
             except Exception as individual_error:
                 session.rollback()
-                print(f"⚠️  Registro problemático ignorado: {individual_error}")
+                logger_lotes.warning("⚠️  Registro problemático ignorado: %s", individual_error)
         return inserted
 
+def inserir_sequencial(session, caminho_arquivo, logger=None):
+    """
+    Lê o CSV inteiro, processa tudo e só então insere em lotes.
+
+    Returns:
+        Tuple: (registros lidos, registros válidos, registros inseridos)
+    """
+    print("📂 Lendo o arquivo CSV...")
+    df = pd.read_csv(caminho_arquivo, encoding='utf-8', low_memory=False)
+    print(f"📄 Total de {len(df):,} registros lidos.")
+    if logger:
+        logger.info(f"📄 Total de {len(df):,} registros lidos do CSV.")
+
+    dados_processados = processar_dados(filtrar_dados_validos(df))
+
+    print(f"💾 Inserindo {len(dados_processados):,} registros em lotes de {BATCH_SIZE}...")
+    total_inserido = 0
+    for i in range(0, len(dados_processados), BATCH_SIZE):
+        batch = dados_processados[i:i + BATCH_SIZE]
+        inserido = inserir_batch_otimizado(session, batch)
+        total_inserido += inserido
+        logger_lotes.info("   -> Lote %s: %s registros inseridos.", i // BATCH_SIZE + 1, inserido)
+
+    return len(df), len(dados_processados), total_inserido
+
+def inserir_em_pipeline(session, caminho_arquivo, logger=None):
+    """
+    Lê e processa o CSV em blocos enquanto uma thread escritora insere os
+    lotes já prontos (ver pipeline.py). A sessão só é usada pela escritora.
+
+    Returns:
+        Tuple: (registros lidos, registros válidos, registros inseridos)
+    """
+    contagem = {'lidos': 0, 'validos': 0}
+
+    def produzir():
+        blocos = pd.read_csv(caminho_arquivo, encoding='utf-8', low_memory=False, chunksize=CHUNK_LINHAS)
+        for bloco in blocos:
+            contagem['lidos'] += len(bloco)
+            dados = processar_dados(filtrar_dados_validos(bloco))
+            contagem['validos'] += len(dados)
+            for i in range(0, len(dados), BATCH_SIZE):
+                yield dados[i:i + BATCH_SIZE]
+
+    lotes_gravados = [0]
+
+    def gravar(batch):
+        inserido = inserir_batch_otimizado(session, batch)
+        lotes_gravados[0] += 1
+        logger_lotes.info("   -> Lote %s: %s registros inseridos.", lotes_gravados[0], inserido)
+        return inserido
+
+    print(f"🔀 Lendo em blocos de {CHUNK_LINHAS:,} linhas e inserindo em lotes de {BATCH_SIZE} (pipeline)...")
+    metricas = executar_pipeline(produzir(), gravar, nome='representacoes')
+    print(f"🔀 Pipeline: {formatar_metricas(metricas)}")
+    if logger:
+        logger.info("🔀 Pipeline: %s", formatar_metricas(metricas))
+
+    return contagem['lidos'], contagem['validos'], metricas['registros']
+
 def otimizar_banco_para_insercao(session):
     """Otimiza o banco para inserções em massa."""
     print("⚙️  Otimizando banco para inserções em massa...")
@@ -120,7 +184,7 @@ def restaurar_otimizacoes_banco(session):
         session.execute(text("RESET synchronous_commit;"))
         session.commit()
         session.close()
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             conn.execution_options(isolation_level="AUTOCOMMIT")
             conn.execute(text("VACUUM ANALYZE representacoes_fiscais;"))
         print("✅ Configurações restauradas e tabela otimizada")
@@ -130,7 +194,7 @@ def restaurar_otimizacoes_banco(session):
 def testar_conexao_banco():
     """Testa a conexão com o banco de dados."""
     try:
-        Session = sessionmaker(bind=engine)
+        Session = sessionmaker(bind=get_engine())
         session = Session()
         session.execute(text("SELECT 1"))
         session.close()
@@ -191,6 +255,8 @@ def processar_csv(caminho_arquivo, logger=None):
     if logger:
         logger.info("✅ Conexão com PostgreSQL estabelecida")
 
+    indices = GerenciadorIndices('representacoes_fiscais')
+    
     with SessionLocal() as session:
         try:
             print("🗑️  Removendo e recriando a tabela 'representacoes_fiscais'...")
@@ -202,56 +268,48 @@ def processar_csv(caminho_arquivo, logger=None):
             if logger:
                 logger.info("✅ Tabela 'representacoes_fiscais' removida e recriada com sucesso")
 
+            # Índices secundários construídos uma vez, após os lotes
+            indices.remover(session)
+            session.commit()
+
             otimizar_banco_para_insercao(session)
             if logger:
                 logger.info("⚙️ Banco otimizado para inserções em massa")
 
-            print("📂 Lendo o arquivo CSV...")
-            df = pd.read_csv(caminho_arquivo, encoding='utf-8', low_memory=False)
-            
-            total_original = len(df)
-            print(f"📄 Total de {total_original:,} registros lidos.")
-            if logger:
-                logger.info(f"📄 Total de {total_original:,} registros lidos do CSV.")
+            if PIPELINE_ATIVO:
+                total_original, total_validos, total_inserido = inserir_em_pipeline(session, caminho_arquivo, logger)
+            else:
+                total_original, total_validos, total_inserido = inserir_sequencial(session, caminho_arquivo, logger)
 
-            df_valid = filtrar_dados_validos(df)
-            dados_processados = processar_dados(df_valid)
-            
-            total_validos = len(dados_processados)
             descartados = total_original - total_validos
-            print(f"✅ {total_validos:,} registros válidos para inserção.")
+            print(f"✅ {total_validos:,} registros válidos de {total_original:,} lidos.")
             print(f"🗑️ {descartados:,} registros descartados.")
             if logger:
-                logger.info(f"✅ {total_validos:,} registros válidos para inserção, {descartados:,} descartados.")
+                logger.info(f"✅ {total_validos:,} registros válidos de {total_original:,}, {descartados:,} descartados.")
 
-            if not dados_processados:
+            if not total_validos:
                 print("⚠️  Nenhum dado válido para inserir. Encerrando.")
                 if logger:
                     logger.warning("⚠️  Nenhum dado válido para inserir.")
                 return False
 
-            # Sem remoção de duplicados para inserir todos
-            dados_unicos = dados_processados
-            
-            total_unicos = len(dados_unicos)
-            print(f"✨ {total_unicos:,} registros para inserção.")
-            if logger:
-                logger.info(f"✨ {total_unicos:,} registros para inserção.")
-
-            print(f"💾 Inserindo {total_unicos:,} registros em lotes de {BATCH_SIZE}...")
-            
-            total_inserido = 0
-            for i in range(0, len(dados_unicos), BATCH_SIZE):
-                batch = dados_unicos[i:i + BATCH_SIZE]
-                inserido = inserir_batch_otimizado(session, batch)
-                total_inserido += inserido
-                print(f"   -> Lote {i//BATCH_SIZE + 1}: {inserido} registros inseridos.")
-
+            registrar_carga(session, 'representacoes_fiscais', total_inserido)
             session.commit()
             print(f"✅ Inserção concluída: {total_inserido:,} registros no total.")
             if logger:
                 logger.info(f"✅ Inserção concluída: {total_inserido:,} registros no total.")
 
+            # VACUUM ANALYZE roda em restaurar_otimizacoes_banco
+            indices.recriar(analisar=False)
+
+            # Índice trigram criado após a carga (a tabela é recriada a cada execução)
+            if garantir_indice_trigram(session, 'representacoes_fiscais'):
+                session.commit()
+                print("🔎 Índice de busca por nome criado")
+
+            # Delta em relação à carga anterior (feed de mudanças)
+            registrar_mudancas('representacoes_fiscais')
+
             mostrar_estatisticas_banco(session)
             
             return True
@@ -261,6 +319,10 @@ def processar_csv(caminho_arquivo, logger=None):
             if logger:
                 logger.error(f"❌ Erro durante o processamento: {e}", exc_info=True)
             session.rollback()
+            try:
+                indices.recriar(analisar=False)
+            except Exception as erro_indices:
+                print(f"⚠️  Erro ao recriar índices: {erro_indices}")
             return False
         
         finally:
@@ -382,4 +444,4 @@ def main():
     logger.info(f"📋 Log salvo em: {getattr(logger, 'log_filename', 'N/A')}")
 
 if __name__ == "__main__":
-    main()
+    perfilar('representacoes_fiscais_process', argumento_perfil(), main)
@@ -0,0 +1,250 @@
+"""
+Dados de referência do IBGE em memória (fronteira, mar e SUFRAMA).
+
+As três tabelas de municípios são pequenas (poucos milhares de linhas) e
+mudam só quando o scraper do IBGE roda. Em vez de uma consulta por pergunta
+("este município é de fronteira?"), elas são lidas uma vez para um snapshot
+imutável: dicionários e conjuntos congelados com chave `cd_mun`, respondidos
+em O(1) e seguros para ler entre threads sem lock.
+
+O snapshot guarda a geração de cada tabela em `cargas_tabelas`, que o
+`save_to_database` de cada scraper do IBGE incrementa via
+`registrar_carga`. No máximo a cada `REFERENCIA_INTERVALO` segundos,
+`obter_referencia()` compara essas gerações com o banco (uma consulta
+pequena) e só recarrega as tabelas se alguma mudou. No mesmo processo, o
+scraper chama `invalidar_referencia()` e a próxima leitura já verifica.
+
+Uso:
+
+    from referencia import obter_referencia
+    ref = obter_referencia()
+    if ref.na_fronteira(cd_mun) and ref.cidade_gemea(cd_mun): ...
+
+Usage:
+    python referencia.py 1302603 4314100     # Atributos dos municípios
+    python referencia.py --resumo            # Tamanho dos conjuntos e gerações
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Any, Mapping, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from database import SessionLocal, get_cargas
+from municipio_resolver import normalizar_nome
+
+load_dotenv()
+
+TABELAS_REFERENCIA = ('municipios_fronteira', 'municipios_maritimos', 'municipios_suframa')
+
+# Intervalo mínimo entre verificações de geração no banco (segundos)
+REFERENCIA_INTERVALO = float(os.getenv('REFERENCIA_INTERVALO', '30'))
+
+CONSULTA_FRONTEIRA = """
+    SELECT cd_mun, nm_mun, sigla_uf, toca_lim, faixa_sede, cid_gemea, area_int, porc_int
+    FROM municipios_fronteira
+"""
+CONSULTA_MARITIMOS = "SELECT cd_mun, nm_mun, sigla_uf, area_km2 FROM municipios_maritimos"
+CONSULTA_SUFRAMA = "SELECT cd_mun, nm_mun, tipo_zona FROM municipios_suframa"
+
+
+def _sim(valor: Any) -> bool:
+    return normalizar_nome(valor) == 'SIM'
+
+
+def _congelar(dados: Dict[str, Dict[str, Any]]) -> Mapping[str, Mapping[str, Any]]:
+    return MappingProxyType({chave: MappingProxyType(valor) for chave, valor in dados.items()})
+
+
+class DadosReferencia:
+    """Snapshot imutável dos conjuntos de municípios do IBGE."""
+
+    __slots__ = ('geracoes', 'carregado_em', 'fronteira', 'maritimos', 'suframa', 'cidades_gemeas', 'nomes')
+
+    def __init__(self, geracoes: Mapping[str, int],
+                 fronteira: List[Tuple], maritimos: List[Tuple], suframa: List[Tuple]):
+        """
+        Args:
+            geracoes: Geração de cada tabela no momento da leitura
+            fronteira: Linhas (cd_mun, nm_mun, sigla_uf, toca_lim, faixa_sede, cid_gemea, area_int, porc_int)
+            maritimos: Linhas (cd_mun, nm_mun, sigla_uf, area_km2)
+            suframa: Linhas (cd_mun, nm_mun, tipo_zona)
+        """
+        nomes: Dict[str, str] = {}
+
+        dados_fronteira = {}
+        for cd_mun, nm_mun, sigla_uf, toca_lim, faixa_sede, cid_gemea, area_int, porc_int in fronteira:
+            nomes.setdefault(cd_mun, nm_mun)
+            dados_fronteira[cd_mun] = {
+                'nm_mun': nm_mun,
+                'sigla_uf': sigla_uf,
+                'toca_limite': _sim(toca_lim),
+                'sede_na_faixa': _sim(faixa_sede),
+                'cidade_gemea': _sim(cid_gemea),
+                'area_na_faixa_km2': area_int,
+                'percentual_na_faixa': porc_int
+            }
+
+        dados_maritimos = {}
+        for cd_mun, nm_mun, sigla_uf, area_km2 in maritimos:
+            nomes.setdefault(cd_mun, nm_mun)
+            dados_maritimos[cd_mun] = {'nm_mun': nm_mun, 'sigla_uf': sigla_uf, 'area_km2': area_km2}
+
+        zonas: Dict[str, set] = {}
+        for cd_mun, nm_mun, tipo_zona in suframa:
+            nomes.setdefault(cd_mun, nm_mun)
+            zonas.setdefault(cd_mun, set()).add(tipo_zona)
+
+        self.geracoes: Mapping[str, int] = MappingProxyType(dict(geracoes))
+        self.carregado_em = time.time()
+        self.fronteira = _congelar(dados_fronteira)
+        self.maritimos = _congelar(dados_maritimos)
+        self.suframa: Mapping[str, FrozenSet[str]] = MappingProxyType(
+            {cd_mun: frozenset(tipos) for cd_mun, tipos in zonas.items()}
+        )
+        self.cidades_gemeas: FrozenSet[str] = frozenset(
+            cd_mun for cd_mun, dados in dados_fronteira.items() if dados['cidade_gemea']
+        )
+        self.nomes: Mapping[str, str] = MappingProxyType(nomes)
+
+    # Predicados
+    def na_fronteira(self, cd_mun: str) -> bool:
+        return cd_mun in self.fronteira
+
+    def maritimo(self, cd_mun: str) -> bool:
+        return cd_mun in self.maritimos
+
+    def na_suframa(self, cd_mun: str, tipo_zona: Optional[str] = None) -> bool:
+        zonas = self.suframa.get(cd_mun)
+        if not zonas:
+            return False
+        return tipo_zona is None or tipo_zona in zonas
+
+    def cidade_gemea(self, cd_mun: str) -> bool:
+        return cd_mun in self.cidades_gemeas
+
+    # Atributos
+    def nome(self, cd_mun: str) -> Optional[str]:
+        return self.nomes.get(cd_mun)
+
+    def zonas_suframa(self, cd_mun: str) -> FrozenSet[str]:
+        return self.suframa.get(cd_mun, frozenset())
+
+    def atributos(self, cd_mun: str) -> Dict[str, Any]:
+        """Tudo o que os conjuntos de referência sabem sobre o município."""
+        return {
+            'cd_mun': cd_mun,
+            'nm_mun': self.nome(cd_mun),
+            'fronteira': dict(self.fronteira[cd_mun]) if cd_mun in self.fronteira else None,
+            'maritimo': dict(self.maritimos[cd_mun]) if cd_mun in self.maritimos else None,
+            'zonas_suframa': sorted(self.zonas_suframa(cd_mun))
+        }
+
+    def resumo(self) -> Dict[str, Any]:
+        return {
+            'geracoes': dict(self.geracoes),
+            'fronteira': len(self.fronteira),
+            'cidades_gemeas': len(self.cidades_gemeas),
+            'maritimos': len(self.maritimos),
+            'suframa': len(self.suframa),
+            'municipios': len(self.nomes)
+        }
+
+
+def _geracoes_atuais(db) -> Dict[str, int]:
+    cargas = get_cargas(db)
+    return {tabela: (cargas.get(tabela) or {}).get('geracao', 0) for tabela in TABELAS_REFERENCIA}
+
+
+def carregar_referencia() -> DadosReferencia:
+    """Lê as três tabelas e monta um novo snapshot."""
+    with SessionLocal() as db:
+        # Gerações antes dos dados: uma carga concorrente deixa o snapshot
+        # com geração antiga, e a próxima verificação recarrega
+        geracoes = _geracoes_atuais(db)
+        linhas = {}
+        for nome, consulta in (('fronteira', CONSULTA_FRONTEIRA), ('maritimos', CONSULTA_MARITIMOS),
+                               ('suframa', CONSULTA_SUFRAMA)):
+            try:
+                linhas[nome] = [tuple(row) for row in db.execute(text(consulta)).fetchall()]
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️ Tabela de referência indisponível ({nome}): {e}")
+                linhas[nome] = []
+
+    return DadosReferencia(geracoes, linhas['fronteira'], linhas['maritimos'], linhas['suframa'])
+
+
+# Snapshot compartilhado do processo
+_referencia: Optional[DadosReferencia] = None
+_verificado_em = float('-inf')
+_lock = threading.Lock()
+
+
+def obter_referencia(intervalo: float = REFERENCIA_INTERVALO) -> DadosReferencia:
+    """
+    Snapshot atual, recarregado só quando a geração de alguma tabela mudou.
+
+    Entre verificações, a chamada não toca o banco. O snapshot devolvido
+    nunca é alterado; quem o guardou continua lendo dados consistentes.
+    """
+    global _referencia, _verificado_em
+    agora = time.monotonic()
+    if _referencia is not None and agora - _verificado_em < intervalo:
+        return _referencia
+
+    with _lock:
+        if _referencia is not None and agora - _verificado_em < intervalo:
+            return _referencia
+
+        if _referencia is None:
+            _referencia = carregar_referencia()
+            print(f"📚 Dados de referência carregados: {_referencia.resumo()}")
+        else:
+            try:
+                with SessionLocal() as db:
+                    geracoes = _geracoes_atuais(db)
+                if geracoes != dict(_referencia.geracoes):
+                    _referencia = carregar_referencia()
+                    print(f"📚 Dados de referência recarregados (gerações {geracoes})")
+            except Exception as e:
+                # Banco indisponível: segue com o snapshot anterior
+                print(f"⚠️ Erro ao verificar gerações dos dados de referência: {e}")
+
+        _verificado_em = agora
+        return _referencia
+
+
+def invalidar_referencia() -> None:
+    """Força a verificação de geração na próxima leitura (após uma carga do IBGE)."""
+    global _verificado_em
+    with _lock:
+        _verificado_em = float('-inf')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dados de referência do IBGE (fronteira, mar, SUFRAMA)')
+    parser.add_argument('cd_mun', nargs='*', help='Códigos IBGE a consultar')
+    parser.add_argument('--resumo', action='store_true', help='Tamanho dos conjuntos e gerações')
+    args = parser.parse_args()
+
+    if not args.cd_mun and not args.resumo:
+        parser.print_help()
+        sys.exit(1)
+
+    referencia = obter_referencia()
+    if args.resumo:
+        print(json.dumps(referencia.resumo(), indent=2, ensure_ascii=False))
+    for cd_mun in args.cd_mun:
+        print(json.dumps(referencia.atributos(cd_mun), indent=2, ensure_ascii=False, default=str))
+
+
+if __name__ == "__main__":
+    main()
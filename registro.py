@@ -0,0 +1,227 @@
+"""
+Logging estruturado e não bloqueante do projeto.
+
+As mensagens vão para uma fila (`QueueHandler`); uma thread dedicada
+(`QueueListener`) formata e grava. Assim o laço que registra não espera por
+disco nem terminal. Cada processo grava seu próprio arquivo JSON lines em
+`LOG_DIR` (um objeto por linha, com nível, logger, pid e thread). Depois de
+um fork, o filho abre uma fila e um arquivo novos, o que torna o subsistema
+seguro entre threads e processos.
+
+Antes de entrar na fila, cada mensagem passa por um limitador por ponto de
+chamada (arquivo:linha, ou `extra={'chave': ...}`), com balde de fichas de
+`LOG_TAXA_POR_SEGUNDO` e rajada `LOG_RAJADA`. As mensagens descartadas são
+contadas e informadas na próxima que passar. Com `extra={'amostra': 0.01}`
+só 1% das chamadas daquele ponto é registrado. Erros nunca são limitados.
+
+Uso:
+
+    from registro import obter_logger
+    logger = obter_logger(__name__)
+    logger.debug("Linha %s ignorada", idx)   # formatação só se passar
+"""
+
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from dotenv import load_dotenv
+
+from serializacao import dumps_texto
+
+load_dotenv()
+
+LOGGER_RAIZ = 'brasil_data_hub'
+
+LOG_DIR = os.getenv('LOG_DIR', 'logs')
+LOG_NIVEL = 'DEBUG' if os.getenv('DEBUG_MODE', 'false').lower() == 'true' else os.getenv('LOG_NIVEL', 'INFO')
+LOG_TAXA_POR_SEGUNDO = float(os.getenv('LOG_TAXA_POR_SEGUNDO', '20'))
+LOG_RAJADA = float(os.getenv('LOG_RAJADA', '50'))
+
+_lock = threading.Lock()
+_estado: Dict[str, Any] = {'pid': None, 'listener': None, 'handler': None, 'arquivo': None, 'nome': None}
+
+
+class LimitadorTaxa(logging.Filter):
+    """Amostragem e limite de taxa por ponto de chamada (balde de fichas)."""
+
+    def __init__(self, taxa: float = LOG_TAXA_POR_SEGUNDO, rajada: float = LOG_RAJADA):
+        super().__init__()
+        self.taxa = taxa
+        self.rajada = max(1.0, rajada)
+        self._baldes: Dict[Any, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+
+        amostra = getattr(record, 'amostra', None)
+        if amostra is not None and random.random() >= amostra:
+            return False
+
+        chave = getattr(record, 'chave', None) or (record.pathname, record.lineno)
+        agora = time.monotonic()
+        with self._lock:
+            balde = self._baldes.get(chave)
+            if balde is None:
+                balde = self._baldes[chave] = [self.rajada, agora, 0]
+
+            # [fichas, último acesso, suprimidas]
+            fichas = min(self.rajada, balde[0] + (agora - balde[1]) * self.taxa)
+            balde[1] = agora
+            if fichas < 1:
+                balde[0] = fichas
+                balde[2] += 1
+                return False
+
+            balde[0] = fichas - 1
+            suprimidas, balde[2] = balde[2], 0
+
+        if suprimidas:
+            record.suprimidas = int(suprimidas)
+        return True
+
+
+class FormatadorJSON(logging.Formatter):
+    """Um objeto JSON por linha."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+            'pid': record.process,
+            'thread': record.threadName
+        }
+        if getattr(record, 'suprimidas', 0):
+            dados['suprimidas'] = record.suprimidas
+        if getattr(record, 'dados', None) is not None:
+            dados['dados'] = record.dados
+        return dumps_texto(dados)
+
+
+class FormatadorConsole(logging.Formatter):
+    """Mensagem como nos prints, com a contagem de suprimidas quando houver."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        mensagem = record.getMessage()
+        if getattr(record, 'suprimidas', 0):
+            mensagem += f" (+{record.suprimidas} mensagens semelhantes suprimidas)"
+        return mensagem
+
+
+class _ConfiguracaoPreguicosa(logging.Handler):
+    """Liga a fila na primeira mensagem, se nenhum ponto de entrada chamou `configurar_logging`."""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        configurar_logging(_estado['nome'] or LOGGER_RAIZ)
+        return _estado['handler'].handle(record)
+
+
+_preguicoso = _ConfiguracaoPreguicosa()
+
+
+def configurar_logging(nome: str = LOGGER_RAIZ, nivel: str = LOG_NIVEL, console: bool = True) -> str:
+    """
+    Liga a fila de logging deste processo (idempotente por PID).
+
+    Args:
+        nome (str): Prefixo do arquivo de log
+        nivel (str): Nível mínimo (DEBUG, INFO, ...)
+        console (bool): Também escrever as mensagens no terminal
+
+    Returns:
+        str: Caminho do arquivo JSON lines
+    """
+    with _lock:
+        if _estado['pid'] == os.getpid():
+            return _estado['arquivo']
+
+        Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        arquivo = str(Path(LOG_DIR) / f'{nome}_{timestamp}_{os.getpid()}.jsonl')
+
+        arquivo_handler = logging.FileHandler(arquivo, encoding='utf-8', delay=True)
+        arquivo_handler.setFormatter(FormatadorJSON())
+        handlers: List[logging.Handler] = [arquivo_handler]
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(FormatadorConsole())
+            handlers.append(console_handler)
+
+        fila: queue.Queue = queue.Queue(-1)
+        listener = QueueListener(fila, *handlers, respect_handler_level=True)
+        listener.start()
+
+        handler = QueueHandler(fila)
+        handler.addFilter(LimitadorTaxa())
+
+        raiz = logging.getLogger(LOGGER_RAIZ)
+        raiz.setLevel(nivel.upper())
+        raiz.removeHandler(_preguicoso)
+        raiz.addHandler(handler)
+
+        _estado.update(pid=os.getpid(), listener=listener, handler=handler, arquivo=arquivo, nome=nome)
+        return arquivo
+
+
+def obter_logger(nome: str) -> logging.Logger:
+    """Logger do projeto (filho de `brasil_data_hub`); a fila é ligada na primeira mensagem."""
+    if nome != LOGGER_RAIZ and not nome.startswith(f'{LOGGER_RAIZ}.'):
+        nome = f'{LOGGER_RAIZ}.{nome}'
+    return logging.getLogger(nome)
+
+
+def arquivo_log() -> Optional[str]:
+    """Arquivo JSON lines do processo atual (None se o logging não foi ligado)."""
+    return _estado['arquivo'] if _estado['pid'] == os.getpid() else None
+
+
+def encerrar_logging() -> None:
+    """Esvazia a fila e para a thread de escrita deste processo."""
+    with _lock:
+        if _estado['pid'] != os.getpid():
+            return
+        logging.getLogger(LOGGER_RAIZ).removeHandler(_estado['handler'])
+        _estado['listener'].stop()
+        for handler in _estado['listener'].handlers:
+            handler.close()
+        _estado.update(pid=None, listener=None, handler=None, arquivo=None)
+
+
+def _reiniciar_no_filho() -> None:
+    """
+    Após um fork, a thread de escrita não existe no filho e a fila herdada
+    pode estar num estado inconsistente: troca por uma fila e arquivo novos.
+    """
+    global _lock
+    _lock = threading.Lock()
+    handler = _estado['handler']
+    if handler is None:
+        return
+    raiz = logging.getLogger(LOGGER_RAIZ)
+    raiz.removeHandler(handler)
+    raiz.addHandler(_preguicoso)
+    _estado.update(pid=None, listener=None, handler=None, arquivo=None)
+
+
+_raiz = logging.getLogger(LOGGER_RAIZ)
+_raiz.setLevel(LOG_NIVEL.upper())
+_raiz.propagate = False
+_raiz.addHandler(_preguicoso)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_no_filho)
+
+atexit.register(encerrar_logging)
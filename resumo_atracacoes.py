@@ -0,0 +1,159 @@
+"""
+Resumo mensal das atracações portuárias (porto × mês × tipo de operação).
+
+A tabela `atracacoes_resumo_mensal` guarda contagens e média/p50/p90 dos
+tempos de espera, atracado e de operação, calculados a partir das colunas de
+duração de `atracacoes_portuarias`. Após cada carga, só os meses carregados
+são recalculados; meses que deixaram de existir na tabela base são removidos.
+
+Usage:
+    python resumo_atracacoes.py                 # Recalcula todos os meses
+    python resumo_atracacoes.py --porto Santos  # Exibe o resumo de um porto
+"""
+
+import argparse
+import time
+from datetime import date
+from typing import Dict, List, Any, Iterable, Optional
+
+from sqlalchemy import text
+
+from database import SessionLocal, create_tables, registrar_carga
+
+TABELA_RESUMO = 'atracacoes_resumo_mensal'
+
+# Colunas de duração: prefixo das colunas do resumo
+DURACOES = {
+    'tempo_espera': 'espera',
+    'tempo_atracado': 'atracado',
+    'tempo_operacao': 'operacao'
+}
+
+
+def _metricas_sql() -> str:
+    """Expressões de média e percentis (em horas) de cada duração."""
+    expressoes = []
+    for coluna, prefixo in DURACOES.items():
+        horas = f"EXTRACT(EPOCH FROM {coluna}) / 3600.0"
+        expressoes.extend([
+            f"AVG({horas}) AS {prefixo}_media_horas",
+            f"percentile_cont(0.5) WITHIN GROUP (ORDER BY {horas}) AS {prefixo}_p50_horas",
+            f"percentile_cont(0.9) WITHIN GROUP (ORDER BY {horas}) AS {prefixo}_p90_horas"
+        ])
+    return ',\n               '.join(expressoes)
+
+
+def _colunas_metricas() -> str:
+    return ', '.join(
+        f"{prefixo}_{metrica}_horas"
+        for prefixo in DURACOES.values()
+        for metrica in ('media', 'p50', 'p90')
+    )
+
+
+def atualizar_resumo_mensal(db, meses: Optional[Iterable[date]] = None) -> int:
+    """
+    Recalcula o resumo dos meses informados na transação da carga.
+
+    Args:
+        db: Sessão SQLAlchemy (o commit fica com o chamador)
+        meses: Primeiros dias dos meses a recalcular (padrão: todos)
+
+    Returns:
+        int: Linhas gravadas no resumo
+    """
+    filtro_meses = ""
+    parametros: Dict[str, Any] = {}
+
+    if meses is None:
+        db.execute(text(f"DELETE FROM {TABELA_RESUMO}"))
+    else:
+        parametros['meses'] = sorted(set(meses))
+        filtro_meses = "AND date_trunc('month', data_atracacao)::date = ANY(:meses)"
+
+        # Meses que sumiram da tabela base (carga completa substituída)
+        db.execute(text(f"""
+            DELETE FROM {TABELA_RESUMO} r
+            WHERE NOT EXISTS (
+                SELECT 1 FROM atracacoes_portuarias a
+                WHERE a.data_atracacao >= r.mes_referencia
+                  AND a.data_atracacao < r.mes_referencia + INTERVAL '1 month'
+            )
+        """))
+
+        if not parametros['meses']:
+            return 0
+        db.execute(text(f"DELETE FROM {TABELA_RESUMO} WHERE mes_referencia = ANY(:meses)"), parametros)
+
+    resultado = db.execute(text(f"""
+        INSERT INTO {TABELA_RESUMO} (
+            id, porto_atracacao, mes_referencia, tipo_operacao, total_atracacoes,
+            {_colunas_metricas()}, atualizado_em
+        )
+        SELECT gen_random_uuid(), porto_atracacao,
+               date_trunc('month', data_atracacao)::date AS mes_referencia,
+               tipo_operacao,
+               COUNT(*) AS total_atracacoes,
+               {_metricas_sql()},
+               now()
+        FROM atracacoes_portuarias
+        WHERE data_atracacao IS NOT NULL {filtro_meses}
+        GROUP BY porto_atracacao, date_trunc('month', data_atracacao)::date, tipo_operacao
+    """), parametros)
+
+    return resultado.rowcount
+
+
+def consultar_resumo(porto: Optional[str] = None, limite: int = 24) -> List[Dict[str, Any]]:
+    """Linhas do resumo, mais recentes primeiro, opcionalmente de um porto."""
+    filtro = "WHERE porto_atracacao ILIKE :porto" if porto else ""
+    with SessionLocal() as db:
+        rows = db.execute(text(f"""
+            SELECT porto_atracacao, mes_referencia, tipo_operacao, total_atracacoes,
+                   espera_p50_horas, atracado_p50_horas, operacao_p50_horas
+            FROM {TABELA_RESUMO}
+            {filtro}
+            ORDER BY mes_referencia DESC, total_atracacoes DESC
+            LIMIT :limite
+        """), {'porto': f'%{porto}%', 'limite': limite}).fetchall()
+
+    return [
+        {
+            'porto': row[0],
+            'mes_referencia': row[1],
+            'tipo_operacao': row[2],
+            'total_atracacoes': row[3],
+            'espera_p50_horas': row[4],
+            'atracado_p50_horas': row[5],
+            'operacao_p50_horas': row[6]
+        }
+        for row in rows
+    ]
+
+
+def main():
+    """Interface de linha de comando."""
+    parser = argparse.ArgumentParser(description='Resumo mensal das atracações portuárias')
+    parser.add_argument('--porto', help='Exibe o resumo de um porto (busca parcial)')
+    parser.add_argument('--limite', type=int, default=24, help='Linhas exibidas')
+    args = parser.parse_args()
+
+    if args.porto:
+        for linha in consultar_resumo(args.porto, args.limite):
+            print(f"   {linha['mes_referencia']} {linha['porto']} [{linha['tipo_operacao']}]: "
+                  f"{linha['total_atracacoes']} atracações, espera p50 {linha['espera_p50_horas'] or 0:.1f}h, "
+                  f"atracado p50 {linha['atracado_p50_horas'] or 0:.1f}h")
+        return
+
+    create_tables()
+    print("📊 Recalculando resumo mensal das atracações...")
+    inicio = time.time()
+    with SessionLocal() as db:
+        total = atualizar_resumo_mensal(db)
+        registrar_carga(db, TABELA_RESUMO, total)
+        db.commit()
+    print(f"✅ {total} linhas de resumo gravadas em {time.time() - inicio:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
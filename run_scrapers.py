@@ -7,16 +7,20 @@ Este script:
 2. Executa todos os scrapers em sequência
 3. Gera relatório final com estatísticas
 4. Salva logs detalhados de execução
+5. Registra o histórico em scraper_runs e sinaliza regressões de desempenho
+   (código de saída 3 quando tudo conclui, mas algum scraper ficou mais lento)
+6. Reconstrói o perfil denormalizado por município (municipio_profile)
 
 Usage:
     python run_scrapers.py                    # Executa todos os scrapers
     python run_scrapers.py --scraper private # Executa apenas aeródromos privados
     python run_scrapers.py --scraper public  # Executa apenas aeródromos públicos
     python run_scrapers.py --no-clean        # Executa sem limpar as tabelas
+    python run_scrapers.py --profile cpu     # Perfis de CPU por scraper em logs/
+    python run_scrapers.py --daemon          # Agendador: roda só as fontes alteradas
 """
 
 import argparse
-import json
 import sys
 import time
 from datetime import datetime
@@ -28,7 +32,13 @@ from sqlalchemy import text
 # Adicionar pasta scrapers ao path
 sys.path.append(str(Path(__file__).parent))
 
-from database import SessionLocal, create_tables, get_stats
+from agendador import executar_daemon
+from checkpoints import arquivos_pendentes
+from database import SessionLocal, create_tables, get_stats, get_pool_metrics
+from desempenho import detectar_regressoes, registrar_execucao
+from identificadores import uuid7
+from perfil_municipios import SCRAPERS_PERFIL, atualizar_perfil
+from perfilamento import MODOS_PERFIL, perfilar
 from scrapers.aerodromos_privados import AerodromosPrivadosScraper
 from scrapers.aerodromos_publicos import AerodromosPublicosScraper
 from scrapers.municipios_maritimos import MunicipiosMaritimosIBGEScraper
@@ -36,25 +46,20 @@ from scrapers.municipios_fronteira import MunicipiosFronteiraIBGEScraper
 from scrapers.municipios_suframa import MunicipiosSuframaIBGEScraper
 from scrapers.atracacoes_portuarias import AtracacoesPortuariasANTAQScraper
 from process_representacoes_fiscais import main as processar_representacoes_fiscais
+from serializacao import gravar_json
 from utils import cleanup_all_data_files
 
 
 class BrasilDataHubScrapersManager:
     """Gerenciador principal para todos os scrapers do Brasil Data Hub."""
     
-    def __init__(self):
+    def __init__(self, profile: Optional[str] = None):
         """Inicializa o gerenciador com todos os scrapers disponíveis."""
+        # Perfilamento do run() de cada scraper ('cpu', 'mem' ou None)
+        self.profile = profile
+        
         self.scrapers = {
-            'private': {
-                'name': 'Aeródromos Privados',
-                'scraper': AerodromosPrivadosScraper(),
-                'description': 'Aeródromos privados registrados na ANAC'
-            },
-            'public': {
-                'name': 'Aeródromos Públicos', 
-                'scraper': AerodromosPublicosScraper(),
-                'description': 'Aeródromos públicos registrados na ANAC'
-            },
+            # IBGE primeiro: o resolvedor de cd_mun dos demais loaders usa estas tabelas
             'maritimos': {
                 'name': 'Municípios Marítimos',
                 'scraper': MunicipiosMaritimosIBGEScraper(),
@@ -70,6 +75,16 @@ class BrasilDataHubScrapersManager:
                 'scraper': MunicipiosSuframaIBGEScraper(),
                 'description': 'Municípios das Zonas Fiscais Especiais da SUFRAMA - IBGE'
             },
+            'private': {
+                'name': 'Aeródromos Privados',
+                'scraper': AerodromosPrivadosScraper(),
+                'description': 'Aeródromos privados registrados na ANAC'
+            },
+            'public': {
+                'name': 'Aeródromos Públicos', 
+                'scraper': AerodromosPublicosScraper(),
+                'description': 'Aeródromos públicos registrados na ANAC'
+            },
             'portos': {
                 'name': 'Atracações Portuárias',
                 'scraper': AtracacoesPortuariasANTAQScraper(),
@@ -128,7 +143,7 @@ class BrasilDataHubScrapersManager:
                 print(f"{'='*70}")
                 start_time = time.time()
                 try:
-                    arquivo_csv = executar_estrategias_avancadas()
+                    arquivo_csv = perfilar(scraper_key, self.profile, executar_estrategias_avancadas)
                     result = {
                         'success': True,
                         'scraper_name': 'Representações Fiscais (Scraper)',
@@ -155,7 +170,7 @@ class BrasilDataHubScrapersManager:
                 print(f"{'='*70}")
                 start_time = time.time()
                 try:
-                    processar_representacoes_fiscais()
+                    perfilar(scraper_key, self.profile, processar_representacoes_fiscais)
                     result = {
                         'success': True,
                         'scraper_name': 'Representações Fiscais (Processamento)',
@@ -199,7 +214,7 @@ class BrasilDataHubScrapersManager:
                     print(f"❌ Representações Fiscais: Falhou - {e}")
                 return result
             else:
-                result = scraper_info['scraper'].run()
+                result = perfilar(scraper_key, self.profile, scraper_info['scraper'].run)
                 result['scraper_name'] = scraper_info['name']
                 result['scraper_key'] = scraper_key
                 result['execution_time'] = time.time() - start_time
@@ -275,7 +290,10 @@ class BrasilDataHubScrapersManager:
                 execution_log['scrapers_executed'].append(error_result)
                 print(f"💥 Erro crítico no scraper {scraper_key}: {e}")
         
-        # 3. Estatísticas finais
+        # 3. Perfil denormalizado por município
+        perfil_municipios = self.atualizar_perfil_municipios()
+        
+        # 4. Estatísticas finais
         total_execution_time = time.time() - start_time
         
         try:
@@ -284,7 +302,16 @@ class BrasilDataHubScrapersManager:
             print(f"⚠️ Erro ao obter estatísticas finais do banco: {e}")
             final_database_stats = {}
         
-        # 4. Compilar resumo
+        try:
+            pool_metrics = get_pool_metrics()
+        except Exception as e:
+            print(f"⚠️ Erro ao obter métricas do pool de conexões: {e}")
+            pool_metrics = {}
+        
+        # 5. Histórico de desempenho e regressões
+        regressoes = self.registrar_historico(results)
+        
+        # 6. Compilar resumo
         total_scrapers = len(self.scrapers) + 2  # +2 para os scrapers de representações fiscais
         execution_summary = {
             'total_scrapers': total_scrapers,
@@ -292,31 +319,55 @@ class BrasilDataHubScrapersManager:
             'failed_scrapers': failed_scrapers,
             'total_execution_time': total_execution_time,
             'database_stats': final_database_stats,
+            'pool_metrics': pool_metrics,
+            'perfil_municipios': perfil_municipios,
+            'regressoes': regressoes,
             'individual_results': results,
             'end_time': datetime.now().isoformat()
         }
         
         execution_log['summary'] = execution_summary
         
-        # 5. Salvar log de execução
+        # 7. Salvar log de execução
         self._save_execution_log(execution_log)
         
-        # 6. Limpeza final de arquivos brutos
+        # 8. Limpeza final de arquivos brutos
         self._cleanup_raw_files()
         
-        # 7. Exibir relatório final
+        # 9. Exibir relatório final
         self._print_final_report(execution_summary)
         
         return execution_summary
     
+    def registrar_historico(self, results: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Grava os resultados em scraper_runs e retorna as regressões de desempenho."""
+        if self.profile:
+            # cProfile/tracemalloc deixam a execução várias vezes mais lenta: fora da linha de base
+            print(f"🔬 Execução com --profile {self.profile}: histórico de desempenho não registrado")
+            return []
+        try:
+            execucao_id = uuid7()
+            registrar_execucao(execucao_id, results)
+            return detectar_regressoes(execucao_id, results)
+        except Exception as e:
+            print(f"⚠️ Erro ao registrar histórico de desempenho: {e}")
+            return []
+    
+    def atualizar_perfil_municipios(self) -> Optional[int]:
+        """Reconstrói o municipio_profile; retorna os municípios gravados (None em caso de erro)."""
+        try:
+            return atualizar_perfil()
+        except Exception as e:
+            print(f"⚠️ Erro ao reconstruir o perfil de municípios: {e}")
+            return None
+    
     def _save_execution_log(self, execution_log: Dict[str, Any]) -> None:
         """Salva o log detalhado da execução."""
         try:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             log_file = f'logs/scrapers_execution_{timestamp}.json'
             
-            with open(log_file, 'w', encoding='utf-8') as f:
-                json.dump(execution_log, f, ensure_ascii=False, indent=2, default=str)
+            gravar_json(log_file, execution_log, indentar=True)
             
             print(f"📋 Log de execução salvo em: {log_file}")
             
@@ -336,8 +387,14 @@ class BrasilDataHubScrapersManager:
             removed_count = 0
             total_size = 0
             
+            # Arquivos de cargas interrompidas ficam para a retomada
+            preservados = {Path(arquivo).resolve() for arquivo in arquivos_pendentes()}
+            
             # Percorrer todos os arquivos na pasta raw
             for file_path in raw_path.iterdir():
+                if file_path.resolve() in preservados:
+                    print(f"   ⏯️ Mantido para retomada: {file_path.name}")
+                    continue
                 if file_path.is_file() and not file_path.name.startswith('.'):
                     try:
                         file_size = file_path.stat().st_size
@@ -462,9 +519,33 @@ class BrasilDataHubScrapersManager:
             if 'municipios_suframa' in db_stats:
                 suframa_stats = db_stats['municipios_suframa']
                 print(f"   🏗️ Municípios SUFRAMA: {suframa_stats['total']}")
+            
+            if summary.get('perfil_municipios') is not None:
+                print(f"   🧭 Perfil de Municípios: {summary['perfil_municipios']}")
+        
+        # Regressões de desempenho
+        if summary.get('regressoes'):
+            print(f"\n🐢 Regressões de Desempenho (vs. mediana das últimas execuções):")
+            for regressao in summary['regressoes']:
+                razao = f" ({regressao['razao']:.1f}x)" if regressao['razao'] else ""
+                print(f"   ⚠️ {regressao['scraper']} / {regressao['etapa']}: {regressao['segundos']:.2f}s{razao} "
+                      f"| mediana {regressao['mediana']:.2f}s, MAD {regressao['mad']:.2f}s, "
+                      f"limite {regressao['limite']:.2f}s")
+        
+        # Pool de conexões
+        pool = summary.get('pool_metrics') or {}
+        if 'checkouts' in pool:
+            print(f"\n🔌 Pool de Conexões:")
+            print(f"   📥 Checkouts: {pool['checkouts']} (timeouts: {pool['timeouts']})")
+            print(f"   ⏳ Espera média: {pool['espera_media_ms']:.2f}ms | p95: {pool['espera_p95_ms']:.2f}ms "
+                  f"| máx: {pool['espera_max_ms']:.2f}ms")
+            print(f"   📈 Pico em uso: {pool['pico_em_uso']} "
+                  f"({pool['saturacao_pico']:.0%} de {pool['pool_size'] + pool['max_overflow']})")
         
         # Status final
-        if summary['successful_scrapers'] == summary['total_scrapers']:
+        if summary['successful_scrapers'] == summary['total_scrapers'] and summary.get('regressoes'):
+            print(f"\n🐢 TODOS OS SCRAPERS CONCLUÍDOS, COM REGRESSÃO DE DESEMPENHO")
+        elif summary['successful_scrapers'] == summary['total_scrapers']:
             print(f"\n🎉 TODOS OS SCRAPERS EXECUTADOS COM SUCESSO!")
         elif summary['successful_scrapers'] > 0:
             print(f"\n⚠️ EXECUÇÃO PARCIALMENTE BEM-SUCEDIDA")
@@ -488,6 +569,8 @@ Exemplos de uso:
   python run_scrapers.py --scraper representacoes_fiscais_process # Apenas processamento representações fiscais
   python run_scrapers.py --no-clean                              # Não limpa as tabelas antes
   python run_scrapers.py --clean-files                           # Apenas limpa arquivos antigos
+  python run_scrapers.py --scraper portos --profile mem          # Alocações no pico de memória do ANTAQ
+  python run_scrapers.py --daemon                                # Agendador contínuo por alteração da fonte
         """
     )
     
@@ -509,6 +592,18 @@ Exemplos de uso:
         help='Limpa apenas os arquivos antigos sem executar scrapers'
     )
     
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Modo agendador: sonda cada fonte na sua cadência e roda só os scrapers cuja fonte mudou'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        choices=MODOS_PERFIL,
+        help='Perfila cada scraper: cpu (cProfile + pilhas colapsadas) ou mem (tracemalloc); arquivos em logs/'
+    )
+    
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -518,7 +613,7 @@ Exemplos de uso:
     args = parser.parse_args()
     
     # Criar instância do gerenciador
-    manager = BrasilDataHubScrapersManager()
+    manager = BrasilDataHubScrapersManager(profile=args.profile)
     
     try:
         if args.clean_files:
@@ -527,19 +622,33 @@ Exemplos de uso:
             cleanup_all_data_files()
             print("✅ Limpeza concluída!")
             sys.exit(0)
+        elif args.daemon:
+            # Agendador contínuo (encerra com SIGINT/SIGTERM)
+            executar_daemon(manager)
+            sys.exit(0)
         elif args.scraper:
             # Executar apenas um scraper
             # Note: A limpeza agora é feita pelo próprio scraper após validar os dados
             result = manager.run_single_scraper(args.scraper)
+            if result['success'] and args.scraper in SCRAPERS_PERFIL:
+                manager.atualizar_perfil_municipios()
+            regressoes = manager.registrar_historico({args.scraper: result})
+            for regressao in regressoes:
+                print(f"🐢 Regressão em {regressao['etapa']}: {regressao['segundos']:.2f}s "
+                      f"(mediana {regressao['mediana']:.2f}s, limite {regressao['limite']:.2f}s)")
             
-            # Status de saída baseado no sucesso
-            sys.exit(0 if result['success'] else 1)
+            # Status de saída baseado no sucesso (3 = concluído com regressão de desempenho)
+            if not result['success']:
+                sys.exit(1)
+            sys.exit(3 if regressoes else 0)
         else:
             # Executar todos os scrapers
             summary = manager.run_all_scrapers(clean_tables=not args.no_clean)
             
             # Status de saída baseado no sucesso geral
-            if summary['successful_scrapers'] == summary['total_scrapers']:
+            if summary['successful_scrapers'] == summary['total_scrapers'] and summary['regressoes']:
+                sys.exit(3)  # Sucesso, com regressão de desempenho
+            elif summary['successful_scrapers'] == summary['total_scrapers']:
                 sys.exit(0)  # Sucesso total
             elif summary['successful_scrapers'] > 0:
                 sys.exit(2)  # Sucesso parcial
@@ -3,22 +3,33 @@ Scraper para aeródromos privados da ANAC.
 Usa dados JSON diretos da API de dados abertos.
 """
 
-import json
 import sys
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+import pandas as pd
 import requests
 from sqlalchemy import text
 
 # Adicionar o diretório pai ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
 
-from database import SessionLocal, create_tables
+from busca import garantir_indice_trigram
+from database import SessionLocal, create_tables, registrar_carga
+from desempenho import Cronometro
+from indices import GerenciadorIndices
 from models import AerodromoPrivado
+from mudancas import registrar_mudancas
+from municipio_resolver import anexar_cd_mun, normalizar_nome
+from perfilamento import argumento_perfil, perfilar
+from postgis import garantir_coluna_geografica
+from serializacao import ErroDecodificacao, gravar_processados, loads
 from utils import cleanup_data_files
+from validacao import (
+    Validador, codigo_oaci, converter_numero, coordenadas_brasil, limpar_texto, obrigatorio, para_registros
+)
 
 
 class AerodromosPrivadosScraper:
@@ -34,6 +45,15 @@ class AerodromosPrivadosScraper:
         # URL direta do JSON de dados abertos
         self.url = 'https://sistemas.anac.gov.br/dadosabertos/Aerodromos/Aeródromos Privados/Lista de aeródromos privados/Aerodromos Privados/AerodromosPrivados.json'
         
+        self.validacao: Optional[Dict[str, Any]] = None
+        self.bytes_baixados: Optional[int] = None
+        
+        # Índices removidos e recriados na última carga (tempos de construção)
+        self.indices = GerenciadorIndices('aerodromos_privados')
+        
+        # Delta da última carga em relação à anterior (feed de mudanças)
+        self.mudancas: Optional[Dict[str, Any]] = None
+        
         # Criar pastas se não existirem
         Path('data').mkdir(exist_ok=True)
         Path('data/raw').mkdir(exist_ok=True)
@@ -46,21 +66,17 @@ class AerodromosPrivadosScraper:
         try:
             response = self.session.get(self.url, timeout=30)
             response.raise_for_status()
+            self.bytes_baixados = len(response.content)
             
             # Salvar dados brutos
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             raw_file = f'data/raw/aerodromos_privados_raw_{timestamp}.json'
             
-            with open(raw_file, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+            with open(raw_file, 'wb') as f:
+                f.write(response.content)
             
-            # Parse JSON - lidar com BOM UTF-8
-            try:
-                data = response.json()
-            except json.JSONDecodeError:
-                # Tentar remover BOM se presente
-                content = response.content.decode('utf-8-sig')
-                data = json.loads(content)
+            # Parse JSON direto dos bytes (BOM UTF-8 removido uma vez)
+            data = loads(response.content)
             print(f"✅ {len(data)} aeródromos privados encontrados")
             
             return data
@@ -68,7 +84,7 @@ class AerodromosPrivadosScraper:
         except requests.RequestException as e:
             print(f"❌ Erro ao buscar dados: {e}")
             raise
-        except json.JSONDecodeError as e:
+        except ErroDecodificacao as e:
             print(f"❌ Erro ao decodificar JSON: {e}")
             raise
     
@@ -76,73 +92,44 @@ class AerodromosPrivadosScraper:
         """Processa e limpa os dados brutos."""
         print("🔧 Processando dados...")
         
-        processed_aerodromos = []
+        bruto = pd.DataFrame(raw_data)
+        scraped_at = datetime.now().isoformat()
         
-        for item in raw_data:
-            try:
-                # Extrair e limpar dados
-                aerodromo = {
-                    'codigo_oaci': self._clean_string(item.get('CódigoOACI')),
-                    'ciad': self._clean_string(item.get('CIAD')),
-                    'nome': self._clean_string(item.get('Nome')),
-                    'municipio': self._clean_string(item.get('Município')),
-                    'uf': self._clean_string(item.get('UF')),
-                    'lat_geo_point': self._parse_coordinate(item.get('LatGeoPoint')),
-                    'lon_geo_point': self._parse_coordinate(item.get('LonGeoPoint')),
-                    'scraped_at': datetime.now().isoformat(),
-                    'source_url': self.url
-                }
-                
-                # Validar dados obrigatórios
-                if not aerodromo['nome'] or aerodromo['nome'].strip() == '':
-                    print(f"⚠️ Aeródromo sem nome ignorado: {item.get('CIAD', 'SEM_CIAD')}")
-                    continue
-                
-                processed_aerodromos.append(aerodromo)
-                
-            except Exception as e:
-                print(f"⚠️ Erro ao processar item {item}: {e}")
-                continue
+        # Extrair e limpar as colunas inteiras de uma vez
+        df = pd.DataFrame({
+            'codigo_oaci': limpar_texto(bruto, 'CódigoOACI'),
+            'ciad': limpar_texto(bruto, 'CIAD'),
+            'nome': limpar_texto(bruto, 'Nome'),
+            'municipio': limpar_texto(bruto, 'Município'),
+            'uf': limpar_texto(bruto, 'UF'),
+            'lat_geo_point': converter_numero(bruto, 'LatGeoPoint'),
+            'lon_geo_point': converter_numero(bruto, 'LonGeoPoint')
+        })
+        
+        # Validar dados obrigatórios e formatos
+        df, self.validacao = Validador('aerodromos_privados', [
+            obrigatorio('nome'),
+            codigo_oaci(),
+            coordenadas_brasil('lat_geo_point', 'lon_geo_point')
+        ]).validar(df)
+        
+        df['nome_normalizado'] = df['nome'].astype(object).map(normalizar_nome)
+        df['scraped_at'] = scraped_at
+        df['source_url'] = self.url
+        processed_aerodromos = para_registros(df)
+        
+        # Anexar código IBGE do município
+        anexar_cd_mun(processed_aerodromos)
         
         # Salvar dados processados
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        processed_file = f'data/processed/aerodromos_privados_{timestamp}.json'
-        
-        with open(processed_file, 'w', encoding='utf-8') as f:
-            json.dump(processed_aerodromos, f, ensure_ascii=False, indent=2)
+        processed_file = gravar_processados(f'data/processed/aerodromos_privados_{timestamp}', processed_aerodromos)
         
         print(f"✅ {len(processed_aerodromos)} aeródromos processados")
         print(f"📁 Dados salvos em: {processed_file}")
         
         return processed_aerodromos
     
-    def _clean_string(self, value: Any) -> Optional[str]:
-        """Limpa e valida strings."""
-        if value is None:
-            return None
-        
-        cleaned = str(value).strip()
-        return cleaned if cleaned and cleaned.upper() not in ['NULL', 'NONE', 'N/A', ''] else None
-    
-    def _parse_coordinate(self, coord_value: Any) -> Optional[float]:
-        """Converte coordenada para float."""
-        if coord_value is None:
-            return None
-        
-        try:
-            if isinstance(coord_value, (int, float)):
-                return float(coord_value)
-            
-            # Se for string, tentar converter
-            coord_str = str(coord_value).replace(',', '.').strip()
-            if not coord_str or coord_str.upper() in ['NULL', 'NONE', 'N/A']:
-                return None
-                
-            return float(coord_str)
-            
-        except (ValueError, TypeError):
-            return None
-    
     def save_to_database(self, aerodromos: List[Dict[str, Any]]) -> int:
         """Salva os dados no banco PostgreSQL."""
         print("💾 Salvando no banco de dados...")
@@ -151,20 +138,31 @@ class AerodromosPrivadosScraper:
         create_tables()
         
         saved_count = 0
+        # Instância nova a cada carga: o relatório traz só os tempos desta execução
+        indices = self.indices = GerenciadorIndices('aerodromos_privados')
         
         with SessionLocal() as db:
             try:
                 # Limpar tabela existente
                 db.execute(text("TRUNCATE TABLE aerodromos_privados RESTART IDENTITY CASCADE"))
                 
+                # Coluna geográfica (PostGIS) preenchida pelo próprio INSERT
+                garantir_coluna_geografica(db, 'aerodromos_privados')
+                garantir_indice_trigram(db, 'aerodromos_privados')
+                
+                # Índices secundários reconstruídos uma vez após a carga
+                indices.remover(db)
+                
                 # Inserir dados
                 for data in aerodromos:
                     aerodromo = AerodromoPrivado(
                         codigo_oaci=data.get('codigo_oaci'),
                         ciad=data.get('ciad'),
                         nome=data['nome'],
+                        nome_normalizado=data.get('nome_normalizado'),
                         municipio=data.get('municipio'),
                         uf=data.get('uf'),
+                        cd_mun=data.get('cd_mun'),
                         lat_geo_point=data.get('lat_geo_point'),
                         lon_geo_point=data.get('lon_geo_point'),
                         scraped_at=datetime.fromisoformat(data['scraped_at']),
@@ -173,6 +171,7 @@ class AerodromosPrivadosScraper:
                     db.add(aerodromo)
                     saved_count += 1
                 
+                registrar_carga(db, 'aerodromos_privados', saved_count)
                 db.commit()
                 print(f"✅ {saved_count} aeródromos salvos no banco")
                 
@@ -181,6 +180,11 @@ class AerodromosPrivadosScraper:
                 print(f"❌ Erro ao salvar no banco: {e}")
                 raise
         
+        indices.recriar()
+        
+        # Delta em relação à carga anterior (feed de mudanças)
+        self.mudancas = registrar_mudancas('aerodromos_privados')
+        
         return saved_count
     
     def get_stats(self) -> Dict[str, Any]:
@@ -227,22 +231,28 @@ class AerodromosPrivadosScraper:
         """Executa o scraping completo."""
         print("🚀 Iniciando scraping de aeródromos privados...")
         start_time = time.time()
+        etapas = Cronometro()
         
         try:
             # 1. Buscar dados
             raw_data = self.fetch_data()
+            etapas.marcar('fetch')
             
             # 2. Processar dados
             processed_data = self.process_data(raw_data)
+            etapas.marcar('process')
             
             # 3. Salvar no banco
             saved_count = self.save_to_database(processed_data)
+            etapas.marcar('save')
             
             # 4. Estatísticas
             stats = self.get_stats()
+            etapas.marcar('stats')
             
             # 5. Limpeza de arquivos antigos
             cleanup_data_files('aerodromos_privados')
+            etapas.marcar('cleanup')
             
             elapsed_time = time.time() - start_time
             
@@ -251,6 +261,11 @@ class AerodromosPrivadosScraper:
                 'raw_count': len(raw_data),
                 'processed_count': len(processed_data),
                 'saved_count': saved_count,
+                'validacao': self.validacao,
+                'bytes': self.bytes_baixados,
+                'indices': self.indices.relatorio(),
+                'mudancas': self.mudancas,
+                'etapas': etapas.tempos,
                 'elapsed_time': elapsed_time,
                 'stats': stats
             }
@@ -276,7 +291,7 @@ class AerodromosPrivadosScraper:
 
 if __name__ == '__main__':
     scraper = AerodromosPrivadosScraper()
-    result = scraper.run()
+    result = perfilar('aerodromos_privados', argumento_perfil(), scraper.run)
     
     if result['success']:
         print("\n🎉 Scraping concluído com sucesso!")
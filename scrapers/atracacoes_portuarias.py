@@ -3,26 +3,60 @@ Scraper para dados de atracações portuárias da ANTAQ.
 Baixa e processa dados de arquivo ZIP/TXT com dados de atracações.
 """
 
-import csv
-import json
 import sys
 import time
 import zipfile
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import io
 import re
 
+import pandas as pd
 import requests
 from sqlalchemy import text
 
 # Adicionar o diretório pai ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
 
-from database import SessionLocal, create_tables
+from carga_paralela import CARGA_PARALELA_CONEXOES, carregar_paralelo
+from checkpoints import (
+    STATUS_EM_ANDAMENTO, avancar_checkpoint, checkpoint_pendente, concluir_checkpoint,
+    iniciar_checkpoint, limpar_indices_pendentes, obter_checkpoint
+)
+from database import SessionLocal, create_tables, registrar_carga
+from desempenho import Cronometro
+from downloads import baixar_arquivo, sha256_arquivo
+from identificadores import gerar_uuid7
+from indices import GerenciadorIndices
 from models import AtracacaoPortuaria
+from mudancas import registrar_mudancas
+from municipio_resolver import anexar_cd_mun
+from perfilamento import argumento_perfil, perfilar
+from pipeline import PIPELINE_ATIVO, executar_pipeline, formatar_metricas
+from postgis import garantir_coluna_geografica
+from registro import obter_logger
+from resumo_atracacoes import atualizar_resumo_mensal
+from serializacao import gravar_processados
 from utils import cleanup_data_files
+from validacao import (
+    Validador, converter_inteiro, converter_numero, coordenadas_brasil, limpar_texto, obrigatorio, para_registros
+)
+
+logger = obter_logger('scrapers.atracacoes_portuarias')
+
+COLUNAS_DURACAO = ('tempo_espera', 'tempo_atracado', 'tempo_operacao')
+
+# Colunas gravadas pelo COPY paralelo (mesmas do INSERT pelo ORM)
+COLUNAS_COPIA = [
+    'id', 'id_atracacao', 'cdtup', 'id_berco', 'berco', 'porto_atracacao', 'coordenadas',
+    'latitude', 'longitude', 'apelido_instalacao', 'complexo_portuario', 'tipo_autoridade',
+    'data_atracacao', 'data_chegada', 'data_desatracacao', 'data_inicio_operacao',
+    'data_termino_operacao', *COLUNAS_DURACAO, 'ano', 'mes', 'tipo_operacao', 'tipo_navegacao',
+    'nacionalidade_armador', 'flag_mc_operacao', 'terminal', 'municipio', 'uf', 'sguf', 'cd_mun',
+    'regiao_geografica', 'regiao_hidrografica', 'instalacao_em_rio', 'numero_capitania',
+    'numero_imo', 'scraped_at', 'source_url'
+]
 
 class AtracacoesPortuariasANTAQScraper:
     """Scraper específico para dados de atracações portuárias da ANTAQ."""
@@ -37,6 +71,23 @@ class AtracacoesPortuariasANTAQScraper:
         # URL do arquivo ZIP da ANTAQ
         self.url = 'https://web3.antaq.gov.br/ea/txt/2025Atracacao.zip'
         
+        # Arquivo TXT bruto da execução atual (base do checkpoint)
+        self.raw_txt_file: Optional[str] = None
+        self.validacao: Optional[Dict[str, Any]] = None
+        self.bytes_baixados: Optional[int] = None
+        
+        # Índices removidos e recriados na última carga (tempos de construção)
+        self.indices = GerenciadorIndices('atracacoes_portuarias')
+        
+        # Delta da última carga em relação à anterior (feed de mudanças)
+        self.mudancas: Optional[Dict[str, Any]] = None
+        
+        # Conexões do COPY paralelo numa carga completa (1 = inserção em lotes pelo ORM)
+        self.conexoes_copia = CARGA_PARALELA_CONEXOES
+        
+        # Métricas do pipeline processamento/gravação da última carga (fila, esperas)
+        self.metricas_pipeline: Optional[Dict[str, Any]] = None
+        
         # Criar pastas se não existirem
         Path('data').mkdir(exist_ok=True)
         Path('data/raw').mkdir(exist_ok=True)
@@ -47,20 +98,16 @@ class AtracacoesPortuariasANTAQScraper:
         print("🔍 Buscando dados de atracações portuárias da ANTAQ...")
         
         try:
-            response = self.session.get(self.url, timeout=120)
-            response.raise_for_status()
-            
-            # Salvar arquivo ZIP bruto
+            # Baixar o ZIP direto para o disco (segmentado, com retomada e checksum)
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             raw_zip_file = f'data/raw/atracacoes_portuarias_raw_{timestamp}.zip'
+            download = baixar_arquivo(self.url, raw_zip_file, session=self.session, timeout=120)
+            self.bytes_baixados = download['bytes']
             
-            with open(raw_zip_file, 'wb') as f:
-                f.write(response.content)
-            
-            print(f"📁 Arquivo ZIP salvo em: {raw_zip_file}")
+            print(f"📁 Arquivo ZIP salvo em: {raw_zip_file} (sha256 {download['sha256'][:12]}...)")
             
             # Extrair arquivo TXT do ZIP
-            with zipfile.ZipFile(io.BytesIO(response.content), 'r') as zip_ref:
+            with zipfile.ZipFile(raw_zip_file, 'r') as zip_ref:
                 # Listar arquivos no ZIP
                 zip_files = zip_ref.namelist()
                 print(f"🔍 Arquivos no ZIP: {zip_files}")
@@ -83,6 +130,7 @@ class AtracacoesPortuariasANTAQScraper:
                     f.write(txt_content)
                 
                 print(f"📄 Arquivo TXT extraído para: {raw_txt_file}")
+                self.raw_txt_file = raw_txt_file
                 
                 return txt_content
             
@@ -97,10 +145,9 @@ class AtracacoesPortuariasANTAQScraper:
         """Processa e limpa os dados do arquivo TXT."""
         print("🔧 Processando dados...")
         
-        processed_atracacoes = []
-        
-        # Converter TXT para CSV (já está delimitado por ponto e vírgula)
-        csv_reader = csv.DictReader(io.StringIO(txt_content), delimiter=';')
+        # Ler o TXT (delimitado por ponto e vírgula) como colunas de texto
+        bruto = pd.read_csv(io.StringIO(txt_content), sep=';', dtype=str, keep_default_na=False)
+        total_rows = len(bruto)
         
         # Mapear nomes das colunas esperadas
         expected_columns = [
@@ -113,145 +160,129 @@ class AtracacoesPortuariasANTAQScraper:
             'Nº da Capitania', 'Nº do IMO'
         ]
         
-        print(f"🔍 Colunas encontradas: {csv_reader.fieldnames}")
+        print(f"🔍 Colunas encontradas: {list(bruto.columns)}")
         
-        total_rows = 0
-        for idx, row in enumerate(csv_reader):
-            total_rows += 1
-            
-            try:
-                # Extrair e limpar dados
-                atracacao = {
-                    'id_atracacao': self._clean_string(row.get('IDAtracacao')),
-                    'cdtup': self._clean_string(row.get('CDTUP')),
-                    'id_berco': self._clean_string(row.get('IDBerco')),
-                    'berco': self._clean_string(row.get('Berço')),
-                    'porto_atracacao': self._clean_string(row.get('Porto Atracação')),
-                    'coordenadas': self._clean_string(row.get('Coordenadas')),
-                    'apelido_instalacao': self._clean_string(row.get('Apelido Instalação Portuária')),
-                    'complexo_portuario': self._clean_string(row.get('Complexo Portuário')),
-                    'tipo_autoridade': self._clean_string(row.get('Tipo da Autoridade Portuária')),
-                    'data_atracacao': self._parse_datetime(row.get('Data Atracação')),
-                    'data_chegada': self._parse_datetime(row.get('Data Chegada')),
-                    'data_desatracacao': self._parse_datetime(row.get('Data Desatracação')),
-                    'data_inicio_operacao': self._parse_datetime(row.get('Data Início Operação')),
-                    'data_termino_operacao': self._parse_datetime(row.get('Data Término Operação')),
-                    'ano': self._parse_int(row.get('Ano')),
-                    'mes': self._clean_string(row.get('Mes')),
-                    'tipo_operacao': self._clean_string(row.get('Tipo de Operação')),
-                    'tipo_navegacao': self._clean_string(row.get('Tipo de Navegação da Atracação')),
-                    'nacionalidade_armador': self._clean_string(row.get('Nacionalidade do Armador')),
-                    'flag_mc_operacao': self._clean_string(row.get('FlagMCOperacaoAtracacao')),
-                    'terminal': self._clean_string(row.get('Terminal')),
-                    'municipio': self._clean_string(row.get('Município')),
-                    'uf': self._clean_string(row.get('UF')),
-                    'sguf': self._clean_string(row.get('SGUF')),
-                    'regiao_geografica': self._clean_string(row.get('Região Geográfica')),
-                    'regiao_hidrografica': self._clean_string(row.get('Região Hidrográfica')),
-                    'instalacao_em_rio': self._clean_string(row.get('Instalação Portuária em Rio')),
-                    'numero_capitania': self._clean_string(row.get('Nº da Capitania')),
-                    'numero_imo': self._clean_string(row.get('Nº do IMO')),
-                    'scraped_at': datetime.now().isoformat(),
-                    'source_url': self.url
-                }
-                
-                # Extrair coordenadas
-                lat, lon = self._parse_coordinates(atracacao['coordenadas'])
-                atracacao['latitude'] = lat
-                atracacao['longitude'] = lon
-                
-                # Validar dados obrigatórios
-                if not atracacao['id_atracacao']:
-                    print(f"⚠️ Atracação sem ID ignorada na linha {idx + 2}")
-                    continue
-                
-                processed_atracacoes.append(atracacao)
-                
-                if (idx + 1) % 5000 == 0:
-                    print(f"   📊 Processadas {idx + 1} linhas...")
-                
-            except Exception as e:
-                print(f"⚠️ Erro ao processar linha {idx + 2}: {e}")
-                continue
+        # Extrair e limpar as colunas inteiras de uma vez
+        df = pd.DataFrame({
+            'id_atracacao': limpar_texto(bruto, 'IDAtracacao'),
+            'cdtup': limpar_texto(bruto, 'CDTUP'),
+            'id_berco': limpar_texto(bruto, 'IDBerco'),
+            'berco': limpar_texto(bruto, 'Berço'),
+            'porto_atracacao': limpar_texto(bruto, 'Porto Atracação'),
+            'coordenadas': limpar_texto(bruto, 'Coordenadas'),
+            'apelido_instalacao': limpar_texto(bruto, 'Apelido Instalação Portuária'),
+            'complexo_portuario': limpar_texto(bruto, 'Complexo Portuário'),
+            'tipo_autoridade': limpar_texto(bruto, 'Tipo da Autoridade Portuária'),
+            'data_atracacao': self._parse_datetime(limpar_texto(bruto, 'Data Atracação')),
+            'data_chegada': self._parse_datetime(limpar_texto(bruto, 'Data Chegada')),
+            'data_desatracacao': self._parse_datetime(limpar_texto(bruto, 'Data Desatracação')),
+            'data_inicio_operacao': self._parse_datetime(limpar_texto(bruto, 'Data Início Operação')),
+            'data_termino_operacao': self._parse_datetime(limpar_texto(bruto, 'Data Término Operação')),
+            'ano': converter_inteiro(bruto, 'Ano'),
+            'mes': limpar_texto(bruto, 'Mes'),
+            'tipo_operacao': limpar_texto(bruto, 'Tipo de Operação'),
+            'tipo_navegacao': limpar_texto(bruto, 'Tipo de Navegação da Atracação'),
+            'nacionalidade_armador': limpar_texto(bruto, 'Nacionalidade do Armador'),
+            'flag_mc_operacao': limpar_texto(bruto, 'FlagMCOperacaoAtracacao'),
+            'terminal': limpar_texto(bruto, 'Terminal'),
+            'municipio': limpar_texto(bruto, 'Município'),
+            'uf': limpar_texto(bruto, 'UF'),
+            'sguf': limpar_texto(bruto, 'SGUF'),
+            'regiao_geografica': limpar_texto(bruto, 'Região Geográfica'),
+            'regiao_hidrografica': limpar_texto(bruto, 'Região Hidrográfica'),
+            'instalacao_em_rio': limpar_texto(bruto, 'Instalação Portuária em Rio'),
+            'numero_capitania': limpar_texto(bruto, 'Nº da Capitania'),
+            'numero_imo': limpar_texto(bruto, 'Nº do IMO'),
+            'scraped_at': datetime.now().isoformat(),
+            'source_url': self.url
+        })
+        
+        # Extrair coordenadas
+        df['latitude'], df['longitude'] = self._parse_coordinates(df['coordenadas'])
+        
+        # Validar dados obrigatórios e coordenadas
+        df, self.validacao = Validador('atracacoes_portuarias', [
+            obrigatorio('id_atracacao'),
+            coordenadas_brasil('latitude', 'longitude')
+        ]).validar(df)
+        processed_atracacoes = para_registros(df)
+        
+        # Durações calculadas uma vez, em bloco
+        self._calcular_duracoes(processed_atracacoes)
+        
+        # Anexar código IBGE do município
+        anexar_cd_mun(processed_atracacoes, campos_uf=('sguf', 'uf'))
         
         # Salvar dados processados
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        processed_file = f'data/processed/atracacoes_portuarias_{timestamp}.json'
-        
-        with open(processed_file, 'w', encoding='utf-8') as f:
-            json.dump(processed_atracacoes, f, ensure_ascii=False, indent=2, default=str)
+        processed_file = gravar_processados(f'data/processed/atracacoes_portuarias_{timestamp}', processed_atracacoes)
         
         print(f"✅ {len(processed_atracacoes)} atracações processadas de {total_rows} linhas totais")
         print(f"📁 Dados salvos em: {processed_file}")
         
         return processed_atracacoes
     
-    def _clean_string(self, value: Any) -> Optional[str]:
-        """Limpa e valida strings."""
-        if value is None or str(value).strip() == '':
-            return None
+    def _calcular_duracoes(self, atracacoes: List[Dict[str, Any]]) -> None:
+        """
+        Calcula tempo de espera, atracado e de operação (segundos) de todos
+        os registros de uma vez, com pandas. Durações negativas indicam datas
+        inconsistentes na origem e ficam nulas.
+        """
+        if not atracacoes:
+            return
         
-        cleaned = str(value).strip()
-        return cleaned if cleaned and cleaned.upper() not in ['NULL', 'NONE', 'N/A', 'NAN'] else None
-    
-    def _parse_int(self, value: Any) -> Optional[int]:
-        """Converte valor para int."""
-        if value is None:
-            return None
+        datas = pd.DataFrame(atracacoes, columns=[
+            'data_chegada', 'data_atracacao', 'data_desatracacao',
+            'data_inicio_operacao', 'data_termino_operacao'
+        ]).apply(pd.to_datetime, format='ISO8601', errors='coerce')
         
-        try:
-            return int(str(value).strip())
-        except (ValueError, TypeError):
-            return None
-    
-    def _parse_datetime(self, value: Any) -> Optional[str]:
-        """Converte string de data/hora para formato ISO."""
-        if not value or str(value).strip() == '':
-            return None
+        duracoes = pd.DataFrame({
+            'tempo_espera': datas['data_atracacao'] - datas['data_chegada'],
+            'tempo_atracado': datas['data_desatracacao'] - datas['data_atracacao'],
+            'tempo_operacao': datas['data_termino_operacao'] - datas['data_inicio_operacao']
+        }).apply(lambda serie: serie.dt.total_seconds())
         
-        try:
-            # Formato esperado: 31/01/2025 08:15:00
-            date_str = str(value).strip()
-            if '/' in date_str and ' ' in date_str:
-                date_part, time_part = date_str.split(' ', 1)
-                day, month, year = date_part.split('/')
-                
-                # Reformat para ISO
-                iso_datetime = f"{year}-{month.zfill(2)}-{day.zfill(2)}T{time_part}"
-                return iso_datetime
-            
-            return None
-            
-        except (ValueError, TypeError, AttributeError):
-            return None
+        duracoes = duracoes.where(duracoes >= 0).astype(object)
+        duracoes = duracoes.where(duracoes.notna(), None)
+        
+        for coluna in duracoes.columns:
+            for atracacao, segundos in zip(atracacoes, duracoes[coluna].tolist()):
+                atracacao[coluna] = segundos
+    
+    def _parse_datetime(self, valores: pd.Series) -> pd.Series:
+        """Converte datas 'dd/mm/aaaa hh:mm:ss' para ISO ('aaaa-mm-ddThh:mm:ss')."""
+        partes = valores.str.extract(r'^(\d{1,2})/(\d{1,2})/(\d+) (.+)$')
+        return partes[2] + '-' + partes[1].str.zfill(2) + '-' + partes[0].str.zfill(2) + 'T' + partes[3]
     
-    def _parse_coordinates(self, coords_str: Optional[str]) -> tuple[Optional[float], Optional[float]]:
-        """Extrai latitude e longitude de string de coordenadas."""
-        if not coords_str:
-            return None, None
+    def _parse_coordinates(self, coordenadas: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """Extrai latitude e longitude de 'lon,lat' (ex.: -48.497777,-1.445278)."""
+        partes = coordenadas.str.extract(r'^\s*(?P<lon>[^,]+?)\s*,\s*(?P<lat>.+?)\s*$')
+        lat = converter_numero(partes, 'lat')
+        lon = converter_numero(partes, 'lon')
         
-        try:
-            # Formato esperado: -48.497777,-1.445278
-            coords_clean = coords_str.strip()
-            if ',' in coords_clean:
-                lon_str, lat_str = coords_clean.split(',', 1)
-                lon = float(lon_str.strip())
-                lat = float(lat_str.strip())
-                return lat, lon
-            
-            return None, None
-            
-        except (ValueError, TypeError, AttributeError):
-            return None, None
+        # Par incompleto não é aproveitado
+        invalidas = lat.isna() | lon.isna()
+        return lat.mask(invalidas), lon.mask(invalidas)
     
-    def save_to_database(self, atracacoes: List[Dict[str, Any]]) -> int:
-        """Salva os dados no banco PostgreSQL."""
+    def save_to_database(self, atracacoes: List[Dict[str, Any]], hash_arquivo_bruto: Optional[str] = None,
+                         arquivo_bruto: Optional[str] = None) -> int:
+        """
+        Salva os dados no banco PostgreSQL.
+        
+        O progresso é registrado em `checkpoints_cargas` a cada lote. Se a
+        carga anterior do mesmo arquivo bruto (mesmo hash) parou no meio, os
+        lotes já commitados são mantidos e a gravação continua de onde parou.
+        """
         print("💾 Salvando no banco de dados...")
         
         # Criar tabelas se não existirem
         create_tables()
         
         saved_count = 0
+        # Instância nova a cada carga: o relatório traz só os tempos desta execução
+        indices = self.indices = GerenciadorIndices('atracacoes_portuarias')
+        # Só o caminho em pipeline preenche as métricas; as da carga anterior não valem mais
+        self.metricas_pipeline = None
         
         with SessionLocal() as db:
             try:
@@ -259,67 +290,184 @@ class AtracacoesPortuariasANTAQScraper:
                 if not atracacoes:
                     raise ValueError("Nenhuma atracação foi processada para salvar")
                 
-                print(f"🧹 Limpando tabela existente...")
-                db.execute(text("TRUNCATE TABLE atracacoes_portuarias RESTART IDENTITY CASCADE"))
+                checkpoint = obter_checkpoint(db, 'atracacoes_portuarias')
+                retomar = (
+                    checkpoint is not None
+                    and hash_arquivo_bruto is not None
+                    and checkpoint['status'] == STATUS_EM_ANDAMENTO
+                    and checkpoint['hash_arquivo'] == hash_arquivo_bruto
+                    and checkpoint['total_registros'] == len(atracacoes)
+                )
+                inicio = checkpoint['registros_gravados'] if retomar else 0
+                
+                # Linhas gravadas em ordem de data: mantém os índices BRIN seletivos
+                atracacoes = sorted(
+                    atracacoes,
+                    key=lambda d: (d.get('data_atracacao') is None, d.get('data_atracacao') or '')
+                )
                 
+                # Chaves UUIDv7 em bloco: crescentes na mesma ordem das datas
+                ids = gerar_uuid7(len(atracacoes))
+                
+                def preparar_destino():
+                    # TRUNCATE, índices e checkpoint na transação de `db`
+                    self._preparar_destino(db, indices, checkpoint, retomar, len(atracacoes),
+                                           hash_arquivo_bruto, arquivo_bruto)
+                
+                saved_count = inicio
                 print(f"📝 Inserindo {len(atracacoes)} atracações...")
                 batch_size = 1000
                 
-                for i in range(0, len(atracacoes), batch_size):
-                    batch = atracacoes[i:i + batch_size]
-                    
-                    for data in batch:
-                        atracacao = AtracacaoPortuaria(
-                            id_atracacao=data['id_atracacao'],
-                            cdtup=data.get('cdtup'),
-                            id_berco=data.get('id_berco'),
-                            berco=data.get('berco'),
-                            porto_atracacao=data.get('porto_atracacao'),
-                            coordenadas=data.get('coordenadas'),
-                            latitude=data.get('latitude'),
-                            longitude=data.get('longitude'),
-                            apelido_instalacao=data.get('apelido_instalacao'),
-                            complexo_portuario=data.get('complexo_portuario'),
-                            tipo_autoridade=data.get('tipo_autoridade'),
-                            data_atracacao=datetime.fromisoformat(data['data_atracacao']) if data.get('data_atracacao') else None,
-                            data_chegada=datetime.fromisoformat(data['data_chegada']) if data.get('data_chegada') else None,
-                            data_desatracacao=datetime.fromisoformat(data['data_desatracacao']) if data.get('data_desatracacao') else None,
-                            data_inicio_operacao=datetime.fromisoformat(data['data_inicio_operacao']) if data.get('data_inicio_operacao') else None,
-                            data_termino_operacao=datetime.fromisoformat(data['data_termino_operacao']) if data.get('data_termino_operacao') else None,
-                            ano=data.get('ano'),
-                            mes=data.get('mes'),
-                            tipo_operacao=data.get('tipo_operacao'),
-                            tipo_navegacao=data.get('tipo_navegacao'),
-                            nacionalidade_armador=data.get('nacionalidade_armador'),
-                            flag_mc_operacao=data.get('flag_mc_operacao'),
-                            terminal=data.get('terminal'),
-                            municipio=data.get('municipio'),
-                            uf=data.get('uf'),
-                            sguf=data.get('sguf'),
-                            regiao_geografica=data.get('regiao_geografica'),
-                            regiao_hidrografica=data.get('regiao_hidrografica'),
-                            instalacao_em_rio=data.get('instalacao_em_rio'),
-                            numero_capitania=data.get('numero_capitania'),
-                            numero_imo=data.get('numero_imo'),
-                            scraped_at=datetime.fromisoformat(data['scraped_at']),
-                            source_url=data['source_url']
-                        )
-                        db.add(atracacao)
-                        saved_count += 1
-                    
-                    # Commit em lotes
+                if not retomar and self.conexoes_copia > 1:
+                    # COPY em N conexões numa staging, sem tocar o destino; TRUNCATE, índices,
+                    # checkpoint e movimentação entram juntos na transação final da carga
+                    carga = carregar_paralelo(
+                        db, 'atracacoes_portuarias', COLUNAS_COPIA,
+                        [self._linha_copia(id_registro, data) for id_registro, data in zip(ids, atracacoes)],
+                        conexoes=self.conexoes_copia, ordem='id', preparar=preparar_destino
+                    )
+                    saved_count = carga['linhas']
+                    avancar_checkpoint(db, 'atracacoes_portuarias', saved_count)
+                    print(f"   ⚡ COPY em {carga['shards']} conexões: {carga['tempo_copia_s']:.2f}s "
+                          f"+ {carga['tempo_movimento_s']:.2f}s para mover da staging")
+                    inicio = len(atracacoes)
+                else:
+                    # Lotes com commit próprio: a limpeza é commitada antes, para a retomada
+                    if retomar:
+                        print(f"⏯️ Retomando carga do mesmo arquivo a partir do registro {inicio}...")
+                    preparar_destino()
+                    db.commit()
+                
+                def produzir():
+                    # Processamento (CPU): objetos ORM de cada lote
+                    for i in range(inicio, len(atracacoes), batch_size):
+                        fim = min(i + batch_size, len(atracacoes))
+                        yield fim, [
+                            self._nova_atracacao(id_registro, data)
+                            for id_registro, data in zip(ids[i:fim], atracacoes[i:fim])
+                        ]
+                
+                def gravar(lote) -> int:
+                    # Gravação (I/O): commit em lotes, junto com o checkpoint
+                    fim, objetos = lote
+                    db.add_all(objetos)
+                    avancar_checkpoint(db, 'atracacoes_portuarias', fim)
                     db.commit()
-                    print(f"   💾 Salvos {min(i + batch_size, len(atracacoes))} de {len(atracacoes)} registros...")
+                    logger.info("   💾 Salvos %s de %s registros...", fim, len(atracacoes))
+                    return len(objetos)
                 
+                if inicio < len(atracacoes) and PIPELINE_ATIVO:
+                    self.metricas_pipeline = executar_pipeline(produzir(), gravar, nome='atracacoes')
+                    saved_count += self.metricas_pipeline['registros']
+                    print(f"   🔀 Pipeline: {formatar_metricas(self.metricas_pipeline)}")
+                else:
+                    for lote in produzir():
+                        saved_count += gravar(lote)
+                
+                # Resumo mensal apenas dos meses carregados
+                meses = {
+                    datetime.fromisoformat(data['data_atracacao']).date().replace(day=1)
+                    for data in atracacoes if data.get('data_atracacao')
+                }
+                linhas_resumo = atualizar_resumo_mensal(db, meses)
+                print(f"📊 Resumo mensal atualizado: {len(meses)} meses, {linhas_resumo} linhas")
+                
+                registrar_carga(db, 'atracacoes_portuarias', saved_count)
+                registrar_carga(db, 'atracacoes_resumo_mensal', linhas_resumo)
+                concluir_checkpoint(db, 'atracacoes_portuarias')
+                db.commit()
                 print(f"✅ {saved_count} atracações salvas no banco")
                 
             except Exception as e:
                 db.rollback()
                 print(f"❌ Erro ao salvar no banco: {e}")
+                # Lotes já commitados: os índices removidos precisam voltar
+                try:
+                    indices.recriar()
+                except Exception as erro_indices:
+                    print(f"⚠️ Erro ao recriar índices: {erro_indices}")
                 raise
         
+        indices.recriar()
+        limpar_indices_pendentes('atracacoes_portuarias')
+        
+        # Delta em relação à carga anterior (feed de mudanças)
+        self.mudancas = registrar_mudancas('atracacoes_portuarias')
+        
         return saved_count
     
+    def _preparar_destino(self, db, indices: GerenciadorIndices, checkpoint: Optional[Dict[str, Any]],
+                          retomar: bool, total: int, hash_arquivo_bruto: Optional[str],
+                          arquivo_bruto: Optional[str]) -> None:
+        """Limpa o destino (exceto na retomada), remove os índices e inicia o checkpoint."""
+        if not retomar:
+            print(f"🧹 Limpando tabela existente...")
+            db.execute(text("TRUNCATE TABLE atracacoes_portuarias RESTART IDENTITY CASCADE"))
+            
+            # Coluna geográfica (PostGIS) preenchida pelo próprio INSERT
+            garantir_coluna_geografica(db, 'atracacoes_portuarias')
+        
+        # Índices secundários (B-tree, BRIN, GiST) reconstruídos uma vez após a carga;
+        # os que ficaram pendentes de uma execução interrompida entram na lista
+        indices.remover(db)
+        if checkpoint and checkpoint['indices_pendentes']:
+            indices.definicoes = {**checkpoint['indices_pendentes'], **indices.definicoes}
+        
+        if not retomar:
+            iniciar_checkpoint(db, 'atracacoes_portuarias', hash_arquivo_bruto or '', arquivo_bruto,
+                               total, indices.definicoes)
+    
+    def _nova_atracacao(self, id_registro, data: Dict[str, Any]) -> AtracacaoPortuaria:
+        """Objeto ORM de um registro processado."""
+        return AtracacaoPortuaria(
+            id=id_registro,
+            id_atracacao=data['id_atracacao'],
+            cdtup=data.get('cdtup'),
+            id_berco=data.get('id_berco'),
+            berco=data.get('berco'),
+            porto_atracacao=data.get('porto_atracacao'),
+            coordenadas=data.get('coordenadas'),
+            latitude=data.get('latitude'),
+            longitude=data.get('longitude'),
+            apelido_instalacao=data.get('apelido_instalacao'),
+            complexo_portuario=data.get('complexo_portuario'),
+            tipo_autoridade=data.get('tipo_autoridade'),
+            data_atracacao=datetime.fromisoformat(data['data_atracacao']) if data.get('data_atracacao') else None,
+            data_chegada=datetime.fromisoformat(data['data_chegada']) if data.get('data_chegada') else None,
+            data_desatracacao=datetime.fromisoformat(data['data_desatracacao']) if data.get('data_desatracacao') else None,
+            data_inicio_operacao=datetime.fromisoformat(data['data_inicio_operacao']) if data.get('data_inicio_operacao') else None,
+            data_termino_operacao=datetime.fromisoformat(data['data_termino_operacao']) if data.get('data_termino_operacao') else None,
+            tempo_espera=timedelta(seconds=data['tempo_espera']) if data.get('tempo_espera') is not None else None,
+            tempo_atracado=timedelta(seconds=data['tempo_atracado']) if data.get('tempo_atracado') is not None else None,
+            tempo_operacao=timedelta(seconds=data['tempo_operacao']) if data.get('tempo_operacao') is not None else None,
+            ano=data.get('ano'),
+            mes=data.get('mes'),
+            tipo_operacao=data.get('tipo_operacao'),
+            tipo_navegacao=data.get('tipo_navegacao'),
+            nacionalidade_armador=data.get('nacionalidade_armador'),
+            flag_mc_operacao=data.get('flag_mc_operacao'),
+            terminal=data.get('terminal'),
+            municipio=data.get('municipio'),
+            uf=data.get('uf'),
+            sguf=data.get('sguf'),
+            cd_mun=data.get('cd_mun'),
+            regiao_geografica=data.get('regiao_geografica'),
+            regiao_hidrografica=data.get('regiao_hidrografica'),
+            instalacao_em_rio=data.get('instalacao_em_rio'),
+            numero_capitania=data.get('numero_capitania'),
+            numero_imo=data.get('numero_imo'),
+            scraped_at=datetime.fromisoformat(data['scraped_at']),
+            source_url=data['source_url']
+        )
+    
+    def _linha_copia(self, id_registro, data: Dict[str, Any]) -> Tuple:
+        """Valores de um registro na ordem de COLUNAS_COPIA."""
+        return (id_registro,) + tuple(
+            timedelta(seconds=data[coluna]) if coluna in COLUNAS_DURACAO and data.get(coluna) is not None
+            else data.get(coluna)
+            for coluna in COLUNAS_COPIA[1:]
+        )
+    
     def get_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas da tabela."""
         with SessionLocal() as db:
@@ -383,22 +531,38 @@ class AtracacoesPortuariasANTAQScraper:
         """Executa o scraping completo."""
         print("🚀 Iniciando scraping de atracações portuárias da ANTAQ...")
         start_time = time.time()
+        etapas = Cronometro()
         
         try:
-            # 1. Buscar dados
-            txt_content = self.fetch_data()
+            # 1. Buscar dados (ou reaproveitar o arquivo de uma carga interrompida)
+            checkpoint = checkpoint_pendente('atracacoes_portuarias')
+            if checkpoint:
+                print(f"⏯️ Carga interrompida encontrada ({checkpoint['registros_gravados']} de "
+                      f"{checkpoint['total_registros']} registros); reutilizando {checkpoint['arquivo_bruto']}")
+                self.raw_txt_file = checkpoint['arquivo_bruto']
+                with open(self.raw_txt_file, 'r', encoding='utf-8') as f:
+                    txt_content = f.read()
+            else:
+                txt_content = self.fetch_data()
+            
+            hash_bruto = sha256_arquivo(self.raw_txt_file) if self.raw_txt_file else None
+            etapas.marcar('fetch')
             
             # 2. Processar dados
             processed_data = self.process_data(txt_content)
+            etapas.marcar('process')
             
             # 3. Salvar no banco
-            saved_count = self.save_to_database(processed_data)
+            saved_count = self.save_to_database(processed_data, hash_bruto, self.raw_txt_file)
+            etapas.marcar('save')
             
             # 4. Estatísticas
             stats = self.get_stats()
+            etapas.marcar('stats')
             
             # 5. Limpeza de arquivos antigos
             cleanup_data_files('atracacoes_portuarias')
+            etapas.marcar('cleanup')
             
             elapsed_time = time.time() - start_time
             
@@ -406,6 +570,12 @@ class AtracacoesPortuariasANTAQScraper:
                 'success': True,
                 'processed_count': len(processed_data),
                 'saved_count': saved_count,
+                'validacao': self.validacao,
+                'pipeline': self.metricas_pipeline,
+                'bytes': self.bytes_baixados,
+                'indices': self.indices.relatorio(),
+                'mudancas': self.mudancas,
+                'etapas': etapas.tempos,
                 'elapsed_time': elapsed_time,
                 'stats': stats
             }
@@ -436,7 +606,7 @@ class AtracacoesPortuariasANTAQScraper:
 
 if __name__ == '__main__':
     scraper = AtracacoesPortuariasANTAQScraper()
-    result = scraper.run()
+    result = perfilar('atracacoes_portuarias', argumento_perfil(), scraper.run)
     
     if result['success']:
         print("\n🎉 Scraping concluído com sucesso!")
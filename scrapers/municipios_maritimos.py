@@ -3,7 +3,6 @@ Scraper para municípios defrontantes com o mar do IBGE.
 Baixa e processa dados de arquivo Excel.
 """
 
-import json
 import sys
 import time
 from datetime import datetime
@@ -18,9 +17,20 @@ from sqlalchemy import text
 # Adicionar o diretório pai ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
 
-from database import SessionLocal, create_tables
+from database import SessionLocal, create_tables, registrar_carga
+from desempenho import Cronometro
+from downloads import baixar_arquivo
+from indices import GerenciadorIndices
 from models import MunicipioMaritimo
+from mudancas import registrar_mudancas
+from municipio_resolver import invalidate_municipio_resolver
+from perfilamento import argumento_perfil, perfilar
+from referencia import invalidar_referencia
+from serializacao import gravar_processados
 from utils import cleanup_data_files
+from validacao import (
+    Validador, codigo_municipio, converter_codigo, converter_numero, limpar_texto, obrigatorio, para_registros
+)
 
 class MunicipiosMaritimosIBGEScraper:
     """Scraper específico para municípios defrontantes com o mar do IBGE."""
@@ -35,6 +45,15 @@ class MunicipiosMaritimosIBGEScraper:
         # URL do arquivo Excel do IBGE
         self.url = 'https://geoftp.ibge.gov.br/organizacao_do_territorio/estrutura_territorial/municipios_defrontantes_com_o_mar/2024/Municipios_Defrontantes_com_o_Mar_2024.xls'
         
+        self.validacao: Optional[Dict[str, Any]] = None
+        self.bytes_baixados: Optional[int] = None
+        
+        # Índices removidos e recriados na última carga (tempos de construção)
+        self.indices = GerenciadorIndices('municipios_maritimos')
+        
+        # Delta da última carga em relação à anterior (feed de mudanças)
+        self.mudancas: Optional[Dict[str, Any]] = None
+        
         # Criar pastas se não existirem
         Path('data').mkdir(exist_ok=True)
         Path('data/raw').mkdir(exist_ok=True)
@@ -45,23 +64,19 @@ class MunicipiosMaritimosIBGEScraper:
         print("🔍 Buscando dados de municípios marítimos do IBGE...")
         
         try:
-            response = self.session.get(self.url, timeout=60)
-            response.raise_for_status()
-            
-            # Salvar dados brutos
+            # Baixar direto para o arquivo bruto (com retomada e checksum)
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             raw_file = f'data/raw/municipios_maritimos_raw_{timestamp}.xls'
-            
-            with open(raw_file, 'wb') as f:
-                f.write(response.content)
+            download = baixar_arquivo(self.url, raw_file, session=self.session, timeout=60)
+            self.bytes_baixados = download['bytes']
             
             # Ler Excel com pandas - arquivo .xls antigo
             # Primeiro, tentar determinar o tipo real do arquivo
-            content_type = response.headers.get('content-type', '').lower()
+            content_type = download['content_type'].lower()
             print(f"🔍 Content-Type: {content_type}")
             
-            # Salvar temporariamente para análise
-            temp_bytes = response.content
+            # Conteúdo do arquivo para análise
+            temp_bytes = Path(raw_file).read_bytes()
             print(f"🔍 Primeiros bytes: {temp_bytes[:10]}")
             
             # Tentar ler como Excel antigo (.xls)
@@ -116,8 +131,6 @@ class MunicipiosMaritimosIBGEScraper:
         """Processa e limpa os dados do DataFrame."""
         print("🔧 Processando dados...")
         
-        processed_municipios = []
-        
         # Mapear nomes das colunas esperadas
         column_mapping = {
             'CD_MUN': 'cd_mun',
@@ -146,77 +159,43 @@ class MunicipiosMaritimosIBGEScraper:
             if old_col in df_clean.columns:
                 df_clean = df_clean.rename(columns={old_col: new_col})
         
-        for idx, row in df_clean.iterrows():
-            try:
-                # Extrair e limpar dados
-                municipio = {
-                    'cd_mun': self._clean_string(row.get('cd_mun')),
-                    'nm_mun': self._clean_string(row.get('nm_mun')),
-                    'cd_rgi': self._clean_string(row.get('cd_rgi')),
-                    'nm_rgi': self._clean_string(row.get('nm_rgi')),
-                    'cd_rgint': self._clean_string(row.get('cd_rgint')),
-                    'nm_rgint': self._clean_string(row.get('nm_rgint')),
-                    'cd_uf': self._clean_string(row.get('cd_uf')),
-                    'nm_uf': self._clean_string(row.get('nm_uf')),
-                    'sigla_uf': self._clean_string(row.get('sigla_uf')),
-                    'cd_regia': self._clean_string(row.get('cd_regia')),
-                    'nm_regia': self._clean_string(row.get('nm_regia')),
-                    'sigla_rg': self._clean_string(row.get('sigla_rg')),
-                    'area_km2': self._parse_float(row.get('area_km2')),
-                    'scraped_at': datetime.now().isoformat(),
-                    'source_url': self.url
-                }
-                
-                # Validar dados obrigatórios
-                if not municipio['cd_mun'] or not municipio['nm_mun']:
-                    print(f"⚠️ Município sem código ou nome ignorado na linha {idx}: {row.to_dict()}")
-                    continue
-                
-                processed_municipios.append(municipio)
-                
-            except Exception as e:
-                print(f"⚠️ Erro ao processar linha {idx}: {e}")
-                continue
+        # Extrair e limpar as colunas inteiras de uma vez
+        df_municipios = pd.DataFrame({
+            'cd_mun': converter_codigo(df_clean, 'cd_mun'),
+            'nm_mun': limpar_texto(df_clean, 'nm_mun'),
+            'cd_rgi': converter_codigo(df_clean, 'cd_rgi'),
+            'nm_rgi': limpar_texto(df_clean, 'nm_rgi'),
+            'cd_rgint': converter_codigo(df_clean, 'cd_rgint'),
+            'nm_rgint': limpar_texto(df_clean, 'nm_rgint'),
+            'cd_uf': converter_codigo(df_clean, 'cd_uf'),
+            'nm_uf': limpar_texto(df_clean, 'nm_uf'),
+            'sigla_uf': limpar_texto(df_clean, 'sigla_uf'),
+            'cd_regia': converter_codigo(df_clean, 'cd_regia'),
+            'nm_regia': limpar_texto(df_clean, 'nm_regia'),
+            'sigla_rg': limpar_texto(df_clean, 'sigla_rg'),
+            'area_km2': converter_numero(df_clean, 'area_km2')
+        })
+        
+        # Validar dados obrigatórios e código IBGE
+        df_municipios, self.validacao = Validador('municipios_maritimos', [
+            obrigatorio('cd_mun'),
+            obrigatorio('nm_mun'),
+            codigo_municipio()
+        ]).validar(df_municipios)
+        
+        df_municipios['scraped_at'] = datetime.now().isoformat()
+        df_municipios['source_url'] = self.url
+        processed_municipios = para_registros(df_municipios)
         
         # Salvar dados processados
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        processed_file = f'data/processed/municipios_maritimos_{timestamp}.json'
-        
-        with open(processed_file, 'w', encoding='utf-8') as f:
-            json.dump(processed_municipios, f, ensure_ascii=False, indent=2)
+        processed_file = gravar_processados(f'data/processed/municipios_maritimos_{timestamp}', processed_municipios)
         
         print(f"✅ {len(processed_municipios)} municípios processados")
         print(f"📁 Dados salvos em: {processed_file}")
         
         return processed_municipios
     
-    def _clean_string(self, value: Any) -> Optional[str]:
-        """Limpa e valida strings."""
-        if value is None or pd.isna(value):
-            return None
-        
-        cleaned = str(value).strip()
-        return cleaned if cleaned and cleaned.upper() not in ['NULL', 'NONE', 'N/A', 'NAN'] else None
-    
-    def _parse_float(self, value: Any) -> Optional[float]:
-        """Converte valor para float."""
-        if value is None or pd.isna(value):
-            return None
-        
-        try:
-            if isinstance(value, (int, float)):
-                return float(value)
-            
-            # Se for string, tentar converter
-            value_str = str(value).replace(',', '.').strip()
-            if not value_str or value_str.upper() in ['NULL', 'NONE', 'N/A', 'NAN']:
-                return None
-                
-            return float(value_str)
-            
-        except (ValueError, TypeError):
-            return None
-    
     def save_to_database(self, municipios: List[Dict[str, Any]]) -> int:
         """Salva os dados no banco PostgreSQL."""
         print("💾 Salvando no banco de dados...")
@@ -225,12 +204,17 @@ class MunicipiosMaritimosIBGEScraper:
         create_tables()
         
         saved_count = 0
+        # Instância nova a cada carga: o relatório traz só os tempos desta execução
+        indices = self.indices = GerenciadorIndices('municipios_maritimos')
         
         with SessionLocal() as db:
             try:
                 # Limpar tabela existente
                 db.execute(text("TRUNCATE TABLE municipios_maritimos RESTART IDENTITY CASCADE"))
                 
+                # Índices secundários reconstruídos uma vez após a carga
+                indices.remover(db)
+                
                 # Inserir dados
                 for data in municipios:
                     municipio = MunicipioMaritimo(
@@ -253,6 +237,7 @@ class MunicipiosMaritimosIBGEScraper:
                     db.add(municipio)
                     saved_count += 1
                 
+                registrar_carga(db, 'municipios_maritimos', saved_count)
                 db.commit()
                 print(f"✅ {saved_count} municípios salvos no banco")
                 
@@ -261,6 +246,15 @@ class MunicipiosMaritimosIBGEScraper:
                 print(f"❌ Erro ao salvar no banco: {e}")
                 raise
         
+        indices.recriar()
+        
+        # Novos municípios: o resolvedor de cd_mun e os dados de referência devem ser relidos
+        invalidate_municipio_resolver()
+        invalidar_referencia()
+        
+        # Delta em relação à carga anterior (feed de mudanças)
+        self.mudancas = registrar_mudancas('municipios_maritimos')
+        
         return saved_count
     
     def get_stats(self) -> Dict[str, Any]:
@@ -312,22 +306,28 @@ class MunicipiosMaritimosIBGEScraper:
         """Executa o scraping completo."""
         print("🚀 Iniciando scraping de municípios marítimos do IBGE...")
         start_time = time.time()
+        etapas = Cronometro()
         
         try:
             # 1. Buscar dados
             df = self.fetch_data()
+            etapas.marcar('fetch')
             
             # 2. Processar dados
             processed_data = self.process_data(df)
+            etapas.marcar('process')
             
             # 3. Salvar no banco
             saved_count = self.save_to_database(processed_data)
+            etapas.marcar('save')
             
             # 4. Estatísticas
             stats = self.get_stats()
+            etapas.marcar('stats')
             
             # 5. Limpeza de arquivos antigos
             cleanup_data_files('municipios_maritimos')
+            etapas.marcar('cleanup')
             
             elapsed_time = time.time() - start_time
             
@@ -336,6 +336,11 @@ class MunicipiosMaritimosIBGEScraper:
                 'raw_count': len(df),
                 'processed_count': len(processed_data),
                 'saved_count': saved_count,
+                'validacao': self.validacao,
+                'bytes': self.bytes_baixados,
+                'indices': self.indices.relatorio(),
+                'mudancas': self.mudancas,
+                'etapas': etapas.tempos,
                 'elapsed_time': elapsed_time,
                 'stats': stats
             }
@@ -365,7 +370,7 @@ class MunicipiosMaritimosIBGEScraper:
 
 if __name__ == '__main__':
     scraper = MunicipiosMaritimosIBGEScraper()
-    result = scraper.run()
+    result = perfilar('municipios_maritimos', argumento_perfil(), scraper.run)
     
     if result['success']:
         print("\n🎉 Scraping concluído com sucesso!")
@@ -3,14 +3,13 @@ Scraper para municípios das Zonas Fiscais Especiais da SUFRAMA do IBGE.
 Baixa e processa dados de arquivo Excel.
 """
 
-import json
 import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-import io
+from typing import Dict, List, Any, Optional, Tuple
 
+import numpy as np
 import requests
 import pandas as pd
 from sqlalchemy import text
@@ -18,9 +17,34 @@ from sqlalchemy import text
 # Adicionar o diretório pai ao path para importar módulos
 sys.path.append(str(Path(__file__).parent.parent))
 
-from database import SessionLocal, create_tables
+from database import SessionLocal, create_tables, registrar_carga
+from desempenho import Cronometro
+from downloads import baixar_arquivo
+from indices import GerenciadorIndices
 from models import MunicipioSuframa
+from mudancas import registrar_mudancas
+from municipio_resolver import invalidate_municipio_resolver
+from perfilamento import argumento_perfil, perfilar
+from referencia import invalidar_referencia
+from registro import obter_logger
+from serializacao import gravar_processados
 from utils import cleanup_data_files
+from validacao import (
+    Validador, codigo_municipio, converter_codigo, limpar_texto, obrigatorio, para_registros
+)
+
+logger = obter_logger('scrapers.municipios_suframa')
+
+# Rótulos das colunas de código e de nome dos municípios (CODMUN/MUNICÍPIO, CD_MUN/NM_MUN, Código/Nome, ...)
+PADRAO_CODIGO = r'(?i)^\s*(c[oó]d(igo)?|cd)(_?mun)?(\b|_)'
+PADRAO_NOME = r'(?i)^\s*(nm(\b|_)|nome|munic)'
+
+# Linhas do topo da planilha em que o cabeçalho é procurado
+LINHAS_CABECALHO = 10
+
+# Linhas anteriores ao primeiro rótulo de zona
+ZONA_PADRAO = "ÁREAS DE LIVRE COMÉRCIO"
+
 
 class MunicipiosSuframaIBGEScraper:
     """Scraper específico para municípios das Zonas Fiscais Especiais da SUFRAMA do IBGE."""
@@ -35,6 +59,21 @@ class MunicipiosSuframaIBGEScraper:
         # URL do arquivo Excel do IBGE
         self.url = 'https://geoftp.ibge.gov.br/organizacao_do_territorio/estrutura_territorial/SUFRAMA/2022/Municipios_SUFRAMA.xlsx'
         
+        # Coluna com o nome da zona (primeira coluna se o título mudar)
+        self.coluna_zona = 'SUFRAMA'
+        
+        # De onde vieram os pares código/nome: cabecalho, colunas ou posicao
+        self.origem_pares: Optional[str] = None
+        
+        self.validacao: Optional[Dict[str, Any]] = None
+        self.bytes_baixados: Optional[int] = None
+        
+        # Índices removidos e recriados na última carga (tempos de construção)
+        self.indices = GerenciadorIndices('municipios_suframa')
+        
+        # Delta da última carga em relação à anterior (feed de mudanças)
+        self.mudancas: Optional[Dict[str, Any]] = None
+        
         # Criar pastas se não existirem
         Path('data').mkdir(exist_ok=True)
         Path('data/raw').mkdir(exist_ok=True)
@@ -45,24 +84,20 @@ class MunicipiosSuframaIBGEScraper:
         print("🔍 Buscando dados de municípios SUFRAMA do IBGE...")
         
         try:
-            response = self.session.get(self.url, timeout=60)
-            response.raise_for_status()
-            
-            # Salvar dados brutos
+            # Baixar direto para o arquivo bruto (com retomada e checksum)
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             raw_file = f'data/raw/municipios_suframa_raw_{timestamp}.xlsx'
-            
-            with open(raw_file, 'wb') as f:
-                f.write(response.content)
+            download = baixar_arquivo(self.url, raw_file, session=self.session, timeout=60)
+            self.bytes_baixados = download['bytes']
             
             # Ler Excel com pandas
             try:
-                df = pd.read_excel(io.BytesIO(response.content), engine='openpyxl')
+                df = pd.read_excel(raw_file, engine='openpyxl')
                 print("✅ Lido com openpyxl")
             except Exception as e1:
                 print(f"⚠️ Erro com openpyxl: {e1}")
                 try:
-                    df = pd.read_excel(io.BytesIO(response.content))
+                    df = pd.read_excel(raw_file)
                     print("✅ Lido com engine automático")
                 except Exception as e2:
                     raise Exception(f"Falha ao ler arquivo: openpyxl={e1}, auto={e2}")
@@ -79,90 +114,111 @@ class MunicipiosSuframaIBGEScraper:
             print(f"❌ Erro ao processar Excel: {e}")
             raise
     
+    def _colunas_pares(self, df: pd.DataFrame) -> Tuple[int, List[Tuple[str, str]]]:
+        """
+        Localiza a linha de cabeçalho e os pares (código, nome) pelo rótulo.
+
+        O rótulo de cada coluna é o texto da linha de cabeçalho (a primeira,
+        entre as do topo, com rótulos de código e de nome) ou, sem ela, o
+        nome da coluna. Cada coluna de código forma par com a próxima coluna
+        de nome à direita. Sem rótulos reconhecíveis, as colunas após a de
+        zona são lidas em pares consecutivos. A origem dos pares fica em
+        `self.origem_pares`.
+
+        Returns:
+            Tuple: (posição da primeira linha de dados, [(coluna código, coluna nome), ...])
+        """
+        colunas = [coluna for coluna in df.columns if coluna != self.coluna_zona]
+        celulas = df[colunas].head(LINHAS_CABECALHO).astype('string')
+        
+        tem_codigo = celulas.apply(lambda coluna: coluna.str.match(PADRAO_CODIGO, na=False)).any(axis=1)
+        tem_nome = celulas.apply(lambda coluna: coluna.str.match(PADRAO_NOME, na=False)).any(axis=1)
+        cabecalho = tem_codigo & tem_nome
+        if cabecalho.any():
+            posicao = int(cabecalho.to_numpy().argmax())
+            rotulos = celulas.iloc[posicao].fillna('').astype(str)
+            inicio = posicao + 1
+            self.origem_pares = 'cabecalho'
+        else:
+            rotulos = pd.Series([str(coluna) for coluna in colunas], index=colunas, dtype=object)
+            inicio = 1  # Primeira linha abaixo do título da planilha
+            self.origem_pares = 'colunas'
+        
+        codigos = rotulos.str.match(PADRAO_CODIGO).astype(bool)
+        nomes = rotulos.str.match(PADRAO_NOME).astype(bool) & ~codigos
+        
+        pares = []
+        pendente = None
+        for coluna in colunas:
+            if codigos[coluna]:
+                pendente = coluna
+            elif nomes[coluna] and pendente is not None:
+                pares.append((pendente, coluna))
+                pendente = None
+        
+        if not pares:
+            pares = list(zip(colunas[0::2], colunas[1::2]))
+            self.origem_pares = 'posicao'
+        
+        return inicio, pares
+    
     def process_data(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Processa e limpa os dados do DataFrame."""
         print("🔧 Processando dados...")
         
-        processed_municipios = []
-        current_tipo_zona = None
+        if self.coluna_zona not in df.columns:
+            self.coluna_zona = df.columns[0]
         
-        # Processar cada linha do DataFrame
-        for idx, row in df.iterrows():
-            # Pular linha de cabeçalho
-            if idx == 0:
-                continue
-                
-            try:
-                # Verificar se é uma nova zona
-                suframa_col = row['SUFRAMA']
-                if pd.notna(suframa_col) and str(suframa_col).strip():
-                    current_tipo_zona = str(suframa_col).strip()
-                    print(f"🏷️ Processando zona: {current_tipo_zona}")
-                
-                # Se não temos tipo de zona definido, usar a última conhecida
-                if not current_tipo_zona:
-                    current_tipo_zona = "ÁREAS DE LIVRE COMÉRCIO"  # Default para linhas sem tipo
-                
-                # Processar municípios nas colunas
-                municipios_na_linha = []
-                
-                # Verificar colunas de municípios (pares: código, nome)
-                colunas = ['Unnamed: 1', 'Unnamed: 2', 'Unnamed: 3', 'Unnamed: 4', 'Unnamed: 5', 'Unnamed: 6']
-                
-                # Processar em pares (código, nome)
-                for i in range(0, len(colunas), 2):
-                    if i + 1 < len(colunas):
-                        cod_col = colunas[i]
-                        nome_col = colunas[i + 1]
-                        
-                        cod_mun = row.get(cod_col)
-                        nome_mun = row.get(nome_col)
-                        
-                        # Validar se temos dados válidos
-                        if pd.notna(cod_mun) and pd.notna(nome_mun):
-                            cod_mun_clean = self._clean_string(str(int(cod_mun)))
-                            nome_mun_clean = self._clean_string(str(nome_mun))
-                            
-                            if cod_mun_clean and nome_mun_clean:
-                                municipio = {
-                                    'cd_mun': cod_mun_clean,
-                                    'nm_mun': nome_mun_clean,
-                                    'tipo_zona': current_tipo_zona,
-                                    'scraped_at': datetime.now().isoformat(),
-                                    'source_url': self.url
-                                }
-                                municipios_na_linha.append(municipio)
-                
-                # Adicionar municípios processados
-                processed_municipios.extend(municipios_na_linha)
-                
-                if municipios_na_linha:
-                    print(f"   ✅ {len(municipios_na_linha)} municípios na linha {idx}")
-                
-            except Exception as e:
-                print(f"⚠️ Erro ao processar linha {idx}: {e}")
-                continue
+        inicio, pares = self._colunas_pares(df)
+        dados = df.iloc[inicio:]
+        print(f"   🧩 {len(pares)} pares código/nome ({self.origem_pares}): {', '.join(f'{c}/{n}' for c, n in pares)}")
+        if self.origem_pares == 'posicao':
+            logger.warning("⚠️ Cabeçalho não reconhecido; colunas lidas em pares consecutivos")
+        
+        # Zona declarada na primeira linha de cada bloco, propagada para as seguintes
+        zona = limpar_texto(dados, self.coluna_zona).ffill().fillna(ZONA_PADRAO)
+        
+        # Largo -> longo: cada linha vira um registro por par (código, nome)
+        cod_cols = [codigo for codigo, _ in pares]
+        nome_cols = [nome for _, nome in pares]
+        longo = pd.DataFrame({
+            'cd_mun': dados[cod_cols].to_numpy(dtype=object).ravel(),
+            'nm_mun': dados[nome_cols].to_numpy(dtype=object).ravel(),
+            'tipo_zona': np.repeat(zona.to_numpy(dtype=object), len(pares))
+        })
+        
+        df_municipios = pd.DataFrame({
+            'cd_mun': converter_codigo(longo, 'cd_mun'),
+            'nm_mun': limpar_texto(longo, 'nm_mun'),
+            'tipo_zona': longo['tipo_zona']
+        })
+        
+        # Células vazias dos pares não são municípios
+        df_municipios = df_municipios[df_municipios['cd_mun'].notna() | df_municipios['nm_mun'].notna()]
+        
+        # Validar código IBGE
+        df_municipios, self.validacao = Validador('municipios_suframa', [
+            obrigatorio('cd_mun'),
+            obrigatorio('nm_mun'),
+            codigo_municipio()
+        ]).validar(df_municipios)
+        
+        df_municipios['scraped_at'] = datetime.now().isoformat()
+        df_municipios['source_url'] = self.url
+        processed_municipios = para_registros(df_municipios)
+        
+        for tipo_zona, total in df_municipios['tipo_zona'].value_counts(sort=False).items():
+            logger.info("🏷️ Zona %s: %s municípios", tipo_zona, total)
         
         # Salvar dados processados
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        processed_file = f'data/processed/municipios_suframa_{timestamp}.json'
-        
-        with open(processed_file, 'w', encoding='utf-8') as f:
-            json.dump(processed_municipios, f, ensure_ascii=False, indent=2)
+        processed_file = gravar_processados(f'data/processed/municipios_suframa_{timestamp}', processed_municipios)
         
         print(f"✅ {len(processed_municipios)} municípios processados")
         print(f"📁 Dados salvos em: {processed_file}")
         
         return processed_municipios
     
-    def _clean_string(self, value: Any) -> Optional[str]:
-        """Limpa e valida strings."""
-        if value is None or pd.isna(value):
-            return None
-        
-        cleaned = str(value).strip()
-        return cleaned if cleaned and cleaned.upper() not in ['NULL', 'NONE', 'N/A', 'NAN'] else None
-    
     def save_to_database(self, municipios: List[Dict[str, Any]]) -> int:
         """Salva os dados no banco PostgreSQL."""
         print("💾 Salvando no banco de dados...")
@@ -171,6 +227,8 @@ class MunicipiosSuframaIBGEScraper:
         create_tables()
         
         saved_count = 0
+        # Instância nova a cada carga: o relatório traz só os tempos desta execução
+        indices = self.indices = GerenciadorIndices('municipios_suframa')
         
         with SessionLocal() as db:
             try:
@@ -195,12 +253,16 @@ class MunicipiosSuframaIBGEScraper:
                 print("🧹 Limpando tabela existente...")
                 db.execute(text("TRUNCATE TABLE municipios_suframa RESTART IDENTITY CASCADE"))
                 
+                # Índices secundários reconstruídos uma vez após a carga
+                indices.remover(db)
+                
                 # Inserir dados novos
                 print(f"📝 Inserindo {len(municipios_objs)} municípios...")
                 for municipio in municipios_objs:
                     db.add(municipio)
                     saved_count += 1
                 
+                registrar_carga(db, 'municipios_suframa', saved_count)
                 db.commit()
                 print(f"✅ {saved_count} municípios salvos no banco")
                 
@@ -209,6 +271,15 @@ class MunicipiosSuframaIBGEScraper:
                 print(f"❌ Erro ao salvar no banco: {e}")
                 raise
         
+        indices.recriar()
+        
+        # Novos municípios: o resolvedor de cd_mun e os dados de referência devem ser relidos
+        invalidate_municipio_resolver()
+        invalidar_referencia()
+        
+        # Delta em relação à carga anterior (feed de mudanças)
+        self.mudancas = registrar_mudancas('municipios_suframa')
+        
         return saved_count
     
     def get_stats(self) -> Dict[str, Any]:
@@ -251,22 +322,28 @@ class MunicipiosSuframaIBGEScraper:
         """Executa o scraping completo."""
         print("🚀 Iniciando scraping de municípios SUFRAMA do IBGE...")
         start_time = time.time()
+        etapas = Cronometro()
         
         try:
             # 1. Buscar dados
             df = self.fetch_data()
+            etapas.marcar('fetch')
             
             # 2. Processar dados
             processed_data = self.process_data(df)
+            etapas.marcar('process')
             
             # 3. Salvar no banco
             saved_count = self.save_to_database(processed_data)
+            etapas.marcar('save')
             
             # 4. Estatísticas
             stats = self.get_stats()
+            etapas.marcar('stats')
             
             # 5. Limpeza de arquivos antigos
             cleanup_data_files('municipios_suframa')
+            etapas.marcar('cleanup')
             
             elapsed_time = time.time() - start_time
             
@@ -275,6 +352,11 @@ class MunicipiosSuframaIBGEScraper:
                 'raw_count': len(df),
                 'processed_count': len(processed_data),
                 'saved_count': saved_count,
+                'validacao': self.validacao,
+                'bytes': self.bytes_baixados,
+                'indices': self.indices.relatorio(),
+                'mudancas': self.mudancas,
+                'etapas': etapas.tempos,
                 'elapsed_time': elapsed_time,
                 'stats': stats
             }
@@ -307,9 +389,43 @@ class MunicipiosSuframaIBGEScraper:
                 'elapsed_time': time.time() - start_time
             }
 
+def verificar_cabecalho() -> List[Tuple[str, str]]:
+    """
+    Confere a detecção do cabeçalho numa planilha no formato documentado
+    (docs/municipios-zonas-fiscais-especiais.md): título SUFRAMA, linha de
+    cabeçalho TIPO, CODMUN, MUNICÍPIO, CODMUN, MUNICÍPIO, ... e blocos por zona.
+
+    Returns:
+        List: Pares (coluna código, coluna nome) encontrados
+
+    Raises:
+        AssertionError: Cabeçalho não detectado ou pares incorretos
+    """
+    df = pd.DataFrame({
+        'SUFRAMA': ['TIPO', 'ZONA FRANCA DE MANAUS', 'ÁREAS DE LIVRE COMÉRCIO', None],
+        'Unnamed: 1': ['CODMUN', 1302603, 1200104, 1400100],
+        'Unnamed: 2': ['MUNICÍPIO', 'Manaus', 'Brasiléia', 'Boa Vista'],
+        'Unnamed: 3': ['CODMUN', 1303536, 1200252, None],
+        'Unnamed: 4': ['MUNICÍPIO', 'Presidente Figueiredo', 'Epitaciolândia', None]
+    })
+    scraper = MunicipiosSuframaIBGEScraper()
+    inicio, pares = scraper._colunas_pares(df)
+    
+    esperados = [('Unnamed: 1', 'Unnamed: 2'), ('Unnamed: 3', 'Unnamed: 4')]
+    if scraper.origem_pares != 'cabecalho' or inicio != 1:
+        raise AssertionError(f"Cabeçalho não detectado (origem: {scraper.origem_pares}, início: {inicio})")
+    if pares != esperados:
+        raise AssertionError(f"Pares incorretos: {pares} (esperado {esperados})")
+    return pares
+
+
 if __name__ == '__main__':
+    if '--verificar' in sys.argv:
+        print(f"✅ Cabeçalho detectado: {verificar_cabecalho()}")
+        sys.exit(0)
+    
     scraper = MunicipiosSuframaIBGEScraper()
-    result = scraper.run()
+    result = perfilar('municipios_suframa', argumento_perfil(), scraper.run)
     
     if result['success']:
         print("\n🎉 Scraping concluído com sucesso!")
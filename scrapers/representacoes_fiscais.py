@@ -1,11 +1,17 @@
 import requests
-import json
 import time
 import csv
 from datetime import datetime
 import os
 import hashlib
 import glob
+import sys
+from pathlib import Path
+
+# Adicionar o diretório pai ao path para importar módulos
+sys.path.append(str(Path(__file__).parent.parent))
+
+from serializacao import dumps, loads
 
 # --- CONFIGURAÇÕES ---
 url = "https://wabi-brazil-south-b-primary-api.analysis.windows.net/public/reports/querydata?synchronous=true"
@@ -23,8 +29,7 @@ headers = {
 
 def gerar_hash_linha(linha):
     """Gera hash único para uma linha de dados"""
-    linha_str = json.dumps(linha, sort_keys=True)
-    return hashlib.md5(linha_str.encode()).hexdigest()
+    return hashlib.md5(dumps(linha, ordenar=True)).hexdigest()
 
 def criar_payload_com_filtro_valor(valor_minimo=None, valor_maximo=None):
     """Cria payload com filtro por valor para tentar paginação por faixas"""
@@ -190,7 +195,7 @@ def extrair_com_diferentes_ordenacoes():
     try:
         response = requests.post(url, headers=headers, json=payload_desc, timeout=60)
         response.raise_for_status()
-        response_data = response.json()
+        response_data = loads(response.content)
         
         data = response_data['results'][0]['result']['data']
         headers_info = [item['Name'] for item in data['descriptor']['Select']]
@@ -220,7 +225,7 @@ def extrair_com_diferentes_ordenacoes():
     try:
         response = requests.post(url, headers=headers, json=payload_asc, timeout=60)
         response.raise_for_status()
-        response_data = response.json()
+        response_data = loads(response.content)
         
         data = response_data['results'][0]['result']['data']
         rows = data['dsr']['DS'][0]['PH'][0]['DM0']
@@ -253,7 +258,7 @@ def extrair_com_diferentes_ordenacoes():
     try:
         response = requests.post(url, headers=headers, json=payload_sem_ordem, timeout=60)
         response.raise_for_status()
-        response_data = response.json()
+        response_data = loads(response.content)
         
         data = response_data['results'][0]['result']['data']
         rows = data['dsr']['DS'][0]['PH'][0]['DM0']
@@ -294,7 +299,7 @@ def tentar_multiplas_requisicoes_com_delay():
         try:
             response = requests.post(url, headers=headers, json=payload_base, timeout=60)
             response.raise_for_status()
-            response_data = response.json()
+            response_data = loads(response.content)
             
             data = response_data['results'][0]['result']['data']
             headers_info = [item['Name'] for item in data['descriptor']['Select']]
@@ -423,5 +428,7 @@ def limpar_arquivos_antigos(diretorio="data/processed", padrao="representacoes_f
         print(f"❌ Erro na limpeza de arquivos: {e}")
 
 if __name__ == "__main__":
-    executar_estrategias_avancadas()
+    from perfilamento import argumento_perfil, perfilar
+
+    perfilar('representacoes_fiscais_scraper', argumento_perfil(), executar_estrategias_avancadas)
     limpar_arquivos_antigos()
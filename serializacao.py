@@ -0,0 +1,270 @@
+"""
+Serialização JSON dos arquivos brutos, processados e de log.
+
+Usa `orjson` quando instalado (codificação e decodificação em C, direto para
+bytes) e cai para o `json` da biblioteca padrão quando não está. As duas
+implementações têm a mesma interface e o mesmo resultado para os tipos
+usados nos scrapers:
+
+    - datetime/date/time em ISO 8601, UUID como texto, timedelta em segundos
+    - demais tipos (Decimal, numpy, ...) convertidos com str()
+    - texto sem escapes ASCII (UTF-8 direto)
+
+O BOM UTF-8 das respostas da ANAC é removido uma única vez em `loads`, em vez
+de tentar o parse, falhar e decodificar de novo com `utf-8-sig`.
+
+Formatos de saída dos arquivos processados (`SERIALIZACAO_FORMATO`):
+    compacto     JSON sem espaços (padrão)
+    indentado    JSON com indentação de 2 espaços (leitura humana)
+    ndjson       Um objeto por linha (extensão .ndjson)
+
+`SERIALIZACAO_BACKEND=json` força a biblioteca padrão mesmo com o orjson
+instalado.
+
+Usage:
+    python serializacao.py --benchmark                        # 100 mil registros sintéticos
+    python serializacao.py --benchmark --arquivo data/processed/atracacoes_portuarias_X.json
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, time as hora, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FORMATOS = ('compacto', 'indentado', 'ndjson')
+SERIALIZACAO_FORMATO = os.getenv('SERIALIZACAO_FORMATO', 'compacto')
+
+BACKEND = 'orjson' if orjson is not None and os.getenv('SERIALIZACAO_BACKEND', 'orjson') != 'json' else 'json'
+
+BOM_UTF8 = b'\xef\xbb\xbf'
+
+# Erro de decodificação das duas implementações (orjson.JSONDecodeError é subclasse)
+ErroDecodificacao = json.JSONDecodeError
+
+
+def converter_padrao(valor: Any) -> Any:
+    """
+    Tipos fora do JSON nativo (o orjson já trata datetime e UUID sozinho).
+    Também usado pela exportação para valores gravados como texto.
+    """
+    if isinstance(valor, (datetime, date, hora)):
+        return valor.isoformat()
+    if isinstance(valor, timedelta):
+        return valor.total_seconds()
+    return str(valor)
+
+
+def _dumps_orjson(dados: Any, indentar: bool = False, ordenar: bool = False) -> bytes:
+    opcoes = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if indentar:
+        opcoes |= orjson.OPT_INDENT_2
+    if ordenar:
+        opcoes |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(dados, default=converter_padrao, option=opcoes)
+
+
+def _dumps_json(dados: Any, indentar: bool = False, ordenar: bool = False) -> bytes:
+    return json.dumps(
+        dados, ensure_ascii=False, default=converter_padrao, sort_keys=ordenar,
+        indent=2 if indentar else None, separators=None if indentar else (',', ':')
+    ).encode('utf-8')
+
+
+def _loads_orjson(dados: Union[bytes, str]) -> Any:
+    return orjson.loads(dados)
+
+
+def _loads_json(dados: Union[bytes, str]) -> Any:
+    return json.loads(dados)
+
+
+_IMPLEMENTACOES: Dict[str, Dict[str, Callable]] = {
+    'json': {'dumps': _dumps_json, 'loads': _loads_json}
+}
+if orjson is not None:
+    _IMPLEMENTACOES['orjson'] = {'dumps': _dumps_orjson, 'loads': _loads_orjson}
+
+
+def dumps(dados: Any, indentar: bool = False, ordenar: bool = False) -> bytes:
+    """
+    Serializa em JSON UTF-8.
+
+    Args:
+        dados: Objeto a serializar
+        indentar (bool): Indentação de 2 espaços
+        ordenar (bool): Chaves em ordem (saída determinística, para hash)
+
+    Returns:
+        bytes: JSON codificado em UTF-8
+    """
+    return _IMPLEMENTACOES[BACKEND]['dumps'](dados, indentar, ordenar)
+
+
+def dumps_texto(dados: Any, indentar: bool = False, ordenar: bool = False) -> str:
+    """Como `dumps`, em str (para logs e terminal)."""
+    return dumps(dados, indentar, ordenar).decode('utf-8')
+
+
+def loads(dados: Union[bytes, str]) -> Any:
+    """Decodifica JSON de bytes ou str, removendo o BOM UTF-8 se houver."""
+    if isinstance(dados, (bytes, bytearray, memoryview)):
+        dados = bytes(dados)
+        if dados.startswith(BOM_UTF8):
+            dados = dados[len(BOM_UTF8):]
+    elif dados.startswith('\ufeff'):
+        dados = dados[1:]
+    return _IMPLEMENTACOES[BACKEND]['loads'](dados)
+
+
+def gravar_json(caminho: Union[str, Path], dados: Any, indentar: bool = False) -> None:
+    with open(caminho, 'wb') as f:
+        f.write(dumps(dados, indentar))
+
+
+def ler_json(caminho: Union[str, Path]) -> Any:
+    with open(caminho, 'rb') as f:
+        return loads(f.read())
+
+
+def gravar_ndjson(caminho: Union[str, Path], registros: Iterable[Any]) -> int:
+    """Grava um objeto JSON por linha; retorna a quantidade de linhas."""
+    total = 0
+    with open(caminho, 'wb') as f:
+        for registro in registros:
+            f.write(dumps(registro))
+            f.write(b'\n')
+            total += 1
+    return total
+
+
+def ler_ndjson(caminho: Union[str, Path]) -> List[Any]:
+    with open(caminho, 'rb') as f:
+        return [loads(linha) for linha in f if linha.strip()]
+
+
+def gravar_processados(caminho_base: str, registros: List[Dict[str, Any]],
+                       formato: Optional[str] = None) -> str:
+    """
+    Grava os registros processados de um scraper no formato configurado.
+
+    Args:
+        caminho_base (str): Caminho sem extensão (ex.: data/processed/aerodromos_publicos_20250101_120000)
+        registros: Registros processados
+        formato (str): compacto, indentado ou ndjson (padrão: SERIALIZACAO_FORMATO)
+
+    Returns:
+        str: Caminho do arquivo gravado
+    """
+    formato = formato or SERIALIZACAO_FORMATO
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de serialização inválido: {formato} (use {', '.join(FORMATOS)})")
+
+    if formato == 'ndjson':
+        caminho = f'{caminho_base}.ndjson'
+        gravar_ndjson(caminho, registros)
+    else:
+        caminho = f'{caminho_base}.json'
+        gravar_json(caminho, registros, indentar=formato == 'indentado')
+    return caminho
+
+
+def _registros_sinteticos(quantidade: int) -> List[Dict[str, Any]]:
+    """Registros no formato das atracações processadas."""
+    inicio = datetime(2025, 1, 1)
+    return [
+        {
+            'id_atracacao': str(1000000 + i),
+            'porto_atracacao': f'Porto de São Sebastião {i % 200}',
+            'municipio': f'Município {i % 900}',
+            'sguf': 'SP',
+            'latitude': -23.8 + (i % 1000) / 10000,
+            'longitude': -45.4 - (i % 1000) / 10000,
+            'ano': 2025,
+            'data_atracacao': (inicio + timedelta(minutes=i)).isoformat(),
+            'tempo_espera': float(i % 86400),
+            'cd_mun': '3550704',
+            'scraped_at': inicio.isoformat()
+        }
+        for i in range(quantidade)
+    ]
+
+
+def _cronometrar(funcao: Callable[[], Any], repeticoes: int) -> float:
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def benchmark(registros: List[Dict[str, Any]], repeticoes: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Melhor tempo (s) de cada operação por implementação disponível:
+    JSON indentado (formato anterior dos processados), compacto, NDJSON e
+    decodificação do JSON compacto.
+    """
+    resultado = {}
+    for nome, funcoes in _IMPLEMENTACOES.items():
+        codificar = funcoes['dumps']
+        decodificar = funcoes['loads']
+        compacto = codificar(registros)
+        resultado[nome] = {
+            'indentado_s': _cronometrar(lambda: codificar(registros, True), repeticoes),
+            'compacto_s': _cronometrar(lambda: codificar(registros), repeticoes),
+            'ndjson_s': _cronometrar(lambda: b'\n'.join(codificar(r) for r in registros), repeticoes),
+            'decodificar_s': _cronometrar(lambda: decodificar(compacto), repeticoes),
+            'bytes_indentado': len(codificar(registros, True)),
+            'bytes_compacto': len(compacto)
+        }
+    return resultado
+
+
+def main():
+    """Interface de linha de comando."""
+    parser = argparse.ArgumentParser(description='Serialização JSON (orjson com fallback para a stdlib)')
+    parser.add_argument('--benchmark', action='store_true', help='Compara codificação e decodificação')
+    parser.add_argument('--arquivo', help='Arquivo processado (.json ou .ndjson) usado no benchmark')
+    parser.add_argument('--registros', type=int, default=100000, help='Registros sintéticos do benchmark')
+    parser.add_argument('--repeticoes', type=int, default=3, help='Repetições (vale o melhor tempo)')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        print(f"Backend: {BACKEND} | formato dos processados: {SERIALIZACAO_FORMATO}")
+        parser.print_help()
+        return
+
+    if args.arquivo:
+        registros = ler_ndjson(args.arquivo) if args.arquivo.endswith('.ndjson') else ler_json(args.arquivo)
+    else:
+        registros = _registros_sinteticos(args.registros)
+
+    print(f"⏱️ {len(registros):,} registros, melhor de {args.repeticoes} "
+          f"(orjson {'instalado' if orjson is not None else 'não instalado'})")
+    resultado = benchmark(registros, args.repeticoes)
+    for nome, tempos in resultado.items():
+        print(f"   {nome:<7} indentado {tempos['indentado_s']:.3f}s | compacto {tempos['compacto_s']:.3f}s | "
+              f"ndjson {tempos['ndjson_s']:.3f}s | decodificar {tempos['decodificar_s']:.3f}s | "
+              f"{tempos['bytes_indentado'] / 1e6:.1f} MB → {tempos['bytes_compacto'] / 1e6:.1f} MB compacto")
+
+    if 'orjson' in resultado:
+        base, rapido = resultado['json'], resultado['orjson']
+        print(f"🚀 Processados (json indentado → orjson {SERIALIZACAO_FORMATO}): "
+              f"{base['indentado_s'] / rapido[SERIALIZACAO_FORMATO + '_s']:.1f}x | "
+              f"decodificação: {base['decodificar_s'] / rapido['decodificar_s']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
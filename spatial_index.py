@@ -0,0 +1,291 @@
+"""
+Índice espacial em memória para aeródromos e berços portuários.
+
+Carrega as coordenadas das tabelas em arrays NumPy compactados, organizados
+numa grade regular de latitude/longitude, e responde consultas de vizinhos
+mais próximos (kNN) e de raio com refinamento pela fórmula de haversine.
+
+Cada processo (API, roteamento, scripts) guarda seus índices junto com a
+geração da tabela em `cargas_tabelas`. No máximo a cada
+`INDICE_ESPACIAL_INTERVALO` segundos, `get_spatial_index()` compara essa
+geração com o banco e reconstrói o índice só se a tabela foi recarregada,
+como `referencia.obter_referencia()`. Os loaders não constroem índices.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from database import SessionLocal, get_cargas
+
+load_dotenv()
+
+# Intervalo mínimo entre verificações de geração no banco (segundos)
+INDICE_ESPACIAL_INTERVALO = float(os.getenv('INDICE_ESPACIAL_INTERVALO', '30'))
+
+# Raio médio da Terra em km
+RAIO_TERRA_KM = 6371.0088
+
+# Quilômetros por grau de latitude
+KM_POR_GRAU = 111.195
+
+# Consultas de carga por dataset: (identificador, nome, latitude, longitude)
+DATASETS = {
+    'aerodromos_privados': """
+        SELECT COALESCE(codigo_oaci, ciad, CAST(id AS TEXT)), nome, lat_geo_point, lon_geo_point
+        FROM aerodromos_privados
+        WHERE lat_geo_point IS NOT NULL AND lon_geo_point IS NOT NULL
+    """,
+    'aerodromos_publicos': """
+        SELECT COALESCE(codigo_oaci, ciad, CAST(id AS TEXT)), nome, latitude, longitude
+        FROM aerodromos_publicos
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+    """,
+    # Um ponto por berço: as atracações repetem as coordenadas do berço
+    'atracacoes_portuarias': """
+        SELECT COALESCE(cdtup, '') || ':' || COALESCE(id_berco, ''),
+               MIN(COALESCE(porto_atracacao, '') || COALESCE(' - ' || berco, '')),
+               AVG(latitude), AVG(longitude)
+        FROM atracacoes_portuarias
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+        GROUP BY cdtup, id_berco
+    """
+}
+
+
+class SpatialIndex:
+    """Índice em grade regular sobre pontos (lat, lon) em arrays NumPy."""
+
+    def __init__(self, ids: List[str], nomes: List[str], lats: Any, lons: Any, tamanho_celula: float = 0.5):
+        """
+        Constrói o índice.
+
+        Args:
+            ids: Identificadores dos pontos
+            nomes: Nomes descritivos dos pontos
+            lats: Latitudes em graus decimais
+            lons: Longitudes em graus decimais
+            tamanho_celula: Tamanho da célula da grade em graus
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+
+        # Descartar coordenadas inválidas
+        validos = np.isfinite(lats) & np.isfinite(lons) & (np.abs(lats) <= 90) & (np.abs(lons) <= 180)
+        posicoes = np.flatnonzero(validos)
+
+        self.tamanho_celula = tamanho_celula
+        self.n_colunas = int(np.ceil(360.0 / tamanho_celula)) + 1
+
+        linhas = self._linha(lats[posicoes])
+        colunas = self._coluna(lons[posicoes])
+        celulas = linhas * self.n_colunas + colunas
+
+        # Ordenar por célula para que cada faixa de colunas seja contígua
+        ordem = np.argsort(celulas, kind='stable')
+        origem = posicoes[ordem]
+
+        self.celulas = celulas[ordem]
+        self.lats = np.ascontiguousarray(lats[origem])
+        self.lons = np.ascontiguousarray(lons[origem])
+        self._lats_rad = np.radians(self.lats)
+        self._lons_rad = np.radians(self.lons)
+        self._cos_lats = np.cos(self._lats_rad)
+        self.ids = np.asarray(ids, dtype=object)[origem]
+        self.nomes = np.asarray(nomes, dtype=object)[origem]
+
+        # Geração da tabela em cargas_tabelas (preenchida por build_spatial_index)
+        self.geracao: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def _linha(self, lat: Any) -> Any:
+        return np.floor((np.asarray(lat) + 90.0) / self.tamanho_celula).astype(np.int64)
+
+    def _coluna(self, lon: Any) -> Any:
+        return np.floor((np.asarray(lon) + 180.0) / self.tamanho_celula).astype(np.int64)
+
+    def _candidatos(self, lat: float, lon: float, raio_km: float) -> Any:
+        """Retorna as posições dos pontos nas células que cobrem o raio."""
+        delta_lat = raio_km / KM_POR_GRAU
+        lat_min = max(lat - delta_lat, -90.0)
+        lat_max = min(lat + delta_lat, 90.0)
+
+        # Perto dos polos a caixa cobre todas as longitudes
+        cos_lat = np.cos(np.radians(max(abs(lat_min), abs(lat_max))))
+        if cos_lat < 1e-6 or raio_km / (KM_POR_GRAU * cos_lat) >= 180.0:
+            lon_min, lon_max = -180.0, 180.0
+        else:
+            delta_lon = raio_km / (KM_POR_GRAU * cos_lat)
+            lon_min = max(lon - delta_lon, -180.0)
+            lon_max = min(lon + delta_lon, 180.0)
+
+        col_min = int(self._coluna(lon_min))
+        col_max = int(self._coluna(lon_max))
+        linha_min = int(self._linha(lat_min))
+        linha_max = int(self._linha(lat_max))
+
+        # Cada linha da grade é uma faixa contígua de células no array ordenado
+        inicio_linhas = np.arange(linha_min, linha_max + 1, dtype=np.int64) * self.n_colunas
+        inicios = np.searchsorted(self.celulas, inicio_linhas + col_min, side='left')
+        fins = np.searchsorted(self.celulas, inicio_linhas + col_max, side='right')
+
+        fatias = [np.arange(i, f) for i, f in zip(inicios, fins) if f > i]
+        if not fatias:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(fatias)
+
+    def _haversine(self, lat: float, lon: float, posicoes: Any) -> Any:
+        """Distância em km do ponto de consulta até os pontos indicados."""
+        lat_rad = np.radians(lat)
+        lon_rad = np.radians(lon)
+        dlat = self._lats_rad[posicoes] - lat_rad
+        dlon = self._lons_rad[posicoes] - lon_rad
+        a = np.sin(dlat / 2.0) ** 2 + np.cos(lat_rad) * self._cos_lats[posicoes] * np.sin(dlon / 2.0) ** 2
+        return 2.0 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def _resultado(self, posicoes: Any, distancias: Any) -> List[Dict[str, Any]]:
+        return [
+            {
+                'id': self.ids[p],
+                'nome': self.nomes[p],
+                'latitude': float(self.lats[p]),
+                'longitude': float(self.lons[p]),
+                'distancia_km': float(d)
+            }
+            for p, d in zip(posicoes, distancias)
+        ]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Dict[str, Any]]:
+        """Retorna os pontos a até `radius_km` do ponto, ordenados por distância."""
+        if len(self) == 0 or radius_km < 0:
+            return []
+
+        posicoes = self._candidatos(lat, lon, radius_km)
+        if len(posicoes) == 0:
+            return []
+
+        distancias = self._haversine(lat, lon, posicoes)
+        dentro = distancias <= radius_km
+        posicoes = posicoes[dentro]
+        distancias = distancias[dentro]
+
+        ordem = np.argsort(distancias, kind='stable')
+        return self._resultado(posicoes[ordem], distancias[ordem])
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Dict[str, Any]]:
+        """Retorna os `k` pontos mais próximos, ordenados por distância."""
+        if len(self) == 0 or k <= 0:
+            return []
+        k = min(k, len(self))
+
+        # Expandir o raio até haver k pontos dentro dele: todos os pontos do
+        # círculo foram examinados, então os k mais próximos são exatos
+        raio_km = self.tamanho_celula * KM_POR_GRAU
+        while True:
+            cobre_tudo = raio_km >= np.pi * RAIO_TERRA_KM
+            if cobre_tudo:
+                posicoes = np.arange(len(self))
+            else:
+                posicoes = self._candidatos(lat, lon, raio_km)
+
+            if len(posicoes) >= k:
+                distancias = self._haversine(lat, lon, posicoes)
+                if cobre_tudo or np.count_nonzero(distancias <= raio_km) >= k:
+                    break
+            raio_km *= 2.0
+
+        if k < len(posicoes):
+            menores = np.argpartition(distancias, k - 1)[:k]
+        else:
+            menores = np.arange(len(posicoes))
+        ordem = menores[np.argsort(distancias[menores], kind='stable')]
+        return self._resultado(posicoes[ordem], distancias[ordem])
+
+
+def _geracao_atual(db, dataset: str) -> int:
+    return (get_cargas(db).get(dataset) or {}).get('geracao', 0)
+
+
+def build_spatial_index(dataset: str, tamanho_celula: float = 0.5) -> SpatialIndex:
+    """
+    Carrega as coordenadas de um dataset do banco e constrói o índice.
+
+    A geração da tabela é lida antes dos dados e fica em `indice.geracao`:
+    uma carga concorrente deixa o índice com a geração antiga, e a próxima
+    verificação o reconstrói.
+    """
+    if dataset not in DATASETS:
+        available = ', '.join(DATASETS.keys())
+        raise ValueError(f"Dataset '{dataset}' não possui índice espacial. Disponíveis: {available}")
+
+    with SessionLocal() as db:
+        geracao = _geracao_atual(db, dataset)
+        rows = db.execute(text(DATASETS[dataset])).fetchall()
+
+    ids = [row[0] for row in rows]
+    nomes = [row[1] for row in rows]
+    lats = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+    lons = np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows))
+
+    indice = SpatialIndex(ids, nomes, lats, lons, tamanho_celula=tamanho_celula)
+    indice.geracao = geracao
+    return indice
+
+
+# Índices carregados no processo e instante da última verificação de geração
+_indices: Dict[str, SpatialIndex] = {}
+_verificado_em: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def get_spatial_index(dataset: str, intervalo: float = INDICE_ESPACIAL_INTERVALO) -> SpatialIndex:
+    """
+    Retorna o índice do dataset, reconstruído só quando a geração mudou.
+
+    Entre verificações, a chamada não toca o banco. Se a verificação ou a
+    reconstrução falhar, o índice anterior continua em uso.
+    """
+    agora = time.monotonic()
+    indice = _indices.get(dataset)
+    if indice is not None and agora - _verificado_em.get(dataset, float('-inf')) < intervalo:
+        return indice
+
+    with _lock:
+        indice = _indices.get(dataset)
+        if indice is not None and agora - _verificado_em.get(dataset, float('-inf')) < intervalo:
+            return indice
+
+        if indice is None:
+            indice = build_spatial_index(dataset)
+            print(f"🧭 Índice espacial de {dataset} construído: {len(indice)} pontos")
+        else:
+            try:
+                with SessionLocal() as db:
+                    geracao = _geracao_atual(db, dataset)
+                if geracao != indice.geracao:
+                    indice = build_spatial_index(dataset)
+                    print(f"🧭 Índice espacial de {dataset} reconstruído (geração {geracao}): {len(indice)} pontos")
+            except Exception as e:
+                # Banco indisponível: segue com o índice anterior
+                print(f"⚠️ Erro ao verificar geração do índice espacial de {dataset}: {e}")
+
+        _indices[dataset] = indice
+        _verificado_em[dataset] = agora
+        return indice
+
+
+def nearest(dataset: str, lat: float, lon: float, k: int = 1) -> List[Dict[str, Any]]:
+    """Atalho para `get_spatial_index(dataset).nearest(lat, lon, k)`."""
+    return get_spatial_index(dataset).nearest(lat, lon, k)
+
+
+def within(dataset: str, lat: float, lon: float, radius_km: float) -> List[Dict[str, Any]]:
+    """Atalho para `get_spatial_index(dataset).within(lat, lon, radius_km)`."""
+    return get_spatial_index(dataset).within(lat, lon, radius_km)
@@ -51,6 +51,7 @@ def cleanup_data_files(scraper_name: str) -> None:
     Mantém:
     - 1 arquivo raw mais recente
     - 2 arquivos processed mais recentes
+    - 2 amostras de rejeitados da validação mais recentes
     
     Args:
         scraper_name (str): Nome base do scraper (ex: 'aerodromos_privados')
@@ -64,19 +65,26 @@ def cleanup_data_files(scraper_name: str) -> None:
         keep_count=1
     )
     
-    # Limpar arquivos processed (manter apenas 2)
-    processed_removed = clean_old_files(
-        directory='data/processed',
-        pattern=f'{scraper_name}_*.json',
+    # Limpar arquivos processed (manter apenas 2 de cada formato: JSON e NDJSON)
+    processed_removed = sum(
+        clean_old_files(directory='data/processed', pattern=f'{scraper_name}_*.{extensao}', keep_count=2)
+        for extensao in ('json', 'ndjson')
+    )
+    
+    # Limpar amostras de rejeitados da validação (manter 2)
+    rejects_removed = clean_old_files(
+        directory='data/rejects',
+        pattern=f'{scraper_name}_*.ndjson',
         keep_count=2
     )
     
-    total_removed = raw_removed + processed_removed
+    total_removed = raw_removed + processed_removed + rejects_removed
     
     if total_removed > 0:
         print(f"✅ Limpeza concluída: {total_removed} arquivos removidos")
         print(f"   📄 Raw: {raw_removed} removidos (mantendo 1)")
         print(f"   📋 Processed: {processed_removed} removidos (mantendo 2)")
+        print(f"   🧪 Rejeitados: {rejects_removed} removidos (mantendo 2)")
     else:
         print("✅ Nenhum arquivo antigo encontrado para remoção")
 
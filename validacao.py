@@ -0,0 +1,235 @@
+"""
+Validação declarativa e vetorizada da qualidade dos dados.
+
+Cada regra é avaliada sobre colunas inteiras de um DataFrame, sem laço nem
+try/except por linha. Regras de severidade `erro` descartam a linha. Regras
+de `aviso` mantêm a linha, apenas contam a falha e, opcionalmente, anulam as
+colunas inválidas (ex.: coordenadas fora do Brasil). O resultado traz um
+contador por regra e uma amostra das linhas rejeitadas em
+`data/rejects/<conjunto>_<timestamp>.ndjson`, no lugar de um aviso por linha.
+
+Uso típico num `process_data`:
+
+    df = pd.DataFrame({'nome': limpar_texto(bruto, 'Nome'), ...})
+    validos, relatorio = Validador('aerodromos_privados', [
+        obrigatorio('nome'),
+        coordenadas_brasil('latitude', 'longitude'),
+    ]).validar(df)
+    registros = para_registros(validos)
+"""
+
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from serializacao import gravar_ndjson
+
+ERRO = 'erro'
+AVISO = 'aviso'
+
+# Linhas rejeitadas gravadas como amostra por validação
+AMOSTRA_REJEITOS = int(os.getenv('VALIDACAO_AMOSTRA_REJEITOS', '100'))
+DIRETORIO_REJEITOS = Path('data/rejects')
+
+VALORES_NULOS = ['', 'NULL', 'NONE', 'N/A', 'NAN']
+
+# Limites aproximados do território brasileiro, incluindo ilhas oceânicas
+LATITUDE_BRASIL = (-34.0, 5.5)
+LONGITUDE_BRASIL = (-74.0, -28.5)
+
+
+# ---------------------------------------------------------------------------
+# Limpeza vetorizada de colunas
+# ---------------------------------------------------------------------------
+
+def _coluna(df: pd.DataFrame, coluna: str) -> pd.Series:
+    if coluna in df.columns:
+        return df[coluna]
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def limpar_texto(df: pd.DataFrame, coluna: str) -> pd.Series:
+    """Texto sem espaços nas pontas; vazios e marcadores de nulo viram NA."""
+    texto = _coluna(df, coluna).astype('string').str.strip()
+    return texto.mask(texto.str.upper().isin(VALORES_NULOS))
+
+
+def converter_codigo(df: pd.DataFrame, coluna: str) -> pd.Series:
+    """Código numérico como texto (o Excel entrega 1100015 como 1100015.0)."""
+    return limpar_texto(df, coluna).str.replace(r'\.0+$', '', regex=True)
+
+
+def converter_numero(df: pd.DataFrame, coluna: str) -> pd.Series:
+    """Número decimal (vírgula ou ponto); valores inválidos viram NaN."""
+    texto = limpar_texto(df, coluna).str.replace(',', '.', regex=False)
+    return pd.to_numeric(texto.astype(object).where(texto.notna(), None), errors='coerce').astype('float64')
+
+
+def converter_inteiro(df: pd.DataFrame, coluna: str) -> pd.Series:
+    """Inteiro anulável; valores inválidos viram NA."""
+    return converter_numero(df, coluna).round().astype('Int64')
+
+
+def para_registros(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Converte o DataFrame em lista de dicionários com None no lugar de NA/NaN."""
+    objetos = df.astype(object)
+    return objetos.where(df.notna(), None).to_dict('records')
+
+
+# ---------------------------------------------------------------------------
+# Regras
+# ---------------------------------------------------------------------------
+
+class Regra:
+    """
+    Regra de qualidade avaliada sobre o DataFrame inteiro.
+
+    `teste` recebe o DataFrame e devolve uma Series booleana (True = válida).
+    """
+
+    def __init__(self, nome: str, colunas: Sequence[str], teste: Callable[[pd.DataFrame], pd.Series],
+                 severidade: str = ERRO, anular: bool = False):
+        if severidade not in (ERRO, AVISO):
+            raise ValueError(f"Severidade inválida: {severidade}")
+        self.nome = nome
+        self.colunas = list(colunas)
+        self.teste = teste
+        self.severidade = severidade
+        self.anular = anular
+
+    def avaliar(self, df: pd.DataFrame) -> pd.Series:
+        """Máscara das linhas que FALHAM na regra."""
+        validas = self.teste(df)
+        return ~validas.fillna(False).astype(bool)
+
+
+def obrigatorio(coluna: str, severidade: str = ERRO) -> Regra:
+    """Coluna preenchida."""
+    return Regra(f'{coluna}_obrigatorio', [coluna], lambda df: df[coluna].notna(), severidade)
+
+
+def formato(coluna: str, padrao: str, nome: Optional[str] = None, severidade: str = ERRO,
+            anular: bool = False) -> Regra:
+    """Valor inteiro casa com a expressão regular (nulos passam)."""
+    def teste(df: pd.DataFrame) -> pd.Series:
+        valores = df[coluna].astype('string')
+        return valores.isna() | valores.str.fullmatch(padrao)
+    return Regra(nome or f'{coluna}_formato', [coluna], teste, severidade, anular)
+
+
+def comprimento(coluna: str, tamanhos: Sequence[int], nome: Optional[str] = None,
+                severidade: str = ERRO) -> Regra:
+    """Quantidade de caracteres entre os tamanhos aceitos."""
+    def teste(df: pd.DataFrame) -> pd.Series:
+        return df[coluna].astype('string').str.len().isin(list(tamanhos))
+    return Regra(nome or f'{coluna}_comprimento', [coluna], teste, severidade)
+
+
+def codigo_municipio(coluna: str = 'cd_mun', severidade: str = ERRO) -> Regra:
+    """Código IBGE de município com 7 dígitos."""
+    return formato(coluna, r'\d{7}', nome=f'{coluna}_7_digitos', severidade=severidade)
+
+
+def codigo_oaci(coluna: str = 'codigo_oaci', severidade: str = AVISO) -> Regra:
+    """Código OACI com 4 caracteres alfanuméricos maiúsculos."""
+    return formato(coluna, r'[A-Z0-9]{4}', nome=f'{coluna}_formato', severidade=severidade)
+
+
+def coordenadas_brasil(latitude: str, longitude: str, severidade: str = AVISO, anular: bool = True) -> Regra:
+    """
+    Par de coordenadas dentro do retângulo envolvente do Brasil. Linhas sem
+    coordenadas passam; com `anular`, coordenadas fora do país viram nulas.
+    """
+    def teste(df: pd.DataFrame) -> pd.Series:
+        lat = pd.to_numeric(df[latitude], errors='coerce')
+        lon = pd.to_numeric(df[longitude], errors='coerce')
+        dentro = lat.between(*LATITUDE_BRASIL) & lon.between(*LONGITUDE_BRASIL)
+        return (lat.isna() & lon.isna()) | dentro
+    return Regra('coordenadas_brasil', [latitude, longitude], teste, severidade, anular)
+
+
+# ---------------------------------------------------------------------------
+# Validador
+# ---------------------------------------------------------------------------
+
+class Validador:
+    """Aplica um conjunto de regras a um DataFrame e resume as falhas."""
+
+    def __init__(self, conjunto: str, regras: List[Regra], amostra_rejeitos: int = AMOSTRA_REJEITOS):
+        self.conjunto = conjunto
+        self.regras = regras
+        self.amostra_rejeitos = amostra_rejeitos
+
+    def validar(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Avalia todas as regras de uma vez.
+
+        Returns:
+            Tuple: (linhas aprovadas, relatório com contadores por regra)
+        """
+        falhas = pd.DataFrame(
+            {regra.nome: regra.avaliar(df) for regra in self.regras},
+            index=df.index
+        )
+
+        erros = [regra.nome for regra in self.regras if regra.severidade == ERRO]
+        rejeitadas = falhas[erros].any(axis=1) if erros else pd.Series(False, index=df.index)
+
+        aprovados = df.loc[~rejeitadas].copy()
+        for regra in self.regras:
+            if regra.severidade == AVISO and regra.anular:
+                mascara = falhas.loc[~rejeitadas, regra.nome]
+                for coluna in regra.colunas:
+                    aprovados[coluna] = aprovados[coluna].mask(mascara)
+
+        arquivo = self._gravar_amostra(df, falhas, rejeitadas) if rejeitadas.any() else None
+
+        relatorio = {
+            'conjunto': self.conjunto,
+            'total': len(df),
+            'aprovados': len(aprovados),
+            'rejeitados': int(rejeitadas.sum()),
+            'regras': {
+                regra.nome: {'severidade': regra.severidade, 'falhas': int(falhas[regra.nome].sum())}
+                for regra in self.regras
+            },
+            'arquivo_rejeitos': arquivo
+        }
+        self._imprimir(relatorio)
+        return aprovados, relatorio
+
+    def _gravar_amostra(self, df: pd.DataFrame, falhas: pd.DataFrame, rejeitadas: pd.Series) -> str:
+        """Grava uma amostra das linhas rejeitadas com as regras que falharam."""
+        indices = rejeitadas[rejeitadas].index
+        if len(indices) > self.amostra_rejeitos:
+            indices = rejeitadas[rejeitadas].sample(n=self.amostra_rejeitos, random_state=0).index.sort_values()
+
+        amostra = df.loc[indices]
+        regras_falhas = falhas.loc[indices]
+
+        DIRETORIO_REJEITOS.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        arquivo = DIRETORIO_REJEITOS / f'{self.conjunto}_{timestamp}.ndjson'
+
+        def registros():
+            for registro, (_, linha_falhas) in zip(para_registros(amostra), regras_falhas.iterrows()):
+                registro['_regras'] = linha_falhas.index[linha_falhas.to_numpy()].tolist()
+                yield registro
+
+        gravar_ndjson(arquivo, registros())
+
+        return str(arquivo)
+
+    @staticmethod
+    def _imprimir(relatorio: Dict[str, Any]) -> None:
+        print(f"🧪 Validação de {relatorio['conjunto']}: {relatorio['aprovados']} aprovados, "
+              f"{relatorio['rejeitados']} rejeitados de {relatorio['total']}")
+        for nome, regra in relatorio['regras'].items():
+            if regra['falhas']:
+                icone = '❌' if regra['severidade'] == ERRO else '⚠️'
+                print(f"   {icone} {nome}: {regra['falhas']}")
+        if relatorio['arquivo_rejeitos']:
+            print(f"   📄 Amostra de rejeitados: {relatorio['arquivo_rejeitos']}")